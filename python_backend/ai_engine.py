@@ -6,17 +6,21 @@ from python_backend.logger import log_info, log_error, log_warning
 from python_backend.jarvis_personality import get_jarvis
 from python_backend.context_awareness import get_context_awareness
 from python_backend.config import AI_MODE
+from python_backend.command_parser import ParsedCommand, parse_command, parse_for
 import subprocess
 import os
 import webbrowser
 
 # ========== ML FEATURES IMPORT ==========
 try:
-    from python_backend.intent_classifier import classify_intent, get_intent
+    from python_backend.intent_classifier import classify_intent, classify_intent_keywords, get_intent
     from python_backend.conversation_memory import add_to_memory, get_memory_history
     from python_backend.semantic_search import get_semantic_response, learn_response
-    from python_backend.sentiment_analyzer import analyze_sentiment, get_empathetic_prefix
+    from python_backend.sentiment_analyzer import analyze_sentiment, analyze_sentiment_keywords, get_sentiment_analyzer
+    from python_backend.model_manager import get_model_manager
+    from python_backend.hot_commands import lookup_hot_command
     from python_backend.ai_providers import get_ai_response as get_provider_response
+    from python_backend.ai_providers import stream_ai_response as stream_provider_response
     from python_backend.ml_config import FEATURES, ENABLE_CONVERSATION_MEMORY
     ML_FEATURES_AVAILABLE = True
     log_info("ML features loaded successfully")
@@ -24,30 +28,17 @@ except ImportError as e:
     ML_FEATURES_AVAILABLE = False
     log_warning(f"ML features not available: {e}")
 
-def execute_direct_action(command: str):
+def execute_direct_action(command: str, parsed: ParsedCommand = None):
     """Execute direct action commands that weren't caught by system_control"""
     jarvis = get_jarvis()
-    command_lower = command.lower().strip()
+    parsed = parse_for(command, parsed)
     
     try:
         # Enhanced command parsing for natural language
-        log_info(f"Parsing direct action: {command_lower}")
+        log_info(f"Parsing direct action: {parsed.text}")
         
-        # Common Hindi/Hinglish patterns
-        hinglish_patterns = {
-            'kholo': 'open',
-            'band': 'close',
-            'chalu': 'start',
-            'shuru': 'start',
-            'karo': 'do',
-            'dijiye': 'please',
-            'kripya': 'please'
-        }
-        
-        # Normalize command
-        normalized_command = command_lower
-        for hindi, english in hinglish_patterns.items():
-            normalized_command = normalized_command.replace(hindi, english)
+        # Hinglish verbs already normalized by the parser (kholo -> open, ...)
+        normalized_command = parsed.hinglish
         
         # Extract app/action name by removing trigger words
         app_name = normalized_command
@@ -99,13 +90,29 @@ def execute_direct_action(command: str):
         log_error(f"Direct action error: {e}")
         return None
 
-def process_command(command: str, auto_speak: bool = True, session_id: str = None):
+def _consume_stream(stream, on_delta):
+    """Forward each delta of a token stream to on_delta and return the joined text"""
+    parts = []
+    for delta in stream:
+        parts.append(delta)
+        try:
+            on_delta(delta)
+        except Exception as e:
+            log_warning(f"Delta callback failed (non-critical): {e}")
+    return "".join(parts).strip() or None
+
+def process_command(command: str, auto_speak: bool = True, session_id: str = None, on_delta=None,
+                    prompt_session: str = None):
     """Process user command and return response - DIRECT COMMAND EXECUTION MODE
     
     Args:
         command: User command string
         auto_speak: If True, automatically speak the response (default: True)
         session_id: Session ID for conversation memory (optional)
+        on_delta: Optional callback receiving LLM token deltas as they stream in.
+            The returned string is still the complete, final response.
+        prompt_session: Key of the LM Studio / llama.cpp prompt state
+            (default: session_id), e.g. one per WebSocket connection
         
     Returns:
         str: Response from VEDA AI
@@ -136,19 +143,40 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
     except Exception as e:
         log_warning(f"Context tracking failed (non-critical): {e}")
     
+    # Parse once: sanitized text, tokens, language, entities and keyword
+    # features are shared by every stage below
+    parsed = parse_command(command)
+    
     # ========== ML FEATURES: Intent Classification & Sentiment ==========
     intent_info = None
     sentiment_info = None
+    hot = None
     
     if ML_FEATURES_AVAILABLE:
         try:
-            # Classify intent for better understanding (with timeout protection)
-            intent_info = classify_intent(command)
+            # Keyword-only analysis until the models have warmed up
+            models = get_model_manager()
+            
+            # Frequent commands reuse their precomputed analysis
+            hot = lookup_hot_command(parsed)
+            
+            # Classify intent for better understanding
+            if hot:
+                intent_info = hot["intent"]
+            elif models.is_ready("intent"):
+                intent_info = classify_intent(parsed)
+            else:
+                intent_info = classify_intent_keywords(parsed)
             if intent_info:
                 log_info(f"Intent: {intent_info.get('intent', 'unknown')} (confidence: {intent_info.get('confidence', 0):.2f})")
             
             # Analyze sentiment for empathetic responses
-            sentiment_info = analyze_sentiment(command)
+            if hot:
+                sentiment_info = hot["sentiment"]
+            elif models.is_ready("sentiment"):
+                sentiment_info = analyze_sentiment(parsed)
+            else:
+                sentiment_info = analyze_sentiment_keywords(parsed)
             if sentiment_info:
                 log_info(f"Sentiment: {sentiment_info.get('sentiment', 'neutral')}")
         except Exception as e:
@@ -156,10 +184,10 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
             intent_info = {"intent": "unknown", "confidence": 0}
             sentiment_info = {"sentiment": "neutral", "confidence": 0}
     
-    # Validate and sanitize input
-    from python_backend.utils import sanitize_input, validate_command
+    # Validate input (sanitized by the parser)
+    from python_backend.utils import validate_command
     
-    command = sanitize_input(command)
+    command = parsed.original
     if not command:
         return "Could not process your command. Please try again."
         
@@ -168,13 +196,13 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
         return "I cannot process that command for security reasons."
     
     original_command = command
-    command = command.lower().strip()
+    command = parsed.text
+    features = parsed.features
     
-    log_info(f"Processing command: {command}")
+    log_info(f"Processing command: {command} (language: {parsed.language})")
     
     # Handle greetings with personality
-    greeting_words = ['hello', 'hi', 'hey', 'namaste', 'namaskar', 'good morning', 'good afternoon', 'good evening']
-    if any(word in command for word in greeting_words):
+    if features.has("greeting"):
         response = jarvis.get_greeting()
         if auto_speak:
             speak(response)
@@ -182,11 +210,7 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
     
     # 🎯 ACKNOWLEDGE COMMAND FIRST (like JARVIS does)
     # Don't acknowledge for simple queries, only for action commands
-    action_keywords = ['open', 'close', 'start', 'stop', 'play', 'pause', 'shutdown', 'restart', 
-                       'volume', 'brightness', 'search', 'find', 'create', 'delete', 'run',
-                       'kholo', 'band', 'chalu', 'shuru', 'karo', 'बंद', 'खोलो', 'चालू']
-    
-    is_action_command = any(keyword in command for keyword in action_keywords)
+    is_action_command = features.has("action")
     
     if is_action_command and auto_speak:
         # Acknowledge the command immediately
@@ -196,7 +220,7 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
 
     try:
         # 1️⃣ WEATHER COMMAND
-        if "weather" in command or "mausam" in command or "मौसम" in command:
+        if features.has("weather"):
             from python_backend.weather import get_weather_by_city, get_weather_multiple_cities
             
             # Acknowledge weather query
@@ -205,13 +229,13 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
                 speak(ack)
             
             # Detect language - default to Hinglish for better Hindi support
-            language = 'hinglish' if any(word in command for word in ['mausam', 'मौसम', 'kaisa', 'kaise', 'कैसा', 'कैसे']) else 'english'
+            language = 'hinglish' if features.has("weather_hinglish") else 'english'
             
             # Check for multiple cities (e.g., "delhi aur mumbai ka mausam")
             cities = []
-            if " aur " in command or " और " in command or " and " in command:
+            if features.has("city_separator"):
                 # Multiple cities detected
-                separator = " aur " if " aur " in command else (" और " if " और " in command else " and ")
+                separator = features.matched("city_separator")[0]
                 
                 # Extract cities
                 parts = command.replace(" और ", " aur ").replace(" and ", " aur ").split(" aur ")
@@ -271,7 +295,7 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
             return response
         
         # 2️⃣ SYSTEM COMMAND - Enhanced execution
-        system_response = handle_system_command(command)
+        system_response = handle_system_command(command, features)
         if system_response:
             # System response already has action, just return it
             # (acknowledgment was already spoken above if it's an action command)
@@ -284,7 +308,7 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
         # This handles commands like "chrome kholo", "notepad open karo", etc.
         if is_action_command:
             # Try to extract and execute the command
-            action_response = execute_direct_action(command)
+            action_response = execute_direct_action(command, parsed)
             if action_response:
                 if auto_speak:
                     speak(action_response)
@@ -294,15 +318,16 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
         # 3️⃣ CHECK LEARNED RESPONSES (Self-learning + Semantic Search)
         from python_backend.self_learning import get_learned_response, save_conversation
         
-        # Try semantic search first (ML-based)
-        if ML_FEATURES_AVAILABLE and FEATURES.get("semantic_similarity"):
+        # Try semantic search first (ML-based); hot commands carry the answer found when they were analyzed
+        hot_semantic = bool(hot) and "semantic" in hot
+        if hot_semantic or ML_FEATURES_AVAILABLE and FEATURES.get("semantic_similarity") and get_model_manager().is_ready("semantic"):
             try:
-                semantic_response = get_semantic_response(command)
+                semantic_response = hot["semantic"] if hot_semantic else get_semantic_response(command)
                 if semantic_response:
                     log_info("Using semantic learned response")
-                    # Add empathy based on sentiment
-                    if sentiment_info and sentiment_info.get("sentiment") in ["frustrated", "negative"]:
-                        semantic_response = get_empathetic_prefix(command) + semantic_response
+                    # Add empathy based on the sentiment already analyzed above
+                    if sentiment_info and sentiment_info.get("sentiment") in ["frustrated", "negative"] and get_model_manager().is_ready("sentiment"):
+                        semantic_response = get_sentiment_analyzer().get_empathetic_response(sentiment_info["sentiment"]) + semantic_response
                     if auto_speak:
                         speak(semantic_response)
                     return semantic_response
@@ -319,7 +344,7 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
             return learned_response
 
         # 4️⃣ AI RESPONSE - Multiple options with ML Enhancement
-        # AI_MODE comes from config: "lm_studio", "huggingface", "local", "openai", "claude", "groq"
+        # AI_MODE comes from config: "lm_studio", "llama_cpp", "huggingface", "local", "openai", "claude", "groq"
         mode = (AI_MODE or "self_training").lower()
         response = None
         
@@ -346,14 +371,17 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
                 log_error(f"Hugging Face error: {e_inner}")
 
             # Fallback to local AI (rule-based)
-            local_response = local_ai_response(prompt)
+            local_response = local_ai_response(prompt, features)
             log_info("Using local AI (rule-based, no external dependency)")
             return local_response
         
         # Try ML-based AI providers first (OpenAI, Claude, Groq)
-        if ML_FEATURES_AVAILABLE and mode in ["openai", "claude", "groq"]:
+        if ML_FEATURES_AVAILABLE and mode in ["openai", "claude", "groq", "llama_cpp"]:
             try:
-                response = get_provider_response(command, conversation_history, provider=mode)
+                if on_delta:
+                    response = _consume_stream(stream_provider_response(command, conversation_history, provider=mode, session_id=session_id, prompt_session=prompt_session), on_delta)
+                else:
+                    response = get_provider_response(command, conversation_history, provider=mode, session_id=session_id, prompt_session=prompt_session)
                 if response:
                     log_info(f"Using {mode} AI provider")
             except Exception as e:
@@ -362,9 +390,12 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
         if not response and mode == "lm_studio":
             # Prefer LM Studio, then Hugging Face, then local
             try:
-                from python_backend.lm_studio_ai import lm_studio_response
+                from python_backend.lm_studio_ai import lm_studio_response, lm_studio_stream
                 from python_backend.config import LM_STUDIO_MODEL
-                response = lm_studio_response(command, model=LM_STUDIO_MODEL)
+                if on_delta:
+                    response = _consume_stream(lm_studio_stream(command, model=LM_STUDIO_MODEL, session_id=prompt_session or session_id), on_delta)
+                else:
+                    response = lm_studio_response(command, model=LM_STUDIO_MODEL, session_id=prompt_session or session_id)
                 if response:
                     log_info(f"Using LM Studio model: {LM_STUDIO_MODEL}")
             except ImportError:
@@ -375,13 +406,17 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
             if not response:
                 response = _use_huggingface_or_local(command)
 
+        elif not response and mode == "llama_cpp":
+            # In-process GGUF model unavailable or still loading - stay offline
+            response = _use_huggingface_or_local(command)
+
         elif not response and mode == "huggingface":
             # Skip LM Studio completely, stay fully local/embedded
             response = _use_huggingface_or_local(command)
 
         elif not response and mode == "local":
             # Pure rule-based, no external model calls at all
-            response = local_ai_response(command)
+            response = local_ai_response(command, features)
             log_info("Using local AI only (rule-based, fully offline)")
 
         elif not response:
@@ -391,7 +426,10 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
             # First try ML providers if available
             if ML_FEATURES_AVAILABLE:
                 try:
-                    response = get_provider_response(command, conversation_history)
+                    if on_delta:
+                        response = _consume_stream(stream_provider_response(command, conversation_history, session_id=session_id, prompt_session=prompt_session), on_delta)
+                    else:
+                        response = get_provider_response(command, conversation_history, session_id=session_id, prompt_session=prompt_session)
                     if response:
                         log_info("Using ML AI provider (auto-selected)")
                 except Exception as e:
@@ -399,9 +437,12 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
             
             if not response:
                 try:
-                    from python_backend.lm_studio_ai import lm_studio_response
+                    from python_backend.lm_studio_ai import lm_studio_response, lm_studio_stream
                     from python_backend.config import LM_STUDIO_MODEL
-                    response = lm_studio_response(command, model=LM_STUDIO_MODEL)
+                    if on_delta:
+                        response = _consume_stream(lm_studio_stream(command, model=LM_STUDIO_MODEL, session_id=prompt_session or session_id), on_delta)
+                    else:
+                        response = lm_studio_response(command, model=LM_STUDIO_MODEL, session_id=prompt_session or session_id)
                     if response:
                         log_info(f"Using LM Studio model: {LM_STUDIO_MODEL}")
                 except ImportError:
@@ -418,7 +459,7 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
 
         # Add emotional intelligence layer (empathy / warmth)
         try:
-            response = jarvis.add_emotion_to_reply(original_command, response)
+            response = jarvis.add_emotion_to_reply(original_command, response, features)
         except Exception:
             # Never break core response path if emotion layer fails
             pass
@@ -448,14 +489,14 @@ def process_command(command: str, auto_speak: bool = True, session_id: str = Non
         # ========== ML ENHANCEMENT: Save to conversation memory ==========
         if ML_FEATURES_AVAILABLE and ENABLE_CONVERSATION_MEMORY:
             try:
-                add_to_memory(original_command, response, session_id)
+                add_to_memory(original_command, response, session_id, parsed=parsed)
             except Exception as e:
                 log_error(f"Memory save error: {e}")
         
-        # Learn for semantic search
+        # Learn for semantic search (queued until the semantic model is warm)
         if ML_FEATURES_AVAILABLE and FEATURES.get("semantic_similarity"):
             try:
-                learn_response(original_command, response)
+                get_model_manager().run_when_ready("semantic", learn_response, original_command, response)
             except Exception as e:
                 log_error(f"Semantic learn error: {e}")
         
@@ -9,12 +9,15 @@ from python_backend.jarvis_personality import get_jarvis
 from python_backend.ml_config import FEATURES, SYSTEM_PROMPT, ENABLE_CONVERSATION_MEMORY
 
 # Import ML components
-from python_backend.intent_classifier import classify_intent, get_intent
+from python_backend.intent_classifier import classify_intent, classify_intent_keywords, get_intent
 from python_backend.conversation_memory import (
     get_conversation_memory, add_to_memory, get_memory_history, get_memory_summary
 )
 from python_backend.semantic_search import get_semantic_response, learn_response
-from python_backend.sentiment_analyzer import analyze_sentiment, get_empathetic_prefix
+from python_backend.sentiment_analyzer import analyze_sentiment, analyze_sentiment_keywords, get_empathetic_prefix
+from python_backend.model_manager import get_model_manager
+from python_backend.hot_commands import lookup_hot_command, route_for_intent
+from python_backend.command_parser import ParsedCommand, parse_command
 
 # Import AI providers
 from python_backend.ai_providers import get_ai_response, check_provider_status
@@ -77,15 +80,30 @@ class EnhancedAIEngine:
         }
         
         try:
+            # Parse once; every step below reads the same ParsedCommand
+            parsed = parse_command(command)
+            
             # Step 1: Classify Intent
             log_info(f"Processing: {command[:50]}...")
-            intent_result = classify_intent(command)
+            models = get_model_manager()
+            hot = lookup_hot_command(parsed)
+            if hot:
+                intent_result = hot["intent"]
+            elif models.is_ready("intent"):
+                intent_result = classify_intent(parsed)
+            else:
+                intent_result = classify_intent_keywords(parsed)
             result["intent"] = intent_result
             log_info(f"Intent: {intent_result['intent']} ({intent_result['confidence']:.2f})")
             
             # Step 2: Analyze Sentiment
             if detect_sentiment and FEATURES.get("sentiment_analysis"):
-                sentiment_result = analyze_sentiment(command)
+                if hot:
+                    sentiment_result = hot["sentiment"]
+                elif models.is_ready("sentiment"):
+                    sentiment_result = analyze_sentiment(parsed)
+                else:
+                    sentiment_result = analyze_sentiment_keywords(parsed)
                 result["sentiment"] = sentiment_result
                 log_info(f"Sentiment: {sentiment_result['sentiment']}")
             
@@ -96,29 +114,35 @@ class EnhancedAIEngine:
             else:
                 conversation_history = None
             
-            # Step 4: Check for semantic learned response
-            if FEATURES.get("semantic_similarity"):
+            # Step 4: Check for semantic learned response (stored for hot commands)
+            semantic_response = None
+            if hot and "semantic" in hot:
+                semantic_response = hot["semantic"]
+            elif FEATURES.get("semantic_similarity") and models.is_ready("semantic"):
                 semantic_response = get_semantic_response(command)
-                if semantic_response:
-                    log_info("Using semantic learned response")
-                    result["response"] = self._enhance_response(
-                        semantic_response, 
-                        result.get("sentiment", {})
-                    )
-                    result["provider"] = "semantic"
-                    
-                    # Save to memory
-                    if use_memory:
-                        add_to_memory(command, result["response"], self.session_id)
-                    
-                    return result
+            if semantic_response:
+                log_info("Using semantic learned response")
+                result["response"] = self._enhance_response(
+                    semantic_response, 
+                    result.get("sentiment", {})
+                )
+                result["provider"] = "semantic"
+                
+                # Save to memory
+                if use_memory:
+                    add_to_memory(command, result["response"], self.session_id, parsed=parsed)
+                
+                return result
             
-            # Step 5: Route based on Intent
-            response = self._route_by_intent(
-                command,
-                intent_result["intent"],
-                conversation_history
-            )
+            # Step 5: Route based on Intent (only locally handled intents answer here)
+            route = hot["route"] if hot else route_for_intent(intent_result["intent"])
+            response = None
+            if route == "local":
+                response = self._route_by_intent(
+                    parsed,
+                    intent_result["intent"],
+                    conversation_history
+                )
             
             if response:
                 result["response"] = self._enhance_response(
@@ -128,7 +152,7 @@ class EnhancedAIEngine:
                 result["provider"] = "intent_router"
             else:
                 # Step 6: Use AI Provider
-                response = get_ai_response(command, conversation_history)
+                response = get_ai_response(command, conversation_history, session_id=self.session_id)
                 
                 if response:
                     result["response"] = self._enhance_response(
@@ -139,16 +163,16 @@ class EnhancedAIEngine:
                 else:
                     # Fallback to local AI
                     from python_backend.local_ai import local_ai_response
-                    result["response"] = local_ai_response(command)
+                    result["response"] = local_ai_response(parsed.text, parsed.features)
                     result["provider"] = "local"
             
             # Step 7: Save to Memory
             if use_memory and ENABLE_CONVERSATION_MEMORY:
-                add_to_memory(command, result["response"], self.session_id)
+                add_to_memory(command, result["response"], self.session_id, parsed=parsed)
             
             # Step 8: Learn from interaction (for future semantic search)
             if FEATURES.get("semantic_similarity"):
-                learn_response(command, result["response"])
+                models.run_when_ready("semantic", learn_response, command, result["response"])
             
             return result
             
@@ -160,11 +184,12 @@ class EnhancedAIEngine:
     
     def _route_by_intent(
         self,
-        command: str,
+        parsed: ParsedCommand,
         intent: str,
         conversation_history: Optional[list] = None
     ) -> Optional[str]:
         """Route command based on classified intent"""
+        features = parsed.features
         
         # Handle specific intents locally
         if intent == "greeting":
@@ -174,20 +199,20 @@ class EnhancedAIEngine:
             from datetime import datetime
             now = datetime.now()
             
-            if any(word in command.lower() for word in ["time", "samay", "baje"]):
+            if any(word in features for word in ["time", "samay", "baje"]):
                 time_str = now.strftime('%I:%M %p')
-                if any(word in command.lower() for word in ["samay", "baje"]):
+                if any(word in features for word in ["samay", "baje"]):
                     return f"{self.jarvis.owner_name}, abhi {time_str} baj rahe hain."
                 return f"{self.jarvis.owner_name}, it's {time_str}."
             
-            if any(word in command.lower() for word in ["date", "tarikh", "aaj"]):
+            if any(word in features for word in ["date", "tarikh", "aaj"]):
                 date_str = now.strftime('%A, %B %d, %Y')
-                if any(word in command.lower() for word in ["tarikh", "aaj"]):
+                if any(word in features for word in ["tarikh", "aaj"]):
                     return f"{self.jarvis.owner_name}, aaj {date_str} hai."
                 return f"{self.jarvis.owner_name}, today is {date_str}."
         
         # System control, weather, etc. - let main ai_engine handle
-        if intent in ["system_control", "volume_control", "weather"]:
+        if route_for_intent(intent) == "system":
             return None  # Will be handled by main system
         
         # For questions and conversations, use AI
@@ -224,6 +249,12 @@ class EnhancedAIEngine:
     def clear_memory(self):
         """Clear conversation memory"""
         self.memory.clear(self.session_id)
+        
+        # Local LLM transcripts / KV states would otherwise keep the old turns
+        from python_backend.lm_studio_ai import reset_lm_studio_session
+        from python_backend.llama_cpp_ai import get_llama_cpp_engine
+        reset_lm_studio_session(self.session_id or "default")
+        get_llama_cpp_engine().reset_session(self.session_id or "default")
         log_info("Conversation memory cleared")
     
     def set_context(self, key: str, value: any):
@@ -1,19 +1,59 @@
 """
 VEDA AI - Multi-Provider AI Integration
-Supports: OpenAI, Claude, Groq, Local Models
+Supports: OpenAI, Claude, Groq, LM Studio, in-process GGUF (llama.cpp), Local Models
 """
 
 import os
 import json
-from typing import Optional, List, Dict
+import threading
+import time
+from typing import Optional, List, Dict, Iterator
 from python_backend.logger import log_info, log_error, log_warning
 from python_backend.ml_config import (
     AI_PROVIDER, SYSTEM_PROMPT,
     OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MAX_TOKENS, OPENAI_TEMPERATURE,
     CLAUDE_API_KEY, CLAUDE_MODEL, CLAUDE_MAX_TOKENS,
     GROQ_API_KEY, GROQ_MODEL,
-    LM_STUDIO_URL, LM_STUDIO_MODEL
+    LM_STUDIO_URL, LM_STUDIO_MODEL,
+    LLAMA_CPP_MODEL_PATH
 )
+from python_backend.http_pool import get_http_session, get_httpx_client
+from python_backend.provider_router import ProviderRouter
+from python_backend.provider_health import get_health_monitor, STATE_UP
+from python_backend.prompt_builder import build_prompt
+
+# ========================================
+# SHARED SDK CLIENTS
+# ========================================
+# SDK clients are built once and reused so every call rides the same
+# keep-alive connection pool instead of paying a fresh TCP/TLS handshake.
+
+_sdk_clients: Dict[str, object] = {}
+
+def _get_sdk_client(provider: str):
+    """Get or create the cached SDK client for a provider"""
+    client = _sdk_clients.get(provider)
+    if client is not None:
+        return client
+    
+    http_client = get_httpx_client()
+    extra = {"http_client": http_client} if http_client is not None else {}
+    
+    if provider == "openai":
+        from openai import OpenAI
+        client = OpenAI(api_key=OPENAI_API_KEY, **extra)
+    elif provider == "claude":
+        from anthropic import Anthropic
+        client = Anthropic(api_key=CLAUDE_API_KEY, **extra)
+    elif provider == "groq":
+        from groq import Groq
+        client = Groq(api_key=GROQ_API_KEY, **extra)
+    else:
+        raise ValueError(f"Unknown SDK provider: {provider}")
+    
+    _sdk_clients[provider] = client
+    return client
+
 
 # ========================================
 # OPENAI PROVIDER
@@ -22,7 +62,9 @@ from python_backend.ml_config import (
 def get_openai_response(
     prompt: str,
     conversation_history: Optional[List[Dict]] = None,
-    system_prompt: str = SYSTEM_PROMPT
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None
 ) -> Optional[str]:
     """Get response from OpenAI GPT models"""
     
@@ -31,20 +73,14 @@ def get_openai_response(
         return None
     
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        messages = [{"role": "system", "content": system_prompt}]
+        client = _get_sdk_client("openai")
         
-        # Add conversation history if available
-        if conversation_history:
-            messages.extend(conversation_history[-10:])  # Last 10 turns
-        
-        messages.append({"role": "user", "content": prompt})
+        # History is fitted into the token budget (older turns summarized)
+        built = build_prompt("openai", prompt, conversation_history, system_prompt, session_id)
         
         response = client.chat.completions.create(
             model=OPENAI_MODEL,
-            messages=messages,
+            messages=built.chat_messages(),
             max_tokens=OPENAI_MAX_TOKENS,
             temperature=OPENAI_TEMPERATURE
         )
@@ -68,7 +104,9 @@ def get_openai_response(
 def get_claude_response(
     prompt: str,
     conversation_history: Optional[List[Dict]] = None,
-    system_prompt: str = SYSTEM_PROMPT
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None
 ) -> Optional[str]:
     """Get response from Anthropic Claude models"""
     
@@ -77,26 +115,16 @@ def get_claude_response(
         return None
     
     try:
-        from anthropic import Anthropic
-        client = Anthropic(api_key=CLAUDE_API_KEY)
-        
-        messages = []
+        client = _get_sdk_client("claude")
         
-        # Add conversation history if available
-        if conversation_history:
-            for msg in conversation_history[-10:]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        
-        messages.append({"role": "user", "content": prompt})
+        # History is fitted into the token budget (older turns summarized)
+        built = build_prompt("claude", prompt, conversation_history, system_prompt, session_id)
         
         response = client.messages.create(
             model=CLAUDE_MODEL,
             max_tokens=CLAUDE_MAX_TOKENS,
-            system=system_prompt,
-            messages=messages
+            system=built.system,
+            messages=built.messages
         )
         
         result = response.content[0].text
@@ -118,7 +146,9 @@ def get_claude_response(
 def get_groq_response(
     prompt: str,
     conversation_history: Optional[List[Dict]] = None,
-    system_prompt: str = SYSTEM_PROMPT
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None
 ) -> Optional[str]:
     """Get response from Groq (fast LLM inference)"""
     
@@ -127,20 +157,14 @@ def get_groq_response(
         return None
     
     try:
-        from groq import Groq
-        client = Groq(api_key=GROQ_API_KEY)
-        
-        messages = [{"role": "system", "content": system_prompt}]
+        client = _get_sdk_client("groq")
         
-        # Add conversation history if available
-        if conversation_history:
-            messages.extend(conversation_history[-10:])
-        
-        messages.append({"role": "user", "content": prompt})
+        # History is fitted into the token budget (older turns summarized)
+        built = build_prompt("groq", prompt, conversation_history, system_prompt, session_id)
         
         response = client.chat.completions.create(
             model=GROQ_MODEL,
-            messages=messages,
+            messages=built.chat_messages(),
             max_tokens=500,
             temperature=0.7
         )
@@ -164,25 +188,22 @@ def get_groq_response(
 def get_lm_studio_response(
     prompt: str,
     conversation_history: Optional[List[Dict]] = None,
-    system_prompt: str = SYSTEM_PROMPT
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None
 ) -> Optional[str]:
     """Get response from LM Studio local server"""
     
     try:
         import requests
         
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        if conversation_history:
-            messages.extend(conversation_history[-10:])
+        built = build_prompt("lm_studio", prompt, conversation_history, system_prompt, session_id)
         
-        messages.append({"role": "user", "content": prompt})
-        
-        response = requests.post(
+        response = get_http_session().post(
             f"{LM_STUDIO_URL}/chat/completions",
             json={
                 "model": LM_STUDIO_MODEL,
-                "messages": messages,
+                "messages": built.chat_messages(),
                 "max_tokens": 500,
                 "temperature": 0.7
             },
@@ -190,6 +211,7 @@ def get_lm_studio_response(
         )
         
         if response.status_code == 200:
+            get_health_monitor().report_success("lm_studio")
             result = response.json()["choices"][0]["message"]["content"]
             log_info(f"LM Studio response generated")
             return result
@@ -199,12 +221,291 @@ def get_lm_studio_response(
             
     except requests.exceptions.ConnectionError:
         log_warning("LM Studio not running. Start LM Studio and load a model.")
+        get_health_monitor().report_failure("lm_studio")
         return None
     except Exception as e:
         log_error(f"LM Studio error: {e}")
         return None
 
 
+# ========================================
+# LLAMA.CPP (IN-PROCESS GGUF) PROVIDER
+# ========================================
+
+def _llama_cpp_engine():
+    """The in-process engine if its model has loaded, else None (never blocks on a warm-up)"""
+    from python_backend.model_manager import get_model_manager
+    from python_backend.llama_cpp_ai import get_llama_cpp_engine
+    
+    if not get_model_manager().is_ready("llama_cpp"):
+        return None
+    engine = get_llama_cpp_engine()
+    return engine if engine.loaded else None
+
+
+def get_llama_cpp_response(
+    prompt: str,
+    conversation_history: Optional[List[Dict]] = None,
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None
+) -> Optional[str]:
+    """Get response from a GGUF model running in this process (no server)"""
+    
+    engine = _llama_cpp_engine()
+    if engine is None:
+        return None
+    
+    try:
+        built = build_prompt("llama_cpp", prompt, conversation_history, system_prompt, session_id)
+        result = engine.chat(built.chat_messages(), session_id=prompt_session or session_id or "default")
+        log_info("llama.cpp response generated")
+        return result
+    except Exception as e:
+        log_error(f"llama.cpp error: {e}")
+        return None
+
+
+# ========================================
+# STREAMING PROVIDERS
+# ========================================
+# Each stream_* function yields text deltas as they arrive and yields
+# nothing at all when the provider is unavailable, so callers can fall back.
+# A stream that fails midway just stops; report["finished"] is only set when
+# the provider ended the answer, so truncated answers are never cached.
+
+def _finished(report: Optional[Dict]):
+    if report is not None:
+        report["finished"] = True
+
+
+def stream_openai_response(
+    prompt: str,
+    conversation_history: Optional[List[Dict]] = None,
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None,
+    report: Optional[Dict] = None
+) -> Iterator[str]:
+    """Stream response deltas from OpenAI GPT models"""
+    
+    if not OPENAI_API_KEY:
+        log_warning("OpenAI API key not configured")
+        return
+    
+    try:
+        client = _get_sdk_client("openai")
+        
+        stream = client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=build_prompt("openai", prompt, conversation_history, system_prompt, session_id).chat_messages(),
+            max_tokens=OPENAI_MAX_TOKENS,
+            temperature=OPENAI_TEMPERATURE,
+            stream=True
+        )
+        
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+        
+        _finished(report)
+        log_info(f"OpenAI stream finished (model: {OPENAI_MODEL})")
+        
+    except ImportError:
+        log_error("OpenAI library not installed. Run: pip install openai")
+    except Exception as e:
+        log_error(f"OpenAI stream error: {e}")
+
+
+def stream_claude_response(
+    prompt: str,
+    conversation_history: Optional[List[Dict]] = None,
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None,
+    report: Optional[Dict] = None
+) -> Iterator[str]:
+    """Stream response deltas from Anthropic Claude models"""
+    
+    if not CLAUDE_API_KEY:
+        log_warning("Claude API key not configured")
+        return
+    
+    try:
+        client = _get_sdk_client("claude")
+        built = build_prompt("claude", prompt, conversation_history, system_prompt, session_id)
+        
+        with client.messages.stream(
+            model=CLAUDE_MODEL,
+            max_tokens=CLAUDE_MAX_TOKENS,
+            system=built.system,
+            messages=built.messages
+        ) as stream:
+            for text in stream.text_stream:
+                if text:
+                    yield text
+        
+        _finished(report)
+        log_info(f"Claude stream finished (model: {CLAUDE_MODEL})")
+        
+    except ImportError:
+        log_error("Anthropic library not installed. Run: pip install anthropic")
+    except Exception as e:
+        log_error(f"Claude stream error: {e}")
+
+
+def stream_groq_response(
+    prompt: str,
+    conversation_history: Optional[List[Dict]] = None,
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None,
+    report: Optional[Dict] = None
+) -> Iterator[str]:
+    """Stream response deltas from Groq"""
+    
+    if not GROQ_API_KEY:
+        log_warning("Groq API key not configured")
+        return
+    
+    try:
+        client = _get_sdk_client("groq")
+        
+        stream = client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=build_prompt("groq", prompt, conversation_history, system_prompt, session_id).chat_messages(),
+            max_tokens=500,
+            temperature=0.7,
+            stream=True
+        )
+        
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+        
+        _finished(report)
+        log_info(f"Groq stream finished (model: {GROQ_MODEL})")
+        
+    except ImportError:
+        log_error("Groq library not installed. Run: pip install groq")
+    except Exception as e:
+        log_error(f"Groq stream error: {e}")
+
+
+def stream_lm_studio_response(
+    prompt: str,
+    conversation_history: Optional[List[Dict]] = None,
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None,
+    report: Optional[Dict] = None
+) -> Iterator[str]:
+    """Stream response deltas from LM Studio local server"""
+    
+    if not get_health_monitor().is_up("lm_studio"):
+        return
+    
+    try:
+        import requests
+        from python_backend.lm_studio_ai import iter_sse_deltas
+        
+        with get_http_session().post(
+            f"{LM_STUDIO_URL}/chat/completions",
+            json={
+                "model": LM_STUDIO_MODEL,
+                "messages": build_prompt("lm_studio", prompt, conversation_history, system_prompt, session_id).chat_messages(),
+                "max_tokens": 500,
+                "temperature": 0.7,
+                "stream": True
+            },
+            timeout=60,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                log_error(f"LM Studio error: {response.status_code}")
+                return
+            
+            get_health_monitor().report_success("lm_studio")
+            yield from iter_sse_deltas(response, report)
+        
+        log_info("LM Studio stream finished")
+        
+    except requests.exceptions.ConnectionError:
+        log_warning("LM Studio not running. Start LM Studio and load a model.")
+        get_health_monitor().report_failure("lm_studio")
+    except Exception as e:
+        log_error(f"LM Studio stream error: {e}")
+
+
+def stream_llama_cpp_response(
+    prompt: str,
+    conversation_history: Optional[List[Dict]] = None,
+    system_prompt: str = SYSTEM_PROMPT,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None,
+    report: Optional[Dict] = None
+) -> Iterator[str]:
+    """Stream response deltas from the in-process GGUF model"""
+    
+    engine = _llama_cpp_engine()
+    if engine is None:
+        return
+    
+    try:
+        built = build_prompt("llama_cpp", prompt, conversation_history, system_prompt, session_id)
+        yield from engine.stream_chat(built.chat_messages(), session_id=prompt_session or session_id or "default")
+        _finished(report)
+        log_info("llama.cpp stream finished")
+    except Exception as e:
+        log_error(f"llama.cpp stream error: {e}")
+
+
+# ========================================
+# PROVIDER ROUTER
+# ========================================
+
+# Fallback chain until latency data reorders it: Groq -> OpenAI -> Claude -> LM Studio -> llama.cpp
+FALLBACK_ORDER = ["groq", "openai", "claude", "lm_studio", "llama_cpp"]
+
+_router = None
+_router_lock = threading.Lock()
+
+def _is_configured(provider: str) -> bool:
+    """Cloud providers need an API key, llama.cpp a model file; LM Studio is always worth a try"""
+    keys = {
+        "openai": OPENAI_API_KEY,
+        "claude": CLAUDE_API_KEY,
+        "groq": GROQ_API_KEY,
+        "llama_cpp": LLAMA_CPP_MODEL_PATH,
+    }
+    return bool(keys[provider]) if provider in keys else True
+
+
+def _is_available(provider: str) -> bool:
+    """Configured and not known to be down (cached state, never blocks)"""
+    return _is_configured(provider) and get_health_monitor().is_up(provider)
+
+
+def get_provider_router() -> ProviderRouter:
+    """Get or create the router shared by get_ai_response and stream_ai_response"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ProviderRouter(
+                    {
+                        "openai": get_openai_response,
+                        "claude": get_claude_response,
+                        "groq": get_groq_response,
+                        "lm_studio": get_lm_studio_response,
+                        "llama_cpp": get_llama_cpp_response,
+                    },
+                    fallback_order=FALLBACK_ORDER,
+                    available=_is_available
+                )
+    return _router
+
+
 # ========================================
 # UNIFIED AI INTERFACE
 # ========================================
@@ -212,41 +513,127 @@ def get_lm_studio_response(
 def get_ai_response(
     prompt: str,
     conversation_history: Optional[List[Dict]] = None,
-    provider: Optional[str] = None
+    provider: Optional[str] = None,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None
 ) -> Optional[str]:
     """
     Get AI response from configured provider with automatic fallback
     
-    Priority: Specified provider -> Configured provider -> Local fallback
+    Priority: Response cache -> Specified provider -> Configured provider -> Local fallback
+    
+    Providers are raced by the router: a slow provider is hedged with the
+    next one, failing providers are skipped by their circuit breaker and the
+    whole call is bounded by PROVIDER_DEADLINE.
+    
+    Each provider fits the history into its own token budget; session_id
+    selects the conversation whose older turns are summarized, and
+    prompt_session (default: session_id) the llama.cpp KV state to reuse.
     """
+    from python_backend.response_cache import get_response_cache
     
     provider = provider or AI_PROVIDER
+    cache = get_response_cache()
+    namespace = f"providers:{provider}"
     
-    providers = {
-        "openai": get_openai_response,
-        "claude": get_claude_response,
-        "groq": get_groq_response,
-        "lm_studio": get_lm_studio_response,
-    }
+    bypass = cache.should_bypass(prompt, conversation_history)
+    cached = cache.get(prompt, namespace, conversation_history, bypass)
+    if cached:
+        return cached
+    
+    response, answered_by = get_provider_router().route(
+        prompt, conversation_history, preferred=provider,
+        session_id=session_id, prompt_session=prompt_session
+    )
+    if response:
+        cache.put(prompt, namespace, answered_by, response, conversation_history, bypass)
+    return response
+
+
+def stream_ai_response(
+    prompt: str,
+    conversation_history: Optional[List[Dict]] = None,
+    provider: Optional[str] = None,
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Stream AI response deltas with the same fallback chain as get_ai_response
     
-    # Try specified provider first
-    if provider in providers:
-        response = providers[provider](prompt, conversation_history)
-        if response:
-            return response
+    A fallback provider is only tried if the previous one produced no output.
+    A cached answer is yielded as a single delta; a streamed answer is only
+    cached if the provider finished it.
+    """
+    from python_backend.response_cache import get_response_cache
     
-    # Fallback chain: Groq -> OpenAI -> Claude -> LM Studio
-    fallback_order = ["groq", "openai", "claude", "lm_studio"]
+    provider = provider or AI_PROVIDER
+    cache = get_response_cache()
+    namespace = f"providers:{provider}"
     
-    for fallback in fallback_order:
-        if fallback != provider and fallback in providers:
-            log_info(f"Trying fallback provider: {fallback}")
-            response = providers[fallback](prompt, conversation_history)
-            if response:
-                return response
+    bypass = cache.should_bypass(prompt, conversation_history)
+    cached = cache.get(prompt, namespace, conversation_history, bypass)
+    if cached:
+        yield cached
+        return
+    
+    answered_by = []
+    report = {}
+    parts = []
+    for delta in _stream_providers(prompt, conversation_history, provider, answered_by, session_id, prompt_session, report):
+        parts.append(delta)
+        yield delta
+    if answered_by and report.get("finished"):
+        cache.put(prompt, namespace, answered_by[0], "".join(parts).strip(), conversation_history, bypass)
+
+
+def _stream_providers(
+    prompt: str,
+    conversation_history: Optional[List[Dict]],
+    provider: str,
+    answered_by: List[str],
+    session_id: Optional[str] = None,
+    prompt_session: Optional[str] = None,
+    report: Optional[Dict] = None
+) -> Iterator[str]:
+    """Stream through the fallback chain; appends the answering provider to answered_by
+    and fills report with its stream report ("finished" if it completed the answer)
+    
+    Streams are not hedged (deltas go straight to the client), but they use
+    the router's ordering and circuit breakers and feed its statistics.
+    """
+    providers = {
+        "openai": stream_openai_response,
+        "claude": stream_claude_response,
+        "groq": stream_groq_response,
+        "lm_studio": stream_lm_studio_response,
+        "llama_cpp": stream_llama_cpp_response,
+    }
+    router = get_provider_router()
+    
+    for name in router.order(provider):
+        if name != provider:
+            log_info(f"Trying fallback provider: {name}")
+        
+        started = time.monotonic()
+        produced = False
+        attempt = {}
+        for delta in providers[name](
+            prompt, conversation_history, session_id=session_id, prompt_session=prompt_session, report=attempt
+        ):
+            if not produced:
+                # Time to first token is what the user waits for
+                router.record(name, time.monotonic() - started, True)
+            produced = True
+            yield delta
+        
+        if produced:
+            answered_by.append(name)
+            if report is not None:
+                report.update(attempt)
+            return
+        router.record(name, time.monotonic() - started, False)
     
     log_warning("All AI providers failed")
-    return None
 
 
 # ========================================
@@ -254,24 +641,22 @@ def get_ai_response(
 # ========================================
 
 def check_provider_status() -> Dict[str, bool]:
-    """Check which AI providers are configured and available"""
+    """Check which AI providers are configured and available
+    
+    Reads the health monitor's cached state instead of probing, so it never
+    blocks. LM Studio only counts once a probe has reached it.
+    """
+    monitor = get_health_monitor()
     
     status = {
-        "openai": bool(OPENAI_API_KEY),
-        "claude": bool(CLAUDE_API_KEY),
-        "groq": bool(GROQ_API_KEY),
-        "lm_studio": False,
+        "openai": _is_available("openai"),
+        "claude": _is_available("claude"),
+        "groq": _is_available("groq"),
+        "lm_studio": monitor.state("lm_studio") == STATE_UP,
+        "llama_cpp": _llama_cpp_engine() is not None,
         "local": True  # Local AI is always available
     }
     
-    # Check LM Studio connectivity
-    try:
-        import requests
-        response = requests.get(f"{LM_STUDIO_URL}/models", timeout=2)
-        status["lm_studio"] = response.status_code == 200
-    except:
-        pass
-    
     return status
 
 
@@ -0,0 +1,173 @@
+"""
+VEDA AI - Command Dispatcher
+Runs blocking command processing off the asyncio event loop on a bounded worker pool
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional
+from python_backend.logger import log_info, log_error, log_warning
+from python_backend.config import DISPATCH_MODE, DISPATCH_WORKERS, DISPATCH_MAX_QUEUE, DISPATCH_RETRY_AFTER
+
+# ========================================
+# ERRORS
+# ========================================
+
+class DispatcherBusy(Exception):
+    """Raised when the dispatch queue is full and the command was not accepted"""
+
+    def __init__(self, retry_after: int = DISPATCH_RETRY_AFTER):
+        super().__init__("Server busy, please retry")
+        self.retry_after = retry_after
+
+
+# ========================================
+# COMMAND DISPATCHER
+# ========================================
+
+class CommandDispatcher:
+    """
+    Dispatches synchronous work (process_command) to a thread or process pool
+
+    - Commands from the same connection run one at a time, in arrival order
+    - Commands from different connections run concurrently
+    - At most max_queue commands may be waiting or running; extra ones are rejected
+    """
+
+    def __init__(
+        self,
+        mode: str = DISPATCH_MODE,
+        workers: int = DISPATCH_WORKERS,
+        max_queue: int = DISPATCH_MAX_QUEUE
+    ):
+        self.mode = mode if mode in ("thread", "process") else "thread"
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self._executor = None
+        self._connection_locks: Dict[str, asyncio.Lock] = {}
+
+        # Metrics
+        self.pending = 0
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._latencies = deque(maxlen=500)
+        self._waits = deque(maxlen=500)
+
+    def _get_executor(self):
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            if self.mode == "process":
+                # Each worker process keeps its own model/memory singletons
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="veda-dispatch"
+                )
+            log_info(f"Command dispatcher started ({self.mode} pool, {self.workers} workers, max queue {self.max_queue})")
+        return self._executor
+
+    async def run(self, connection_id: str, func: Callable, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) on the worker pool and await its result
+
+        Raises:
+            DispatcherBusy: if the queue is already full
+        """
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            log_warning(f"Dispatch queue full ({self.pending}/{self.max_queue}), rejecting command from {connection_id}")
+            raise DispatcherBusy()
+
+        self.pending += 1
+        self.submitted += 1
+        queued_at = time.perf_counter()
+        lock = self._connection_locks.setdefault(connection_id, asyncio.Lock())
+
+        try:
+            async with lock:
+                started_at = time.perf_counter()
+                self._waits.append(started_at - queued_at)
+                self.running += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(
+                        self._get_executor(),
+                        partial(func, *args, **kwargs)
+                    )
+                    self.completed += 1
+                    return result
+                except Exception as e:
+                    self.failed += 1
+                    log_error(f"Dispatched command failed: {e}")
+                    raise
+                finally:
+                    self.running -= 1
+                    self._latencies.append(time.perf_counter() - started_at)
+        finally:
+            self.pending -= 1
+
+    def release_connection(self, connection_id: str):
+        """Forget per-connection state once a client disconnects"""
+        lock = self._connection_locks.get(connection_id)
+        if lock is not None and not lock.locked():
+            del self._connection_locks[connection_id]
+
+    def get_stats(self) -> Dict:
+        """Get queue and latency metrics"""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "connections": len(self._connection_locks),
+            "latency_ms": _summarize(self._latencies),
+            "queue_wait_ms": _summarize(self._waits),
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            log_info("Command dispatcher stopped")
+
+
+def _summarize(samples: deque) -> Dict[str, Optional[float]]:
+    """Average / p50 / p95 / max of a sample window, in milliseconds"""
+    if not samples:
+        return {"avg": None, "p50": None, "p95": None, "max": None}
+
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "avg": round(sum(ordered) / count * 1000, 2),
+        "p50": round(ordered[count // 2] * 1000, 2),
+        "p95": round(ordered[min(count - 1, int(count * 0.95))] * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+# ========================================
+# GLOBAL INSTANCE
+# ========================================
+
+_dispatcher = None
+
+def get_command_dispatcher() -> CommandDispatcher:
+    """Get or create global command dispatcher"""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = CommandDispatcher()
+    return _dispatcher
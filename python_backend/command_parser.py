@@ -0,0 +1,142 @@
+"""
+VEDA AI - Command Parser
+Parses a command once per request; every pipeline stage reads the same ParsedCommand
+"""
+
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+from python_backend.utils import sanitize_input
+from python_backend.keyword_automaton import CommandFeatures, scan_command
+
+# ========================================
+# PARSING TABLES
+# ========================================
+
+# Hindi/Hinglish verbs mapped to their English equivalents (substring replace)
+HINGLISH_NORMALIZATION = {
+    'kholo': 'open',
+    'band': 'close',
+    'chalu': 'start',
+    'shuru': 'start',
+    'karo': 'do',
+    'dijiye': 'please',
+    'kripya': 'please'
+}
+
+# Romanized Hindi words that mark a command as Hinglish
+HINGLISH_MARKERS = frozenset({
+    'hai', 'hain', 'hoon', 'kya', 'kaise', 'kaisa', 'kab', 'kahan', 'kaun', 'kyun',
+    'mein', 'ka', 'ki', 'ke', 'ko', 'karo', 'kar', 'kholo', 'chalu', 'shuru', 'batao',
+    'aaj', 'mausam', 'samay', 'baje', 'tarikh', 'nahi', 'haan', 'mera', 'meri',
+    'tum', 'aap', 'dijiye', 'kripya', 'zara', 'thoda', 'madad', 'shukriya'
+})
+
+# Entity patterns: (label, pattern, case_sensitive) - case-insensitive patterns
+# run on the lowercased text, case-sensitive ones on the original text
+ENTITY_PATTERNS = [
+    ("user_name", r"my name is (\w+)", False),
+    ("user_name", r"i am (\w+)", False),
+    ("user_name", r"call me (\w+)", False),
+    ("user_name", r"mera naam (\w+)", False),
+    ("user_name", r"main (\w+) hoon", False),
+    ("location", r"(?:in|at|from|near)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)", True),
+    ("location", r"([A-Z][a-z]+)\s+(?:mein|me|ka|ki|ke)", True),
+]
+
+_TOKEN_RE = re.compile(r'\b\w+\b')
+_DEVANAGARI_RE = re.compile(r'[\u0900-\u097F]')
+_HINGLISH_RE = re.compile('|'.join(re.escape(k) for k in HINGLISH_NORMALIZATION))
+_ENTITY_RES = [(label, re.compile(pattern), case_sensitive) for label, pattern, case_sensitive in ENTITY_PATTERNS]
+
+# ========================================
+# PARSED COMMAND
+# ========================================
+
+class Entity(NamedTuple):
+    """Entity span; start/end index into ParsedCommand.original"""
+    label: str
+    value: str
+    start: int
+    end: int
+
+
+class ParsedCommand:
+    """
+    Everything the pipeline derives from a command's text, computed once
+
+    - source:   the string that was parsed
+    - original: sanitized text, case preserved
+    - text:     sanitized, lowercased text
+    - words:    whitespace-split words of text
+    - tokens:   regex word tokens of text (token_set for lookups)
+    - hinglish: text with Hinglish verbs replaced by English ones
+    - language: "hindi" (Devanagari), "hinglish" or "english"
+    - entities: user_name / location spans
+    - features: keyword automaton matches (see keyword_automaton)
+    """
+
+    __slots__ = ("source", "original", "text", "words", "tokens", "token_set",
+                 "hinglish", "language", "entities", "features", "_cache")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.original = sanitize_input(source)
+        self.text = self.original.lower()
+        self.words = self.text.split()
+        self.tokens = _TOKEN_RE.findall(self.text)
+        self.token_set = frozenset(self.tokens)
+        self.hinglish = _HINGLISH_RE.sub(lambda m: HINGLISH_NORMALIZATION[m.group(0)], self.text)
+        self.language = self._detect_language()
+        self.entities = self._extract_entities()
+        self.features: CommandFeatures = scan_command(self.text)
+        self._cache: Dict[str, object] = {}
+
+    def _detect_language(self) -> str:
+        if _DEVANAGARI_RE.search(self.text):
+            return "hindi"
+        if self.token_set & HINGLISH_MARKERS:
+            return "hinglish"
+        return "english"
+
+    def _extract_entities(self) -> List[Entity]:
+        entities = []
+        for label, regex, case_sensitive in _ENTITY_RES:
+            target = self.original if case_sensitive else self.text
+            for match in regex.finditer(target):
+                entities.append(Entity(label, match.group(1), match.start(1), match.end(1)))
+        return entities
+
+    def entity(self, label: str) -> Optional[str]:
+        """First entity value with this label (pattern order), or None"""
+        for entity in self.entities:
+            if entity.label == label:
+                return entity.value
+        return None
+
+    def cached(self, key: str, compute: Callable[[], object]):
+        """Memoize an analyzer result so later stages reuse it"""
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def __repr__(self) -> str:
+        return f"ParsedCommand({self.text!r}, language={self.language!r})"
+
+
+def parse_command(text: str) -> ParsedCommand:
+    """Parse a command once at the start of a request"""
+    return ParsedCommand(text or "")
+
+
+def normalize_key(text: str) -> str:
+    """Lookup key for caches: lowercase, collapsed whitespace, no trailing punctuation"""
+    return " ".join((text or "").lower().split()).strip(" ?!.")
+
+
+def parse_for(text: Union[str, ParsedCommand], parsed: ParsedCommand = None) -> ParsedCommand:
+    """Reuse a ParsedCommand if it describes this text, else parse it"""
+    if isinstance(text, ParsedCommand):
+        return text
+    if parsed is not None and text in (parsed.source, parsed.original, parsed.text):
+        return parsed
+    return parse_command(text)
@@ -7,11 +7,14 @@ load_dotenv()
 # OPENAI_KEY = os.getenv("OPENAI_API_KEY")
 
 # Self-training AI Configuration
-AI_MODE = os.getenv("AI_MODE", "self_training")  # lm_studio, huggingface, or local
+AI_MODE = os.getenv("AI_MODE", "self_training")  # lm_studio, llama_cpp, huggingface, or local
 LM_STUDIO_MODEL = os.getenv("LM_STUDIO_MODEL", "local-model")  # Model loaded in LM Studio
 LM_STUDIO_API_URL = os.getenv("LM_STUDIO_API_URL", "http://localhost:1234")  # LM Studio default port
 LM_STUDIO_TIMEOUT = int(os.getenv("LM_STUDIO_TIMEOUT", "60"))  # Timeout in seconds
 LM_STUDIO_MAX_RETRIES = int(os.getenv("LM_STUDIO_MAX_RETRIES", "2"))  # Number of retries on timeout
+LM_STUDIO_SESSION_MODE = os.getenv("LM_STUDIO_SESSION_MODE", "true").lower() == "true"  # Append-only transcript per session so the server's prompt cache hits
+LM_STUDIO_SESSION_TOKENS = int(os.getenv("LM_STUDIO_SESSION_TOKENS", "1500"))  # Transcript size at which the oldest half of the turns is dropped
+LM_STUDIO_MAX_SESSIONS = int(os.getenv("LM_STUDIO_MAX_SESSIONS", "32"))  # Session transcripts kept in memory
 
 # Backward compatibility (for old code that uses OLLAMA variables)
 OLLAMA_MODEL = LM_STUDIO_MODEL
@@ -19,3 +22,40 @@ OLLAMA_API_URL = LM_STUDIO_API_URL
 OLLAMA_TIMEOUT = LM_STUDIO_TIMEOUT
 OLLAMA_MAX_RETRIES = LM_STUDIO_MAX_RETRIES
 
+
+# Command dispatch (WebSocket commands run off the event loop)
+DISPATCH_MODE = os.getenv("DISPATCH_MODE", "thread")  # thread or process
+DISPATCH_WORKERS = int(os.getenv("DISPATCH_WORKERS", "4"))  # Worker pool size
+DISPATCH_MAX_QUEUE = int(os.getenv("DISPATCH_MAX_QUEUE", "32"))  # Max commands waiting or running
+DISPATCH_RETRY_AFTER = int(os.getenv("DISPATCH_RETRY_AFTER", "2"))  # Seconds clients should wait when busy
+
+# Stream LLM token deltas to WebSocket clients as they are generated
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+
+# Shared outbound HTTP connection pool
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # Number of hosts kept pooled
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))  # Keep-alive connections per host
+HTTP_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "false").lower() == "true"  # Wait for a free connection instead of opening extra ones
+HTTP_USE_HTTP2 = os.getenv("HTTP_USE_HTTP2", "true").lower() == "true"  # HTTP/2 for httpx clients (needs h2)
+
+# Context awareness write-behind (counters are flushed to disk in the background)
+CONTEXT_FLUSH_INTERVAL = float(os.getenv("CONTEXT_FLUSH_INTERVAL", "30"))  # Seconds between background flushes
+CONTEXT_FLUSH_THRESHOLD = int(os.getenv("CONTEXT_FLUSH_THRESHOLD", "50"))  # Flush early after this many changes
+
+# Load ML models on a background thread after startup (false = load on first use)
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() == "true"
+
+# Weather cache (repeat lookups are served from memory)
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))  # Seconds a weather result is fresh
+WEATHER_CACHE_STALE_TTL = int(os.getenv("WEATHER_CACHE_STALE_TTL", "3600"))  # Seconds a stale result is still served while refreshing
+WEATHER_CACHE_LOCATION_TTLS = os.getenv("WEATHER_CACHE_LOCATION_TTLS", "")  # Per-location overrides, e.g. "delhi=300,auto:ip=900"
+
+# Background health probes for AI backends (LM Studio, cloud providers)
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "60"))  # Seconds between probes of a healthy backend
+HEALTH_MAX_BACKOFF = float(os.getenv("HEALTH_MAX_BACKOFF", "300"))  # Max seconds between probes of a down backend
+
+# Concurrent weather fetching
+WEATHER_FETCH_WORKERS = int(os.getenv("WEATHER_FETCH_WORKERS", "8"))  # Threads shared by all weather lookups
+WEATHER_HEDGE_DELAY = float(os.getenv("WEATHER_HEDGE_DELAY", "1.5"))  # Seconds before Open-Meteo races a slow wttr.in
+WEATHER_FETCH_TIMEOUT = float(os.getenv("WEATHER_FETCH_TIMEOUT", "10"))  # Max seconds for one city (both sources)
+WEATHER_MULTI_DEADLINE = float(os.getenv("WEATHER_MULTI_DEADLINE", "8"))  # Max seconds for a multi-city answer (partial results after)
@@ -2,11 +2,16 @@
 Context Awareness System - VEDA AI understands user patterns and context
 Tracks usage, predicts needs, and provides proactive suggestions
 """
+import atexit
+import copy
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from collections import defaultdict
 from python_backend.logger import log_info, log_error
+from python_backend.utils import atomic_write_json
+from python_backend.config import CONTEXT_FLUSH_INTERVAL, CONTEXT_FLUSH_THRESHOLD
 
 CONTEXT_DATA_FILE = "data/context_data.json"
 USER_PATTERNS_FILE = "data/user_patterns.json"
@@ -14,11 +19,22 @@ USER_PATTERNS_FILE = "data/user_patterns.json"
 class ContextAwareness:
     """Tracks and analyzes user behavior patterns"""
     
-    def __init__(self):
+    def __init__(self, flush_interval=CONTEXT_FLUSH_INTERVAL, flush_threshold=CONTEXT_FLUSH_THRESHOLD):
         self.context_data = {}
         self.user_patterns = {}
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty = 0
+        self._stop_event = threading.Event()
         self.ensure_data_files()
         self.load_context_data()
+        
+        # Write-behind: counters live in memory and are flushed periodically
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+        atexit.register(self.flush)
     
     def ensure_data_files(self):
         """Create context data files"""
@@ -56,50 +72,87 @@ class ContextAwareness:
             log_error(f"Error loading context data: {e}")
     
     def save_context_data(self):
-        """Save context data"""
+        """Save context data (atomic temp-file + rename)"""
         try:
-            with open(CONTEXT_DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.context_data, f, indent=2, ensure_ascii=False)
-            
-            with open(USER_PATTERNS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.user_patterns, f, indent=2, ensure_ascii=False)
+            with self._write_lock:
+                with self._lock:
+                    # Snapshot under the lock so trackers can't mutate mid-dump
+                    context_snapshot = copy.deepcopy(self.context_data)
+                    patterns_snapshot = copy.deepcopy(self.user_patterns)
+                    written = self._dirty
+                
+                atomic_write_json(CONTEXT_DATA_FILE, context_snapshot)
+                atomic_write_json(USER_PATTERNS_FILE, patterns_snapshot)
+                
+                # Only now are the snapshotted changes on disk; changes made
+                # during the write stay dirty, and a failed write keeps all of them
+                with self._lock:
+                    self._dirty = max(self._dirty - written, 0)
         except Exception as e:
             log_error(f"Error saving context data: {e}")
     
+    def _mark_dirty(self) -> bool:
+        """Record a change (call with the lock held); True once an early flush is due"""
+        self._dirty += 1
+        return self._dirty >= self.flush_threshold
+    
+    def flush(self):
+        """Write pending changes to disk now (no-op if nothing changed)"""
+        if self._dirty:
+            self.save_context_data()
+    
+    def _flush_loop(self):
+        """Background timer that flushes dirty counters"""
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+    
+    def stop(self):
+        """Stop the background flusher and write pending changes"""
+        self._stop_event.set()
+        self.flush()
+    
     def track_app_usage(self, app_name: str):
         """Track application usage"""
-        app_usage = self.context_data.get("app_usage", {})
-        
-        if app_name not in app_usage:
-            app_usage[app_name] = {
-                "count": 0,
-                "last_used": None,
-                "usage_times": []
-            }
-        
-        app_usage[app_name]["count"] += 1
-        app_usage[app_name]["last_used"] = datetime.now().isoformat()
-        app_usage[app_name]["usage_times"].append(datetime.now().hour)
+        with self._lock:
+            app_usage = self.context_data.get("app_usage", {})
+            
+            if app_name not in app_usage:
+                app_usage[app_name] = {
+                    "count": 0,
+                    "last_used": None,
+                    "usage_times": []
+                }
+            
+            app_usage[app_name]["count"] += 1
+            app_usage[app_name]["last_used"] = datetime.now().isoformat()
+            app_usage[app_name]["usage_times"].append(datetime.now().hour)
+            
+            self.context_data["app_usage"] = app_usage
+            flush_due = self._mark_dirty()
         
-        self.context_data["app_usage"] = app_usage
-        self.save_context_data()
+        if flush_due:
+            self.save_context_data()
     
     def track_command(self, command: str):
         """Track command frequency"""
-        cmd_freq = self.context_data.get("command_frequency", {})
-        
-        cmd_lower = command.lower()
-        if cmd_lower not in cmd_freq:
-            cmd_freq[cmd_lower] = {
-                "count": 0,
-                "last_used": None
-            }
-        
-        cmd_freq[cmd_lower]["count"] += 1
-        cmd_freq[cmd_lower]["last_used"] = datetime.now().isoformat()
+        with self._lock:
+            cmd_freq = self.context_data.get("command_frequency", {})
+            
+            cmd_lower = command.lower()
+            if cmd_lower not in cmd_freq:
+                cmd_freq[cmd_lower] = {
+                    "count": 0,
+                    "last_used": None
+                }
+            
+            cmd_freq[cmd_lower]["count"] += 1
+            cmd_freq[cmd_lower]["last_used"] = datetime.now().isoformat()
+            
+            self.context_data["command_frequency"] = cmd_freq
+            flush_due = self._mark_dirty()
         
-        self.context_data["command_frequency"] = cmd_freq
-        self.save_context_data()
+        if flush_due:
+            self.save_context_data()
     
     def get_current_context(self):
         """Get current context information"""
@@ -188,8 +241,6 @@ class ContextAwareness:
     
     def learn_pattern(self, action: str, context: dict):
         """Learn user patterns"""
-        daily_routine = self.user_patterns.get("daily_routine", [])
-        
         pattern = {
             "action": action,
             "time": context.get("hour"),
@@ -197,14 +248,19 @@ class ContextAwareness:
             "timestamp": datetime.now().isoformat()
         }
         
-        daily_routine.append(pattern)
-        
-        # Keep only last 100 patterns
-        if len(daily_routine) > 100:
-            daily_routine = daily_routine[-100:]
+        with self._lock:
+            daily_routine = self.user_patterns.get("daily_routine", [])
+            daily_routine.append(pattern)
+            
+            # Keep only last 100 patterns
+            if len(daily_routine) > 100:
+                daily_routine = daily_routine[-100:]
+            
+            self.user_patterns["daily_routine"] = daily_routine
+            flush_due = self._mark_dirty()
         
-        self.user_patterns["daily_routine"] = daily_routine
-        self.save_context_data()
+        if flush_due:
+            self.save_context_data()
     
     def get_frequent_tasks(self, limit=10):
         """Get most frequent tasks"""
@@ -228,9 +284,11 @@ class ContextAwareness:
     
     def create_shortcut(self, name: str, command: str):
         """Create a shortcut for frequent commands"""
-        shortcuts = self.user_patterns.get("shortcuts", {})
-        shortcuts[name.lower()] = command
-        self.user_patterns["shortcuts"] = shortcuts
+        with self._lock:
+            shortcuts = self.user_patterns.get("shortcuts", {})
+            shortcuts[name.lower()] = command
+            self.user_patterns["shortcuts"] = shortcuts
+        # Shortcuts are user-created, so persist right away
         self.save_context_data()
         log_info(f"Shortcut created: {name} -> {command}")
     
@@ -248,3 +306,8 @@ def get_context_awareness():
     if _context_awareness is None:
         _context_awareness = ContextAwareness()
     return _context_awareness
+
+def flush_context_data():
+    """Flush pending context counters to disk (call on shutdown)"""
+    if _context_awareness is not None:
+        _context_awareness.flush()
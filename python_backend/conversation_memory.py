@@ -10,6 +10,7 @@ from typing import List, Dict, Optional
 from collections import deque
 from python_backend.logger import log_info, log_error
 from python_backend.ml_config import MAX_CONVERSATION_TURNS, MEMORY_STORAGE
+from python_backend.command_parser import ParsedCommand, parse_for
 
 # ========================================
 # CONVERSATION MEMORY CLASS
@@ -24,6 +25,7 @@ class ConversationMemory:
         self.max_turns = max_turns
         self.conversations: Dict[str, deque] = {}  # session_id -> conversation
         self.context: Dict[str, Dict] = {}  # session_id -> context variables
+        self._messages: Dict[str, List[Dict]] = {}  # session_id -> cached message list
         self.storage_path = "data/conversation_memory.json"
         
         # Load previous conversations if using file storage
@@ -39,9 +41,10 @@ class ConversationMemory:
         user_message: str,
         assistant_message: str,
         session_id: Optional[str] = None,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        parsed: Optional[ParsedCommand] = None
     ):
-        """Add a conversation turn to memory"""
+        """Add a conversation turn to memory (parsed: the request's ParsedCommand, if any)"""
         sid = self._get_session_id(session_id)
         
         if sid not in self.conversations:
@@ -55,10 +58,11 @@ class ConversationMemory:
         }
         
         self.conversations[sid].append(turn)
+        self._messages.pop(sid, None)
         log_info(f"Added conversation turn (session: {sid}, total: {len(self.conversations[sid])})")
         
         # Extract and store context
-        self._extract_context(user_message, assistant_message, sid)
+        self._extract_context(parse_for(user_message, parsed), assistant_message, sid)
         
         # Save to file if using file storage
         if MEMORY_STORAGE == "file":
@@ -84,12 +88,15 @@ class ConversationMemory:
         turns = list(self.conversations[sid])
         
         if format == "messages":
-            # Convert to OpenAI message format
-            messages = []
-            for turn in turns:
-                messages.append({"role": "user", "content": turn["user"]})
-                messages.append({"role": "assistant", "content": turn["assistant"]})
-            return messages
+            # Convert to OpenAI message format (rebuilt only after a new turn)
+            messages = self._messages.get(sid)
+            if messages is None:
+                messages = []
+                for turn in turns:
+                    messages.append({"role": "user", "content": turn["user"]})
+                    messages.append({"role": "assistant", "content": turn["assistant"]})
+                self._messages[sid] = messages
+            return list(messages)
         
         return turns
     
@@ -131,41 +138,20 @@ class ConversationMemory:
             return ctx[key]["value"]
         return default
     
-    def _extract_context(self, user_msg: str, assistant_msg: str, session_id: str):
+    def _extract_context(self, parsed: ParsedCommand, assistant_msg: str, session_id: str):
         """Extract relevant context from conversation"""
-        # Extract mentioned names
-        import re
+        # Names ("my name is X") and locations come from the parser's entity spans
+        user_name = parsed.entity("user_name")
+        if user_name:
+            self.set_context("user_name", user_name.title(), session_id)
         
-        # Look for "my name is X" patterns
-        name_patterns = [
-            r"my name is (\w+)",
-            r"i am (\w+)",
-            r"call me (\w+)",
-            r"mera naam (\w+)",
-            r"main (\w+) hoon"
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, user_msg.lower())
-            if match:
-                self.set_context("user_name", match.group(1).title(), session_id)
-                break
-        
-        # Extract location mentions
-        location_patterns = [
-            r"(?:in|at|from|near)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)",
-            r"([A-Z][a-z]+)\s+(?:mein|me|ka|ki|ke)"
-        ]
-        
-        for pattern in location_patterns:
-            match = re.search(pattern, user_msg)
-            if match:
-                self.set_context("last_location", match.group(1), session_id)
-                break
+        location = parsed.entity("location")
+        if location:
+            self.set_context("last_location", location, session_id)
         
         # Track topics
         topics = self.get_context_value("topics", session_id, [])
-        words = user_msg.lower().split()
+        words = parsed.words
         topic_keywords = ["weather", "music", "news", "time", "date", "app", "file"]
         for keyword in topic_keywords:
             if keyword in words and keyword not in topics:
@@ -174,10 +160,17 @@ class ConversationMemory:
         if topics:
             self.set_context("topics", topics[-5:], session_id)  # Keep last 5 topics
     
-    def get_summary(self, session_id: Optional[str] = None) -> str:
-        """Get a summary of the conversation for context"""
+    def get_summary(self, session_id: Optional[str] = None, turns: Optional[List[Dict]] = None) -> str:
+        """
+        Get a summary of the conversation for context
+        
+        Args:
+            session_id: Session whose context (name, location, topics) is included
+            turns: Turns to summarize instead of the session's last 3
+                   (the prompt builder passes the turns it dropped)
+        """
         sid = self._get_session_id(session_id)
-        history = self.get_history(sid, format="turns")
+        history = self.get_history(sid, format="turns") if turns is None else turns
         
         if not history:
             return "No previous conversation."
@@ -195,7 +188,7 @@ class ConversationMemory:
             summary_parts.append(f"Topics discussed: {', '.join(ctx['topics']['value'])}")
         
         # Add recent turns summary
-        recent = history[-3:]  # Last 3 turns
+        recent = history[-3:] if turns is None else history
         for turn in recent:
             summary_parts.append(f"User asked about: {turn['user'][:50]}...")
         
@@ -209,6 +202,7 @@ class ConversationMemory:
             del self.conversations[sid]
         if sid in self.context:
             del self.context[sid]
+        self._messages.pop(sid, None)
         
         log_info(f"Conversation cleared (session: {sid})")
         
@@ -268,9 +262,9 @@ def get_conversation_memory() -> ConversationMemory:
     return _memory
 
 
-def add_to_memory(user_msg: str, assistant_msg: str, session_id: str = None):
+def add_to_memory(user_msg: str, assistant_msg: str, session_id: str = None, parsed: ParsedCommand = None):
     """Convenience function to add conversation turn"""
-    get_conversation_memory().add_turn(user_msg, assistant_msg, session_id)
+    get_conversation_memory().add_turn(user_msg, assistant_msg, session_id, parsed=parsed)
 
 
 def get_memory_history(session_id: str = None, format: str = "messages") -> List:
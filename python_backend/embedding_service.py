@@ -0,0 +1,183 @@
+"""
+VEDA AI - Shared Embedding Service
+Loads each sentence embedding model once and serves every module from it
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from python_backend.logger import log_info, log_error, log_warning
+from python_backend.micro_batcher import MicroBatcher
+from python_backend.ml_config import (
+    EMBEDDING_MODEL, EMBEDDING_CACHE_SIZE, EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_LATENCY_MS
+)
+
+# ========================================
+# SHARED EMBEDDING MODEL
+# ========================================
+
+class EmbeddingModel:
+    """
+    One SentenceTransformer shared by intent, semantic search and learning
+
+    - Loaded lazily, once, under a lock
+    - encode() returns L2-normalized float32 rows
+    - Recently seen texts are served from a per-text LRU cache, so a command
+      encoded for intent is not encoded again for semantic search
+    - Uncached texts from concurrent encode() calls go through a
+      micro-batcher: each caller gets a future, and the batcher runs one
+      forward pass once max_batch texts are queued or max_latency has
+      passed; bulk requests of max_batch texts or more skip the queue
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cache_size: int = EMBEDDING_CACHE_SIZE,
+        max_batch: int = EMBEDDING_BATCH_SIZE,
+        max_latency: float = EMBEDDING_BATCH_LATENCY_MS / 1000
+    ):
+        self.name = name
+        self.cache_size = cache_size
+        self.model = None
+        self.backend: Optional[str] = None
+        self.load_error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self._cache: "OrderedDict[str, object]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.batcher = MicroBatcher(
+            self._encode_now,
+            max_batch=max_batch,
+            max_latency=max_latency,
+            name=f"encode-{name}"
+        )
+
+        # Metrics
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bulk_calls = 0
+
+    def load(self) -> bool:
+        """Load the model if needed; returns True when it is available"""
+        if self.model is not None:
+            return True
+        if self.load_error is not None:
+            return False
+
+        with self._load_lock:
+            if self.model is None and self.load_error is None:
+                started = time.perf_counter()
+                try:
+                    from python_backend.model_optimizer import load_sentence_encoder
+                    self.model, self.backend = load_sentence_encoder(self.name)
+                    self.load_seconds = round(time.perf_counter() - started, 2)
+                    log_info(f"Embedding model loaded: {self.name} ({self.backend}, {self.load_seconds}s)")
+                except ImportError:
+                    self.load_error = "sentence-transformers not installed"
+                    log_warning("sentence-transformers not installed. Run: pip install sentence-transformers")
+                except Exception as e:
+                    self.load_error = str(e)
+                    log_error(f"Failed to load embedding model {self.name}: {e}")
+        return self.model is not None
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None
+
+    def encode(self, texts: List[str]):
+        """Encode texts to normalized float32 embeddings (cached, batched, thread-safe)"""
+        import numpy as np
+
+        if not self.load():
+            raise RuntimeError(f"Embedding model {self.name} unavailable: {self.load_error}")
+
+        vectors: Dict[str, object] = {}
+        with self._cache_lock:
+            for text in texts:
+                if text in vectors:
+                    continue
+                cached = self._cache.get(text)
+                if cached is not None:
+                    self._cache.move_to_end(text)
+                    vectors[text] = cached
+                    self.cache_hits += 1
+
+        missing = [text for text in dict.fromkeys(texts) if text not in vectors]
+        if missing:
+            self.cache_misses += len(missing)
+            for text, vector in zip(missing, self._encode_batched(missing)):
+                vectors[text] = vector
+            with self._cache_lock:
+                for text in missing:
+                    self._cache[text] = vectors[text]
+                    self._cache.move_to_end(text)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        if not texts:
+            dim = self.model.get_sentence_embedding_dimension()
+            return np.empty((0, dim), dtype=np.float32)
+        return np.vstack([vectors[text] for text in texts])
+
+    def _encode_batched(self, texts: List[str]):
+        """Encode texts, sharing a forward pass with concurrent callers"""
+        if len(texts) >= self.batcher.max_batch:
+            # Bulk work (training samples, knowledge base) is a batch already
+            self.bulk_calls += 1
+            return self._encode_now(texts)
+
+        futures = [self.batcher.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    def _encode_now(self, texts: List[str]):
+        """One model call for texts; returns normalized rows"""
+        from python_backend.vector_index import normalize_vectors
+
+        with self._encode_lock:
+            return normalize_vectors(self.model.encode(texts, batch_size=max(len(texts), 1)))
+
+    def get_stats(self) -> Dict:
+        """Get cache and batching statistics"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "model": self.name,
+            "loaded": self.model is not None,
+            "backend": self.backend,
+            "load_seconds": self.load_seconds,
+            "error": self.load_error,
+            "cache_size": len(self._cache),
+            "cache_hit_rate": round(self.cache_hits / lookups, 3) if lookups else None,
+            "bulk_calls": self.bulk_calls,
+            "batching": self.batcher.get_stats(),
+        }
+
+
+# ========================================
+# GLOBAL REGISTRY
+# ========================================
+
+_models: Dict[str, EmbeddingModel] = {}
+_registry_lock = threading.Lock()
+
+def get_embedding_model(name: str = EMBEDDING_MODEL) -> EmbeddingModel:
+    """Get the shared instance for a model name (not loaded until first use)"""
+    with _registry_lock:
+        model = _models.get(name)
+        if model is None:
+            model = EmbeddingModel(name)
+            _models[name] = model
+        return model
+
+
+def encode_texts(texts: List[str], name: str = EMBEDDING_MODEL):
+    """Convenience function to encode texts with a shared model"""
+    return get_embedding_model(name).encode(texts)
+
+
+def get_embedding_stats() -> Dict:
+    """Get statistics for every registered model"""
+    with _registry_lock:
+        return {name: model.get_stats() for name, model in _models.items()}
@@ -0,0 +1,238 @@
+"""
+VEDA AI - Append-Only Embedding Store
+Growable float32 embedding matrix backed by a single append-only file
+"""
+
+import os
+import struct
+import threading
+from typing import Dict, Optional
+import numpy as np
+from python_backend.logger import log_info, log_error, log_warning
+
+# ========================================
+# EMBEDDING STORE
+# ========================================
+
+class EmbeddingStore:
+    """
+    Append-only float32 matrix store
+
+    File layout: a 32-byte header (magic, dim, row count) followed by rows.
+
+    - append() writes only the new rows and then the header count, so insert
+      cost is amortized O(d) instead of re-stacking and re-saving the matrix
+    - The in-memory buffer doubles its capacity when full (no per-insert copy)
+    - With mmap=True the file itself is the buffer, grown by doubling on disk
+      (POSIX only: Windows cannot resize or replace a mapped file, so the
+      store falls back to RAM there)
+    - Rows past the header count (a crash between the two writes) are ignored
+    - replace() / compact() rewrite via temp file + rename (never half-written)
+    """
+
+    HEADER = struct.Struct("<8sqq8x")
+    MAGIC = b"VEDAEMB1"
+    MIN_CAPACITY = 64
+
+    def __init__(self, path: str, mmap: bool = False, legacy_path: Optional[str] = None):
+        self.path = path
+        self.mmap = mmap and os.name != "nt"
+        if mmap and not self.mmap:
+            log_warning("Memory-mapped embedding store is not supported on Windows, loading into RAM")
+        self.dim: Optional[int] = None
+        self._lock = threading.Lock()
+        self._data: Optional[np.ndarray] = None
+        self._count = 0
+        self._handle = None
+        self.appends = 0
+        self.grows = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not os.path.exists(path) and legacy_path and os.path.exists(legacy_path):
+            self._migrate_legacy(legacy_path)
+        self._load()
+
+    # ---------- file helpers ----------
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * 4
+
+    def _write_file(self, path: str, rows: np.ndarray):
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, rows.shape[1], len(rows)))
+            f.write(np.ascontiguousarray(rows, dtype=np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_count(self):
+        self._handle.seek(0)
+        self._handle.write(self.HEADER.pack(self.MAGIC, self.dim, self._count))
+        self._handle.flush()
+
+    def _map(self, capacity: int):
+        self._data = np.memmap(
+            self.path, dtype=np.float32, mode="r+",
+            offset=self.HEADER.size, shape=(capacity, self.dim)
+        )
+
+    def _release(self):
+        """Drop the buffer and file handle"""
+        if self._data is not None and self.mmap:
+            self._data.flush()
+        self._data = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _migrate_legacy(self, legacy_path: str):
+        """Import a matrix saved with np.save"""
+        try:
+            rows = np.atleast_2d(np.load(legacy_path).astype(np.float32))
+            self._write_file(self.path, rows)
+            log_info(f"Migrated {len(rows)} embeddings from {legacy_path} to {self.path}")
+        except Exception as e:
+            log_error(f"Embedding migration from {legacy_path} failed: {e}")
+
+    def _load(self):
+        """Open the store file and load (or map) its rows"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            self._handle = open(self.path, 'r+b')
+            magic, dim, count = self.HEADER.unpack(self._handle.read(self.HEADER.size))
+            if magic != self.MAGIC:
+                raise ValueError("not an embedding store file")
+
+            self.dim = dim
+            rows_on_disk = (os.path.getsize(self.path) - self.HEADER.size) // self._row_bytes
+            if count > rows_on_disk:
+                log_warning(f"Embedding store {self.path} is short ({rows_on_disk}/{count} rows), truncating")
+            self._count = min(count, rows_on_disk)
+
+            if self.mmap:
+                if rows_on_disk < self.MIN_CAPACITY:
+                    self._handle.truncate(self.HEADER.size + self.MIN_CAPACITY * self._row_bytes)
+                    rows_on_disk = self.MIN_CAPACITY
+                self._map(rows_on_disk)
+            else:
+                rows = np.fromfile(self._handle, dtype=np.float32, count=self._count * dim)
+                self._data = np.empty((max(self._count * 2, self.MIN_CAPACITY), dim), dtype=np.float32)
+                self._data[:self._count] = rows.reshape(self._count, dim)
+        except Exception as e:
+            log_error(f"Failed to load embedding store {self.path}: {e}")
+            self._release()
+            self._count = 0
+
+    def _reserve(self, needed: int):
+        """Make room for needed rows, doubling capacity"""
+        capacity = 0 if self._data is None else len(self._data)
+        if needed <= capacity:
+            return
+
+        new_capacity = max(needed, capacity * 2, self.MIN_CAPACITY)
+        if self.mmap:
+            # Unmap before resizing the file underneath the mapping
+            self._data.flush()
+            self._data = None
+            self._handle.truncate(self.HEADER.size + new_capacity * self._row_bytes)
+            self._map(new_capacity)
+        else:
+            grown = np.empty((new_capacity, self.dim), dtype=np.float32)
+            grown[:self._count] = self._data[:self._count]
+            self._data = grown
+        self.grows += 1
+
+    # ---------- public API ----------
+
+    @property
+    def vectors(self) -> Optional[np.ndarray]:
+        """
+        View of the stored rows (None when empty); with mmap the view maps
+        the current file, so use it and drop it rather than keeping it
+        across append() / replace()
+        """
+        data, count = self._data, self._count
+        if data is None or count == 0:
+            return None
+        return data[:count]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, rows: np.ndarray):
+        """Append rows (amortized O(rows x dim), thread-safe)"""
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float32))
+
+        with self._lock:
+            if self._handle is None:
+                if not os.path.exists(self.path):
+                    self._write_file(self.path, rows[:0])
+                self._load()
+            if rows.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {rows.shape[1]} does not match store ({self.dim})")
+
+            start = self._count
+            self._reserve(start + len(rows))
+            self._data[start:start + len(rows)] = rows
+            if not self.mmap:
+                self._handle.seek(self.HEADER.size + start * self._row_bytes)
+                self._handle.write(rows.tobytes())
+
+            # Rows first, then the count that makes them visible
+            self._count += len(rows)
+            self._write_count()
+            self.appends += len(rows)
+
+    def truncate(self, count: int):
+        """Forget rows past count (e.g. rows with no matching record after a crash)"""
+        with self._lock:
+            if count < self._count:
+                self._count = count
+                self._write_count()
+
+    def replace(self, rows: np.ndarray):
+        """Atomically replace every row (rebuilds, compaction)"""
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float32))
+
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            self._write_file(tmp_path, rows)
+            self._release()
+            os.replace(tmp_path, self.path)
+            self._count = 0
+            self._load()
+
+    def compact(self):
+        """Rewrite the file without preallocated slack"""
+        rows = self.vectors
+        if rows is not None and self.mmap:
+            self.replace(np.array(rows))
+            log_info(f"Embedding store compacted: {self.path} ({self._count} rows)")
+
+    def flush(self):
+        """Push buffered writes to disk"""
+        with self._lock:
+            if self._data is not None and self.mmap:
+                self._data.flush()
+            if self._handle is not None:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+
+    def close(self):
+        """Flush and close the store file"""
+        with self._lock:
+            self._release()
+
+    def get_stats(self) -> Dict:
+        """Get store statistics"""
+        return {
+            "path": self.path,
+            "rows": self._count,
+            "capacity": 0 if self._data is None else len(self._data),
+            "dim": self.dim,
+            "mmap": self.mmap,
+            "appends": self.appends,
+            "grows": self.grows,
+        }
@@ -0,0 +1,330 @@
+"""
+VEDA AI - Hot Command Table
+Precomputed intent, sentiment, semantic answer and route for the most frequent commands
+"""
+
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Union
+from python_backend.logger import log_info, log_error
+from python_backend.utils import atomic_write_json
+from python_backend.command_parser import ParsedCommand, normalize_key, parse_command, parse_for
+from python_backend.ml_config import (
+    HOT_COMMANDS_ENABLED, HOT_COMMANDS_SIZE, HOT_COMMANDS_MIN_COUNT, HOT_COMMANDS_REFRESH_INTERVAL
+)
+
+HOT_COMMANDS_FILE = "data/hot_commands.json"
+
+# Intents answered locally / handed to the system command handlers; the rest go to a provider
+LOCAL_INTENTS = ("greeting", "time_date")
+SYSTEM_INTENTS = ("system_control", "volume_control", "weather")
+
+
+def route_for_intent(intent: str) -> str:
+    """Where a command with this intent is handled: local, system or provider"""
+    if intent in LOCAL_INTENTS:
+        return "local"
+    if intent in SYSTEM_INTENTS:
+        return "system"
+    return "provider"
+
+
+# ========================================
+# HOT COMMAND TABLE
+# ========================================
+
+class HotCommandTable:
+    """
+    Memoized analysis of the commands the user repeats most
+
+    - Keys are normalized commands (lowercase, single spaces, no trailing
+      punctuation); a hit returns the stored intent and sentiment results,
+      the semantic search answer and the route, so the engines skip the
+      classifiers, the semantic search and the embedding model
+    - Built from context_awareness's command_frequency: every
+      HOT_COMMANDS_REFRESH_INTERVAL seconds (triggered by a miss, in the
+      background) the top HOT_COMMANDS_SIZE commands seen at least
+      HOT_COMMANDS_MIN_COUNT times are kept; only new ones are analyzed
+    - Entries are only computed once the intent model has warmed up;
+      entries analyzed before the sentiment or semantic model was ready are
+      redone once it is
+    - Persisted to data/hot_commands.json with a fingerprint of
+      INTENT_CATEGORIES and the learned intent model version; the table is
+      dropped when either changes, and whenever knowledge is added to the
+      semantic search
+    """
+
+    def __init__(
+        self,
+        path: str = HOT_COMMANDS_FILE,
+        max_entries: int = HOT_COMMANDS_SIZE,
+        min_count: int = HOT_COMMANDS_MIN_COUNT,
+        refresh_interval: float = HOT_COMMANDS_REFRESH_INTERVAL,
+        enabled: bool = HOT_COMMANDS_ENABLED
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.min_count = min_count
+        self.refresh_interval = refresh_interval
+        self.enabled = enabled and max_entries > 0
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._last_refresh = 0.0
+        self._fingerprint: Optional[str] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.computed = 0
+
+        if self.enabled:
+            self._load()
+
+    normalize = staticmethod(normalize_key)
+
+    @staticmethod
+    def fingerprint(model_version: Optional[int]) -> str:
+        """Intent categories hash + learned model version the entries were computed with"""
+        from python_backend.intent_trainer import intent_categories_hash
+        return f"{intent_categories_hash()}:v{model_version or 0}"
+
+    @staticmethod
+    def _running_fingerprint() -> str:
+        """Fingerprint of the intent classifier in this process"""
+        from python_backend.intent_classifier import get_intent_classifier
+        learned = get_intent_classifier().learned_model
+        return HotCommandTable.fingerprint(learned.version if learned is not None else None)
+
+    @staticmethod
+    def _disk_fingerprint() -> str:
+        """Fingerprint a freshly started classifier will have"""
+        from python_backend.ml_config import INTENT_MODEL_ENABLED
+        from python_backend.intent_trainer import latest_model_version
+        return HotCommandTable.fingerprint(latest_model_version() if INTENT_MODEL_ENABLED else None)
+
+    # ---------- lookup ----------
+
+    def lookup(self, text: Union[str, ParsedCommand]) -> Optional[Dict]:
+        """
+        {"intent", "sentiment", "route"} for a hot command, or None; plus
+        "semantic" (the learned answer or None) once semantic search has
+        been checked for it
+        """
+        if not self.enabled:
+            return None
+
+        key = self.normalize(parse_for(text).text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                result = {
+                    "intent": dict(entry["intent"]),
+                    "sentiment": dict(entry["sentiment"]),
+                    "route": entry["route"],
+                }
+                if "semantic" in entry["models"]:
+                    result["semantic"] = entry["semantic"]
+                return result
+            self.misses += 1
+
+        self._maybe_refresh()
+        return None
+
+    # ---------- building ----------
+
+    def _maybe_refresh(self):
+        """Start a background refresh if the table is due for one"""
+        if time.time() - self._last_refresh < self.refresh_interval:
+            return
+        if not self._refreshing.acquire(blocking=False):
+            return
+        self._last_refresh = time.time()
+        threading.Thread(target=self._refresh_locked, name="veda-hot-commands", daemon=True).start()
+
+    def refresh(self) -> int:
+        """Bring the table in line with the current command frequencies; returns entries computed"""
+        with self._refreshing:
+            self._last_refresh = time.time()
+            return self._refresh_locked(release=False)
+
+    def _refresh_locked(self, release: bool = True) -> int:
+        try:
+            return self._rebuild()
+        except Exception as e:
+            log_error(f"Hot command refresh failed: {e}")
+            return 0
+        finally:
+            if release:
+                self._refreshing.release()
+
+    def _hot_commands(self) -> Dict[str, int]:
+        """Normalized command -> count for the current top commands"""
+        from python_backend.context_awareness import get_context_awareness
+
+        counts: Dict[str, int] = {}
+        for task in get_context_awareness().get_frequent_tasks(limit=self.max_entries * 2):
+            key = self.normalize(task["command"])
+            if key:
+                counts[key] = counts.get(key, 0) + task["count"]
+        ranked = sorted(counts.items(), key=lambda x: x[1], reverse=True)
+        return {key: count for key, count in ranked[:self.max_entries] if count >= self.min_count}
+
+    def _rebuild(self) -> int:
+        from python_backend.model_manager import get_model_manager
+
+        models = get_model_manager()
+        if not models.is_ready("intent"):
+            return 0
+        ready = [name for name in ("sentiment", "semantic") if models.is_ready(name)]
+
+        fingerprint = self._running_fingerprint()
+        hot = self._hot_commands()
+        with self._lock:
+            current = dict(self._entries) if fingerprint == self._fingerprint else {}
+
+        entries = {}
+        computed = 0
+        for key, count in hot.items():
+            entry = current.get(key)
+            if entry is None or not set(ready) <= set(entry["models"]):
+                entry = self._analyze(key, ready)
+                computed += 1
+            entries[key] = dict(entry, count=count)
+
+        changed = computed or set(entries) != set(current) or fingerprint != self._fingerprint
+        with self._lock:
+            self._entries = entries
+            self._fingerprint = fingerprint
+            self.refreshes += 1
+            self.computed += computed
+        if changed:
+            self._save()
+            log_info(f"Hot command table: {len(entries)} commands ({computed} analyzed)")
+        return computed
+
+    @staticmethod
+    def _analyze(command: str, ready: List[str]) -> Dict:
+        """Full analysis of one command with the models that are ready"""
+        from python_backend.ml_config import FEATURES
+        from python_backend.intent_classifier import classify_intent
+        from python_backend.sentiment_analyzer import analyze_sentiment, analyze_sentiment_keywords
+
+        parsed = parse_command(command)
+        intent = classify_intent(parsed)
+        sentiment = analyze_sentiment(parsed) if "sentiment" in ready else analyze_sentiment_keywords(parsed)
+        semantic = None
+        if "semantic" in ready and FEATURES.get("semantic_similarity"):
+            from python_backend.semantic_search import get_semantic_response
+            semantic = get_semantic_response(parsed.text)
+        return {
+            "intent": intent,
+            "sentiment": sentiment,
+            "semantic": semantic,
+            "route": route_for_intent(intent["intent"]),
+            "models": ready,
+        }
+
+    def invalidate(self):
+        """Drop every entry (they are recomputed on the next refresh)"""
+        with self._lock:
+            self._entries.clear()
+        self._last_refresh = 0.0
+        self._save()
+
+    def forget_similar(self, embedding, threshold: float):
+        """
+        Drop entries whose stored semantic answer a new knowledge entry
+        (normalized embedding) could change, i.e. commands at least
+        threshold similar to it; they are analyzed again on the next refresh
+        """
+        with self._lock:
+            keys = list(self._entries)
+        if not keys:
+            return
+
+        from python_backend.embedding_service import get_embedding_model
+        similarities = get_embedding_model().encode(keys) @ embedding
+        stale = [key for key, similarity in zip(keys, similarities) if similarity >= threshold]
+        if not stale:
+            return
+
+        with self._lock:
+            for key in stale:
+                self._entries.pop(key, None)
+        self._last_refresh = 0.0
+        self._save()
+
+    # ---------- persistence ----------
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            log_error(f"Failed to load hot command table: {e}")
+            return
+
+        if data.get("fingerprint") != self._disk_fingerprint():
+            log_info("Intent categories or model changed; hot command table will be rebuilt")
+            return
+        self._fingerprint = data["fingerprint"]
+        self._entries = data.get("entries", {})
+        log_info(f"Hot command table loaded: {len(self._entries)} commands")
+
+    def _save(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            snapshot = {"fingerprint": self._fingerprint, "entries": dict(self._entries)}
+        try:
+            atomic_write_json(self.path, snapshot)
+        except Exception as e:
+            log_error(f"Failed to save hot command table: {e}")
+
+    def get_stats(self) -> Dict:
+        """Hit rate and size for /health"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "refreshes": self.refreshes,
+            "analyzed": self.computed,
+        }
+
+
+# ========================================
+# GLOBAL INSTANCE
+# ========================================
+
+_table = None
+_table_lock = threading.Lock()
+
+def get_hot_commands() -> HotCommandTable:
+    """Get or create global hot command table"""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = HotCommandTable()
+    return _table
+
+
+def forget_similar_hot_commands(embedding, threshold: float):
+    """New knowledge was learned: drop the hot commands it could answer (if the table exists)"""
+    if _table is not None:
+        _table.forget_similar(embedding, threshold)
+
+
+def lookup_hot_command(text: Union[str, ParsedCommand]) -> Optional[Dict]:
+    """Convenience function: memoized analysis of a frequent command, or None"""
+    return get_hot_commands().lookup(text)
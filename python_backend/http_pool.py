@@ -0,0 +1,174 @@
+"""
+VEDA AI - Shared HTTP Connection Pools
+One keep-alive pool per process for every outbound call (AI providers, LM Studio, weather)
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict
+from urllib.parse import urlparse
+from python_backend.logger import log_info, log_warning
+from python_backend.config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK, HTTP_USE_HTTP2
+
+_lock = threading.Lock()
+_session = None
+_httpx_client = None
+_async_client = None
+
+# Per-host request counters
+_stats: Dict[str, Dict] = defaultdict(lambda: {"requests": 0, "errors": 0, "total_ms": 0.0})
+
+# ========================================
+# REQUESTS (SYNC) SESSION
+# ========================================
+
+def _record_response(response, *args, **kwargs):
+    """requests response hook - per-host counters"""
+    host = urlparse(response.url).netloc
+    entry = _stats[host]
+    entry["requests"] += 1
+    entry["total_ms"] += response.elapsed.total_seconds() * 1000
+    if response.status_code >= 400:
+        entry["errors"] += 1
+    return response
+
+
+def get_http_session():
+    """Get the shared requests.Session (keep-alive, bounded pool per host)"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    pool_block=HTTP_POOL_BLOCK
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.hooks["response"].append(_record_response)
+                _session = session
+                log_info(f"HTTP pool created ({HTTP_POOL_CONNECTIONS} hosts x {HTTP_POOL_MAXSIZE} connections)")
+    return _session
+
+
+# ========================================
+# HTTPX CLIENTS (SDKs + ASYNC)
+# ========================================
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package"""
+    if not HTTP_USE_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _httpx_limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE,
+        max_keepalive_connections=HTTP_POOL_MAXSIZE
+    )
+
+
+def get_httpx_client():
+    """
+    Get the shared sync httpx.Client used by the OpenAI / Anthropic / Groq SDKs
+
+    Returns None if httpx is not installed (SDKs then use their own client).
+    """
+    global _httpx_client
+    if _httpx_client is None:
+        with _lock:
+            if _httpx_client is None:
+                try:
+                    import httpx
+                    _httpx_client = httpx.Client(
+                        http2=_http2_available(),
+                        limits=_httpx_limits(),
+                        timeout=httpx.Timeout(60.0, connect=10.0)
+                    )
+                except ImportError:
+                    log_warning("httpx not installed, SDK clients will use their own connection pools")
+                    return None
+    return _httpx_client
+
+
+def get_async_http_client():
+    """Get the shared httpx.AsyncClient for async callers (None if httpx is missing)"""
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                try:
+                    import httpx
+                    _async_client = httpx.AsyncClient(
+                        http2=_http2_available(),
+                        limits=_httpx_limits(),
+                        timeout=httpx.Timeout(60.0, connect=10.0)
+                    )
+                except ImportError:
+                    log_warning("httpx not installed, async HTTP client unavailable")
+                    return None
+    return _async_client
+
+
+# ========================================
+# STATS / SHUTDOWN
+# ========================================
+
+def get_pool_stats() -> Dict:
+    """Get connection pool statistics for /health"""
+    hosts = {}
+    for host, entry in list(_stats.items()):
+        count = entry["requests"]
+        hosts[host] = {
+            "requests": count,
+            "errors": entry["errors"],
+            "avg_ms": round(entry["total_ms"] / count, 2) if count else None
+        }
+
+    open_pools = 0
+    if _session is not None:
+        adapter = _session.get_adapter("https://")
+        open_pools = len(adapter.poolmanager.pools)
+
+    return {
+        "session_active": _session is not None,
+        "open_host_pools": open_pools,
+        "max_hosts": HTTP_POOL_CONNECTIONS,
+        "max_connections_per_host": HTTP_POOL_MAXSIZE,
+        "http2": _http2_available(),
+        "sdk_client_active": _httpx_client is not None,
+        "async_client_active": _async_client is not None,
+        "hosts": hosts,
+    }
+
+
+def close_http_pools():
+    """Close the shared sync pools"""
+    global _session, _httpx_client
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _httpx_client is not None:
+            _httpx_client.close()
+            _httpx_client = None
+    log_info("HTTP pools closed")
+
+
+async def close_async_http_client():
+    """Close the shared async client (must run on the event loop that used it)"""
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose()
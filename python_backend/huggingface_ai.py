@@ -1,11 +1,22 @@
 """
 Hugging Face Transformers - Self-training AI
 Install: pip install transformers torch
+Optional ONNX backend: pip install optimum[onnxruntime]
 """
-from python_backend.logger import log_error, log_info
+import os
+import threading
+import time
+from python_backend.logger import log_error, log_info, log_warning
+from python_backend.micro_batcher import MicroBatcher
+from python_backend.model_optimizer import MODELS_DIR
+from python_backend.utils import physical_cores
+from python_backend.ml_config import (
+    HF_MODEL, HF_BACKEND, HF_THREADS, HF_MAX_NEW_TOKENS, HF_BATCH_SIZE, HF_BATCH_LATENCY_MS
+)
 
-_model = None
-_tokenizer = None
+# Seconds before a failed load is retried (doubles per failure up to LOAD_RETRY_MAX)
+LOAD_RETRY_MIN = 30.0
+LOAD_RETRY_MAX = 600.0
 
 def _clean_response(text: str) -> str:
     """Light cleanup so HF outputs sound less broken in TTS."""
@@ -24,62 +35,216 @@ def _clean_response(text: str) -> str:
 
     return t
 
-def load_model(model_name="microsoft/DialoGPT-medium"):
-    """Load Hugging Face model (runs locally)"""
-    global _model, _tokenizer
+def _conv1d_to_linear(module):
+    """Swap GPT-2 style Conv1D layers for nn.Linear so dynamic int8 quantization reaches them"""
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+
+class HuggingFaceEngine:
+    """Resident local causal LM with batched generation
     
-    if _model is None:
-        try:
-            from transformers import AutoModelForCausalLM, AutoTokenizer
-            import torch
-            
-            log_info(f"Loading model: {model_name}")
-            _tokenizer = AutoTokenizer.from_pretrained(model_name)
-            _model = AutoModelForCausalLM.from_pretrained(model_name)
-            
-            # Set pad token
-            if _tokenizer.pad_token is None:
-                _tokenizer.pad_token = _tokenizer.eos_token
-            
-            log_info("Model loaded successfully")
+    - transformers / torch are imported and the model loaded once
+    - Backends: "int8" (dynamic int8 quantization of the Linear layers),
+      "onnx" (ONNX Runtime export cached under data/models/) or "fp32";
+      a backend that cannot load falls back to the next one
+    - torch runs on HF_THREADS intra-op threads (physical cores by default)
+    - Concurrent prompts are merged by a micro-batcher into one left-padded
+      generate() call, which stops as soon as every reply has hit EOS
+    - Replies are cut from the output by token position, not string replace
+    - A failed load (hub download, out of memory) is retried after a
+      backoff instead of disabling generation until restart
+    """
+    
+    def __init__(self, model_name=HF_MODEL, backend=HF_BACKEND, threads=HF_THREADS, max_new_tokens=HF_MAX_NEW_TOKENS):
+        self.model_name = model_name
+        self.backend = backend
+        self.threads = threads or physical_cores()
+        self.max_new_tokens = max_new_tokens
+        self.model = None
+        self.tokenizer = None
+        self.backend_used = None
+        self.load_error = None
+        self.load_failures = 0
+        self._retry_at = 0.0
+        self.load_seconds = None
+        self._torch = None
+        self._load_lock = threading.Lock()
+        self.batcher = MicroBatcher(
+            self._generate_batch,
+            max_batch=HF_BATCH_SIZE,
+            max_latency=HF_BATCH_LATENCY_MS / 1000,
+            name="huggingface"
+        )
+        
+        # Metrics
+        self.generated_tokens = 0
+        self.generation_seconds = 0.0
+    
+    def load(self):
+        """Load tokenizer and model once; returns True when generation is possible"""
+        if self.model is not None:
             return True
-        except Exception as e:
-            log_error(f"Model loading error: {e}")
+        if time.monotonic() < self._retry_at:
             return False
-    return True
-
-def huggingface_response(prompt):
-    """Get response from local Hugging Face model"""
-    if not load_model():
-        return None
+        
+        with self._load_lock:
+            if self.model is not None or time.monotonic() < self._retry_at:
+                return self.model is not None
+            
+            started = time.perf_counter()
+            try:
+                import torch
+                from transformers import AutoTokenizer
+                
+                torch.set_num_threads(self.threads)
+                self._torch = torch
+                
+                log_info(f"Loading model: {self.model_name} ({self.backend}, {self.threads} threads)")
+                tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                # Decoder-only models need left padding for batched generation
+                tokenizer.padding_side = "left"
+                if tokenizer.pad_token is None:
+                    tokenizer.pad_token = tokenizer.eos_token
+                
+                self.model, self.backend_used = self._load_model()
+                self.tokenizer = tokenizer
+                self.load_seconds = round(time.perf_counter() - started, 2)
+                self.load_error = None
+                log_info(f"Model loaded successfully ({self.backend_used}, {self.load_seconds}s)")
+            except Exception as e:
+                self.load_error = str(e)
+                self.load_failures += 1
+                delay = min(LOAD_RETRY_MIN * 2 ** (self.load_failures - 1), LOAD_RETRY_MAX)
+                self._retry_at = time.monotonic() + delay
+                log_error(f"Model loading error: {e} (retrying in {delay:.0f}s)")
+        return self.model is not None
     
-    try:
-        from transformers import AutoModelForCausalLM, AutoTokenizer
-        import torch
-        
-        # Encode input
-        inputs = _tokenizer.encode(prompt + _tokenizer.eos_token, return_tensors="pt")
-        
-        # Generate response
-        outputs = _model.generate(
-            inputs,
-            max_length=200,
-            pad_token_id=_tokenizer.pad_token_id,
-            temperature=0.7,
-            do_sample=True,
-            top_p=0.9
+    def _load_model(self):
+        """(model, backend) for the configured backend, falling back onnx -> int8 -> fp32"""
+        if self.backend == "onnx":
+            try:
+                return self._load_onnx(), "onnx"
+            except ImportError:
+                log_warning("optimum[onnxruntime] not installed, falling back to int8 PyTorch")
+            except Exception as e:
+                log_warning(f"ONNX export/load failed ({e}), falling back to int8 PyTorch")
+        
+        from transformers import AutoModelForCausalLM
+        
+        model = AutoModelForCausalLM.from_pretrained(self.model_name)
+        model.eval()
+        
+        if self.backend in ("int8", "onnx"):
+            try:
+                _conv1d_to_linear(model)
+                model = self._torch.quantization.quantize_dynamic(model, {self._torch.nn.Linear}, dtype=self._torch.qint8)
+                return model, "int8"
+            except Exception as e:
+                log_warning(f"int8 quantization failed ({e}), using fp32")
+        return model, "fp32"
+    
+    def _load_onnx(self):
+        """ONNX Runtime model, exported once and cached under data/models/"""
+        from optimum.onnxruntime import ORTModelForCausalLM
+        
+        path = os.path.join(MODELS_DIR, self.model_name.replace("/", "--") + "-onnx")
+        if os.path.isdir(path):
+            return ORTModelForCausalLM.from_pretrained(path)
+        
+        log_info(f"Exporting {self.model_name} to ONNX (one-time)")
+        model = ORTModelForCausalLM.from_pretrained(self.model_name, export=True)
+        model.save_pretrained(path)
+        return model
+    
+    def _generate_batch(self, prompts):
+        """One padded generate() for every prompt in the batch"""
+        tokenizer = self.tokenizer
+        inputs = tokenizer(
+            [prompt + tokenizer.eos_token for prompt in prompts],
+            return_tensors="pt",
+            padding=True
         )
         
-        # Decode response
-        response = _tokenizer.decode(outputs[0], skip_special_tokens=True)
+        started = time.perf_counter()
+        with self._torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=self.max_new_tokens,
+                pad_token_id=tokenizer.pad_token_id,
+                eos_token_id=tokenizer.eos_token_id,
+                temperature=0.7,
+                do_sample=True,
+                top_p=0.9
+            )
+        elapsed = time.perf_counter() - started
         
-        # Remove prompt from response
-        if prompt in response:
-            response = response.replace(prompt, "").strip()
+        # Everything after the (padded) prompt is new
+        new_tokens = outputs[:, inputs["input_ids"].shape[1]:]
+        self.generated_tokens += int((new_tokens != tokenizer.pad_token_id).sum())
+        self.generation_seconds += elapsed
         
-        response = _clean_response(response)
+        return [tokenizer.decode(row, skip_special_tokens=True) for row in new_tokens]
+    
+    def respond(self, prompt):
+        """Generate one reply (batched with concurrent callers); None on failure"""
+        if not self.load():
+            return None
+        response = _clean_response(self.batcher(prompt))
         return response or None
-        
+    
+    def get_stats(self):
+        """Backend, throughput and batching for /health"""
+        return {
+            "model": self.model_name,
+            "loaded": self.model is not None,
+            "backend": self.backend_used or self.backend,
+            "threads": self.threads,
+            "load_seconds": self.load_seconds,
+            "error": self.load_error,
+            "load_failures": self.load_failures,
+            "generated_tokens": self.generated_tokens,
+            "tokens_per_second": (
+                round(self.generated_tokens / self.generation_seconds, 1)
+                if self.generation_seconds else None
+            ),
+            "batching": self.batcher.get_stats(),
+        }
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_huggingface_engine(model_name=HF_MODEL):
+    """Get the resident engine for a model (loaded on first use)"""
+    with _engines_lock:
+        engine = _engines.get(model_name)
+        if engine is None:
+            engine = HuggingFaceEngine(model_name)
+            _engines[model_name] = engine
+        return engine
+
+def get_huggingface_stats():
+    """Statistics of every engine created so far"""
+    with _engines_lock:
+        return {name: engine.get_stats() for name, engine in _engines.items()}
+
+def load_model(model_name=HF_MODEL):
+    """Load Hugging Face model (runs locally)"""
+    return get_huggingface_engine(model_name).load()
+
+def huggingface_response(prompt):
+    """Get response from local Hugging Face model"""
+    try:
+        return get_huggingface_engine().respond(prompt)
     except Exception as e:
         log_error(f"Hugging Face error: {e}")
         return None
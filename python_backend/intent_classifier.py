@@ -4,9 +4,68 @@ Classifies user commands into categories for better understanding
 """
 
 import re
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from python_backend.logger import log_info, log_error
-from python_backend.ml_config import INTENT_CATEGORIES
+from python_backend.ml_config import INTENT_CATEGORIES, INTENT_MODEL_ENABLED, INTENT_MODEL_MIN_CONFIDENCE
+from python_backend.embedding_service import get_embedding_model
+from python_backend.command_parser import ParsedCommand, parse_for
+from python_backend.intent_trainer import KEYWORD_HANDOFF_CONFIDENCE, OTHER_INTENT
+
+# Sample sentences for each intent (intent centroids, and seed data for the learned model)
+INTENT_SAMPLES = {
+    "system_control": [
+        "open chrome browser",
+        "close notepad application",
+        "start the calculator",
+        "chrome kholo",
+        "notepad band karo"
+    ],
+    "volume_control": [
+        "increase the volume",
+        "turn down the sound",
+        "mute the audio",
+        "volume badha do",
+        "awaaz kam karo"
+    ],
+    "weather": [
+        "what's the weather today",
+        "is it going to rain",
+        "temperature in Delhi",
+        "aaj mausam kaisa hai",
+        "Delhi ka weather batao"
+    ],
+    "time_date": [
+        "what time is it",
+        "what's today's date",
+        "kitne baje hain",
+        "aaj kya date hai"
+    ],
+    "greeting": [
+        "hello how are you",
+        "good morning",
+        "namaste VEDA",
+        "hi there"
+    ],
+    "question": [
+        "what is artificial intelligence",
+        "how does this work",
+        "why is the sky blue",
+        "kya hai ye"
+    ],
+    "search": [
+        "search for python tutorials",
+        "google machine learning",
+        "find restaurants nearby",
+        "youtube pe search karo"
+    ],
+    "media_control": [
+        "play some music",
+        "pause the video",
+        "next song please",
+        "gaana chalao"
+    ]
+}
+
 
 # ========================================
 # KEYWORD-BASED INTENT CLASSIFIER
@@ -27,22 +86,27 @@ class KeywordIntentClassifier:
             pattern = r'\b(' + '|'.join(re.escape(k) for k in keywords) + r')\b'
             self.patterns[intent] = re.compile(pattern, re.IGNORECASE)
     
-    def classify(self, text: str) -> Tuple[str, float]:
+    def _scores(self, parsed: ParsedCommand) -> Dict[str, float]:
+        """Run every pattern once per command; classify and get_all_intents share the result"""
+        def compute():
+            scores = {}
+            for intent, pattern in self.patterns.items():
+                matches = pattern.findall(parsed.text)
+                if matches:
+                    # Score based on number of keyword matches and their position
+                    score = len(matches) / len(parsed.words)
+                    scores[intent] = min(score * 2, 1.0)  # Normalize to 0-1
+            return scores
+        return parsed.cached("intent_keyword_scores", compute)
+    
+    def classify(self, text: Union[str, ParsedCommand]) -> Tuple[str, float]:
         """
         Classify text into intent category
         
         Returns:
             Tuple of (intent_name, confidence_score)
         """
-        text_lower = text.lower()
-        scores = {}
-        
-        for intent, pattern in self.patterns.items():
-            matches = pattern.findall(text_lower)
-            if matches:
-                # Score based on number of keyword matches and their position
-                score = len(matches) / len(text_lower.split())
-                scores[intent] = min(score * 2, 1.0)  # Normalize to 0-1
+        scores = self._scores(parse_for(text))
         
         if not scores:
             return ("unknown", 0.0)
@@ -52,17 +116,9 @@ class KeywordIntentClassifier:
         log_info(f"Intent classified: {best_intent[0]} (confidence: {best_intent[1]:.2f})")
         return best_intent
     
-    def get_all_intents(self, text: str) -> Dict[str, float]:
+    def get_all_intents(self, text: Union[str, ParsedCommand]) -> Dict[str, float]:
         """Get all matching intents with scores"""
-        text_lower = text.lower()
-        scores = {}
-        
-        for intent, pattern in self.patterns.items():
-            matches = pattern.findall(text_lower)
-            if matches:
-                score = len(matches) / len(text_lower.split())
-                scores[intent] = min(score * 2, 1.0)
-        
+        scores = self._scores(parse_for(text))
         return dict(sorted(scores.items(), key=lambda x: x[1], reverse=True))
 
 
@@ -79,14 +135,15 @@ class MLIntentClassifier:
         self._load_model()
     
     def _load_model(self):
-        """Load sentence transformer model"""
+        """Attach to the shared sentence embedding model"""
         try:
-            from sentence_transformers import SentenceTransformer
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            log_info("ML Intent Classifier loaded")
+            model = get_embedding_model()
+            if not model.load():
+                log_info("Embedding model unavailable, using keyword classifier only")
+                return
+            self.model = model
             self._compute_intent_embeddings()
-        except ImportError:
-            log_info("sentence-transformers not installed, using keyword classifier only")
+            log_info("ML Intent Classifier loaded")
         except Exception as e:
             log_error(f"Failed to load ML classifier: {e}")
     
@@ -95,62 +152,7 @@ class MLIntentClassifier:
         if not self.model:
             return
         
-        # Sample sentences for each intent
-        intent_samples = {
-            "system_control": [
-                "open chrome browser",
-                "close notepad application",
-                "start the calculator",
-                "chrome kholo",
-                "notepad band karo"
-            ],
-            "volume_control": [
-                "increase the volume",
-                "turn down the sound",
-                "mute the audio",
-                "volume badha do",
-                "awaaz kam karo"
-            ],
-            "weather": [
-                "what's the weather today",
-                "is it going to rain",
-                "temperature in Delhi",
-                "aaj mausam kaisa hai",
-                "Delhi ka weather batao"
-            ],
-            "time_date": [
-                "what time is it",
-                "what's today's date",
-                "kitne baje hain",
-                "aaj kya date hai"
-            ],
-            "greeting": [
-                "hello how are you",
-                "good morning",
-                "namaste VEDA",
-                "hi there"
-            ],
-            "question": [
-                "what is artificial intelligence",
-                "how does this work",
-                "why is the sky blue",
-                "kya hai ye"
-            ],
-            "search": [
-                "search for python tutorials",
-                "google machine learning",
-                "find restaurants nearby",
-                "youtube pe search karo"
-            ],
-            "media_control": [
-                "play some music",
-                "pause the video",
-                "next song please",
-                "gaana chalao"
-            ]
-        }
-        
-        for intent, samples in intent_samples.items():
+        for intent, samples in INTENT_SAMPLES.items():
             embeddings = self.model.encode(samples)
             # Store mean embedding for each intent
             self.intent_embeddings[intent] = embeddings.mean(axis=0)
@@ -192,15 +194,30 @@ class MLIntentClassifier:
 class HybridIntentClassifier:
     """
     Combines keyword and ML-based classification
-    Uses keyword for speed, ML for accuracy
+    Uses keyword for speed, ML for accuracy; a learned n-gram model trained
+    from the logs answers most low-keyword-confidence commands before the
+    embedding model is needed
     """
     
     def __init__(self):
         self.keyword_classifier = KeywordIntentClassifier()
+        self.learned_model = self._load_learned_model()
         self.ml_classifier = MLIntentClassifier()
         self.use_ml = self.ml_classifier.model is not None
     
-    def classify(self, text: str) -> Dict:
+    @staticmethod
+    def _load_learned_model():
+        """Trained n-gram model (scripts/train_intent_model.py), if one is accepted"""
+        if not INTENT_MODEL_ENABLED:
+            return None
+        try:
+            from python_backend.intent_trainer import load_intent_model
+            return load_intent_model()
+        except Exception as e:
+            log_error(f"Failed to load learned intent model: {e}")
+            return None
+    
+    def classify(self, text: Union[str, ParsedCommand]) -> Dict:
         """
         Classify intent using hybrid approach
         
@@ -212,9 +229,11 @@ class HybridIntentClassifier:
                 "all_intents": Dict[str, float]
             }
         """
+        parsed = parse_for(text)
+        
         # Always get keyword classification (fast)
-        keyword_intent, keyword_conf = self.keyword_classifier.classify(text)
-        all_intents = self.keyword_classifier.get_all_intents(text)
+        keyword_intent, keyword_conf = self.keyword_classifier.classify(parsed)
+        all_intents = self.keyword_classifier.get_all_intents(parsed)
         
         result = {
             "intent": keyword_intent,
@@ -223,9 +242,20 @@ class HybridIntentClassifier:
             "all_intents": all_intents
         }
         
+        # Learned model next: microseconds, and confident answers skip the embedding model
+        # (OTHER_INTENT means it doesn't recognize the command; the embeddings decide)
+        if self.learned_model is not None and keyword_conf < KEYWORD_HANDOFF_CONFIDENCE:
+            learned_intent, learned_conf = self.learned_model.predict(parsed.text)
+            if learned_intent != OTHER_INTENT and learned_conf >= INTENT_MODEL_MIN_CONFIDENCE and learned_conf > keyword_conf:
+                result["intent"] = learned_intent
+                result["confidence"] = learned_conf
+                result["method"] = "learned"
+                return result
+        
         # Use ML if keyword confidence is low and ML is available
-        if self.use_ml and keyword_conf < 0.5:
-            ml_intent, ml_conf = self.ml_classifier.classify(text)
+        if self.use_ml and result["confidence"] < KEYWORD_HANDOFF_CONFIDENCE:
+            # Lowercased text shares the embedding cache with semantic search
+            ml_intent, ml_conf = self.ml_classifier.classify(parsed.text)
             
             # Use ML result if it's more confident
             if ml_conf > keyword_conf:
@@ -235,7 +265,7 @@ class HybridIntentClassifier:
         
         return result
     
-    def get_intent(self, text: str) -> str:
+    def get_intent(self, text: Union[str, ParsedCommand]) -> str:
         """Simple interface to get just the intent name"""
         return self.classify(text)["intent"]
 
@@ -245,6 +275,7 @@ class HybridIntentClassifier:
 # ========================================
 
 _classifier = None
+_keyword_classifier = None
 
 def get_intent_classifier() -> HybridIntentClassifier:
     """Get or create global intent classifier instance"""
@@ -254,11 +285,27 @@ def get_intent_classifier() -> HybridIntentClassifier:
     return _classifier
 
 
-def classify_intent(text: str) -> Dict:
+def classify_intent(text: Union[str, ParsedCommand]) -> Dict:
     """Convenience function to classify intent"""
     return get_intent_classifier().classify(text)
 
 
-def get_intent(text: str) -> str:
+def classify_intent_keywords(text: Union[str, ParsedCommand]) -> Dict:
+    """Keyword-only classification (no model load) - used while models warm up"""
+    global _keyword_classifier
+    if _keyword_classifier is None:
+        _keyword_classifier = KeywordIntentClassifier()
+    
+    parsed = parse_for(text)
+    intent, confidence = _keyword_classifier.classify(parsed)
+    return {
+        "intent": intent,
+        "confidence": confidence,
+        "method": "keyword",
+        "all_intents": _keyword_classifier.get_all_intents(parsed)
+    }
+
+
+def get_intent(text: Union[str, ParsedCommand]) -> str:
     """Convenience function to get intent name"""
     return get_intent_classifier().get_intent(text)
@@ -0,0 +1,451 @@
+"""
+VEDA AI - Intent Trainer
+Logistic regression over hashed n-grams, trained from logged commands
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import time
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from python_backend.logger import log_info, log_error, log_warning
+from python_backend.utils import atomic_write_json
+from python_backend.ml_config import (
+    INTENT_CATEGORIES, INTENT_MODEL_HASH_BITS, INTENT_MODEL_MIN_ACCURACY, INTENT_MODEL_MIN_CONFIDENCE
+)
+from python_backend.model_optimizer import MODELS_DIR
+
+INTENT_MODEL_DIR = os.path.join(MODELS_DIR, "intent-classifier")
+MANIFEST_FILE = "manifest.json"
+WEIGHTS_FILE = "weights.npz"
+
+# Keyword confidence a logged command needs before its keyword label is trusted
+LABEL_MIN_CONFIDENCE = 0.2
+
+# Reject class: logged commands without any keyword hit. Predicting it hands
+# the command on to the embedding classifier instead of forcing an intent
+OTHER_INTENT = "other"
+
+# Keyword confidence below which HybridIntentClassifier consults the learned
+# model; evaluation focuses on these commands since they are the ones it answers
+KEYWORD_HANDOFF_CONFIDENCE = 0.5
+
+# Held-out low-keyword-confidence commands needed before a version can be accepted
+MIN_EVAL_SAMPLES = 20
+
+# Every n-th command (by a stable hash of its text) is held out for evaluation
+HOLDOUT_EVERY = 5
+
+# Character n-gram sizes (inside word boundaries) and word n-gram sizes
+CHAR_NGRAMS = (3, 4)
+WORD_NGRAMS = (1, 2)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def intent_categories_hash() -> str:
+    """Fingerprint of INTENT_CATEGORIES; artifacts trained on other categories are stale"""
+    payload = json.dumps(INTENT_CATEGORIES, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+# ========================================
+# FEATURES
+# ========================================
+
+def hashed_features(text: str, bits: int = INTENT_MODEL_HASH_BITS) -> Dict[int, float]:
+    """
+    L2-normalized bag of hashed word and character n-grams
+
+    crc32 keeps bucket ids stable across processes (hash() is salted), so
+    saved weights line up with features computed after a restart.
+    """
+    mask = (1 << bits) - 1
+    words = _WORD_RE.findall(text.lower())
+    grams: List[str] = []
+
+    for n in WORD_NGRAMS:
+        grams.extend("w:" + " ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+    for word in words:
+        padded = f"<{word}>"
+        for n in CHAR_NGRAMS:
+            grams.extend("c:" + padded[i:i + n] for i in range(len(padded) - n + 1))
+
+    counts: Dict[int, float] = {}
+    for gram in grams:
+        bucket = zlib.crc32(gram.encode("utf-8")) & mask
+        counts[bucket] = counts.get(bucket, 0.0) + 1.0
+
+    norm = math.sqrt(sum(value * value for value in counts.values()))
+    if norm:
+        for bucket in counts:
+            counts[bucket] /= norm
+    return counts
+
+
+# ========================================
+# MODEL
+# ========================================
+
+class IntentModel:
+    """
+    Multinomial logistic regression over hashed_features
+
+    Inference touches only the rows of the weight matrix for the n-grams
+    present in the text (a few dozen), so a prediction costs microseconds
+    and never needs the embedding model.
+    """
+
+    def __init__(self, labels: List[str], weights, bias, bits: int, manifest: Optional[Dict] = None):
+        self.labels = list(labels)
+        self.weights = weights
+        self.bias = bias
+        self.bits = bits
+        self.manifest = manifest or {}
+
+    @property
+    def version(self) -> Optional[int]:
+        return self.manifest.get("version")
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        import numpy as np
+
+        features = hashed_features(text, self.bits)
+        logits = self.bias.copy()
+        if features:
+            rows = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+            values = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+            logits += values @ self.weights[rows]
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        return {label: float(p) for label, p in zip(self.labels, probs)}
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probs = self.predict_proba(text)
+        return max(probs.items(), key=lambda x: x[1])
+
+    def save(self, path: str):
+        import numpy as np
+
+        os.makedirs(path, exist_ok=True)
+        np.savez_compressed(os.path.join(path, WEIGHTS_FILE), weights=self.weights, bias=self.bias)
+        atomic_write_json(os.path.join(path, MANIFEST_FILE), self.manifest)
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        import numpy as np
+
+        with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        arrays = np.load(os.path.join(path, WEIGHTS_FILE))
+        return cls(manifest["labels"], arrays["weights"], arrays["bias"], manifest["hash_bits"], manifest)
+
+
+# ========================================
+# TRAINING DATA
+# ========================================
+
+class Sample(NamedTuple):
+    """One labelled command"""
+    text: str
+    intent: str
+    weight: float
+    keyword_confidence: float
+
+
+def load_logged_commands() -> Dict[str, float]:
+    """
+    Logged user commands with a weight each: conversation history entries
+    count once per occurrence, command_frequency entries by log(1 + count)
+    so a handful of repeated commands cannot drown out the rest
+    """
+    from python_backend.self_learning import get_conversation_journal
+    from python_backend.context_awareness import CONTEXT_DATA_FILE
+
+    commands: Dict[str, float] = {}
+
+    def add(text, weight):
+        text = (text or "").strip().lower()
+        if text:
+            commands[text] = commands.get(text, 0.0) + weight
+
+    try:
+        for record in get_conversation_journal().records():
+            add(record.get("user_input"), 1.0)
+    except Exception as e:
+        log_error(f"Could not read conversation history: {e}")
+
+    try:
+        with open(CONTEXT_DATA_FILE, 'r', encoding='utf-8') as f:
+            frequency = json.load(f).get("command_frequency", {})
+        for text, entry in frequency.items():
+            add(text, math.log1p(entry.get("count", 1)))
+    except (OSError, ValueError) as e:
+        log_warning(f"Could not read command frequency: {e}")
+
+    return commands
+
+
+def label_commands(commands: Dict[str, float]) -> List[Sample]:
+    """
+    Samples for every command the keyword classifier labels confidently and
+    unambiguously, OTHER_INTENT samples for commands with no keyword hit at
+    all, plus the built-in INTENT_SAMPLES so every intent has examples
+    before much has been logged
+    """
+    from python_backend.intent_classifier import INTENT_SAMPLES, KeywordIntentClassifier
+    from python_backend.command_parser import parse_command
+
+    keyword = KeywordIntentClassifier()
+
+    def ranked(text):
+        return sorted(keyword.get_all_intents(parse_command(text)).items(), key=lambda x: x[1], reverse=True)
+
+    samples = []
+    for text, weight in commands.items():
+        scores = ranked(text)
+        if not scores:
+            samples.append(Sample(text, OTHER_INTENT, weight, 0.0))
+            continue
+        if scores[0][1] < LABEL_MIN_CONFIDENCE:
+            continue
+        if len(scores) > 1 and scores[1][1] == scores[0][1]:
+            continue
+        samples.append(Sample(text, scores[0][0], weight, scores[0][1]))
+
+    logged = {sample.text for sample in samples}
+    for intent, texts in INTENT_SAMPLES.items():
+        for text in texts:
+            text = text.lower()
+            if text not in logged:
+                scores = ranked(text)
+                samples.append(Sample(text, intent, 1.0, scores[0][1] if scores else 0.0))
+    return samples
+
+
+def _is_holdout(text: str) -> bool:
+    return zlib.crc32(text.encode("utf-8")) % HOLDOUT_EVERY == 0
+
+
+# ========================================
+# TRAINING + EVALUATION
+# ========================================
+
+def _design(samples: List[Sample], labels: List[str], bits: int):
+    """COO feature arrays, label ids and weights for samples"""
+    import numpy as np
+
+    index = {label: i for i, label in enumerate(labels)}
+    rows, cols, vals = [], [], []
+    for row, sample in enumerate(samples):
+        for bucket, value in hashed_features(sample.text, bits).items():
+            rows.append(row)
+            cols.append(bucket)
+            vals.append(value)
+    return (
+        np.asarray(rows, dtype=np.int64),
+        np.asarray(cols, dtype=np.int64),
+        np.asarray(vals, dtype=np.float32),
+        np.asarray([index[sample.intent] for sample in samples], dtype=np.int64),
+        np.asarray([sample.weight for sample in samples], dtype=np.float32),
+    )
+
+
+def fit(
+    samples: List[Sample],
+    bits: int = INTENT_MODEL_HASH_BITS,
+    epochs: int = 200,
+    learning_rate: float = 2.0,
+    l2: float = 1e-4
+) -> IntentModel:
+    """Weighted softmax regression by full-batch gradient descent with momentum"""
+    import numpy as np
+
+    labels = sorted({sample.intent for sample in samples})
+    rows, cols, vals, y, sample_weights = _design(samples, labels, bits)
+    n, k = len(samples), len(labels)
+    sample_weights = sample_weights / sample_weights.sum()
+
+    weights = np.zeros((1 << bits, k), dtype=np.float32)
+    bias = np.zeros(k, dtype=np.float32)
+    velocity_w = np.zeros_like(weights)
+    velocity_b = np.zeros_like(bias)
+    touched = np.unique(cols)
+
+    for _ in range(epochs):
+        logits = np.tile(bias, (n, 1))
+        np.add.at(logits, rows, vals[:, None] * weights[cols])
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        error = probs
+        error[np.arange(n), y] -= 1.0
+        error *= sample_weights[:, None]
+
+        grad_w = np.zeros_like(weights)
+        np.add.at(grad_w, cols, vals[:, None] * error[rows])
+        grad_w[touched] += l2 * weights[touched]
+
+        velocity_w[touched] = 0.9 * velocity_w[touched] - learning_rate * grad_w[touched]
+        velocity_b = 0.9 * velocity_b - learning_rate * error.sum(axis=0)
+        weights[touched] += velocity_w[touched]
+        bias += velocity_b
+
+    return IntentModel(labels, weights, bias, bits)
+
+
+def evaluate(
+    model: IntentModel,
+    samples: List[Sample],
+    min_confidence: float = INTENT_MODEL_MIN_CONFIDENCE
+) -> Dict:
+    """
+    Accuracy, macro F1 and per-prediction latency on samples, plus the
+    numbers that decide acceptance, measured on the commands the hybrid
+    classifier actually hands over (keyword confidence below
+    KEYWORD_HANDOFF_CONFIDENCE): accuracy there, and how often an override
+    (a non-OTHER_INTENT prediction at min_confidence or above) is right
+    """
+    if not samples:
+        return {"samples": 0, "accuracy": None, "macro_f1": None, "avg_predict_us": None, "handoff": None}
+
+    started = time.perf_counter()
+    predicted = [model.predict(sample.text) for sample in samples]
+    elapsed = time.perf_counter() - started
+
+    f1_scores = []
+    for label in {sample.intent for sample in samples}:
+        tp = sum(p == label and s.intent == label for (p, _), s in zip(predicted, samples))
+        fp = sum(p == label and s.intent != label for (p, _), s in zip(predicted, samples))
+        fn = sum(p != label and s.intent == label for (p, _), s in zip(predicted, samples))
+        f1_scores.append(2 * tp / (2 * tp + fp + fn) if tp else 0.0)
+
+    handoff = [
+        (p, confidence, s) for (p, confidence), s in zip(predicted, samples)
+        if s.keyword_confidence < KEYWORD_HANDOFF_CONFIDENCE
+    ]
+    overrides = [(p, s) for p, confidence, s in handoff if p != OTHER_INTENT and confidence >= min_confidence]
+
+    correct = sum(p == s.intent for (p, _), s in zip(predicted, samples))
+    return {
+        "samples": len(samples),
+        "accuracy": round(correct / len(samples), 4),
+        "macro_f1": round(sum(f1_scores) / len(f1_scores), 4),
+        "avg_predict_us": round(elapsed / len(samples) * 1e6, 1),
+        "handoff": {
+            "samples": len(handoff),
+            "accuracy": round(sum(p == s.intent for p, _, s in handoff) / len(handoff), 4) if handoff else None,
+            "overrides": len(overrides),
+            "override_precision": (
+                round(sum(p == s.intent for p, s in overrides) / len(overrides), 4) if overrides else None
+            ),
+        },
+    }
+
+
+def _accept(evaluation: Dict, min_accuracy: float) -> bool:
+    """Enough held-out handoff commands, handled and overridden accurately"""
+    handoff = evaluation.get("handoff")
+    if not handoff or handoff["samples"] < MIN_EVAL_SAMPLES:
+        return False
+    if handoff["accuracy"] < min_accuracy:
+        return False
+    return handoff["override_precision"] is None or handoff["override_precision"] >= min_accuracy
+
+
+def _versions() -> List[int]:
+    try:
+        names = os.listdir(INTENT_MODEL_DIR)
+    except OSError:
+        return []
+    return sorted(int(name[1:]) for name in names if name.startswith("v") and name[1:].isdigit())
+
+
+def version_dir(version: int) -> str:
+    return os.path.join(INTENT_MODEL_DIR, f"v{version}")
+
+
+def train_intent_model(min_accuracy: float = INTENT_MODEL_MIN_ACCURACY, save: bool = True) -> Dict:
+    """
+    Label the logs, train on everything outside the holdout, evaluate on
+    the holdout, then retrain on all samples and save it as the next
+    version. The version is accepted only if, on held-out commands with
+    keyword confidence below KEYWORD_HANDOFF_CONFIDENCE (at least
+    MIN_EVAL_SAMPLES of them), both accuracy and override precision reach
+    min_accuracy. Returns the manifest.
+    """
+    samples = label_commands(load_logged_commands())
+    intents = {sample.intent for sample in samples}
+    if len(intents - {OTHER_INTENT}) < 2:
+        raise ValueError("need labelled commands for at least two intents")
+    if OTHER_INTENT not in intents:
+        raise ValueError("need logged commands without keyword hits for the reject class")
+
+    train = [s for s in samples if not _is_holdout(s.text)]
+    holdout = [s for s in samples if _is_holdout(s.text)]
+    known = {sample.intent for sample in train}
+    holdout = [s for s in holdout if s.intent in known]
+
+    started = time.perf_counter()
+    evaluation = evaluate(fit(train), holdout)
+    model = fit(samples)
+    train_seconds = round(time.perf_counter() - started, 2)
+
+    model.manifest = {
+        "version": (_versions() or [0])[-1] + 1,
+        "created": time.time(),
+        "labels": model.labels,
+        "hash_bits": model.bits,
+        "categories_hash": intent_categories_hash(),
+        "samples": len(samples),
+        "per_intent": {label: sum(1 for s in samples if s.intent == label) for label in model.labels},
+        "train_seconds": train_seconds,
+        "evaluation": evaluation,
+        "accepted": _accept(evaluation, min_accuracy),
+    }
+
+    if save:
+        model.save(version_dir(model.manifest["version"]))
+        status = "accepted" if model.manifest["accepted"] else f"rejected (needs {min_accuracy} on handed-over commands)"
+        log_info(f"Intent model v{model.version} trained on {len(samples)} commands, handoff evaluation {evaluation['handoff']}: {status}")
+    return model.manifest
+
+
+def _accepted_versions():
+    """(version, path) of accepted versions trained on the current INTENT_CATEGORIES, newest first"""
+    for version in reversed(_versions()):
+        path = version_dir(version)
+        try:
+            with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not manifest.get("accepted"):
+            continue
+        if manifest.get("categories_hash") != intent_categories_hash():
+            log_info(f"Intent model v{version} predates the current intent categories; retrain it")
+            return
+        yield version, path
+
+
+def latest_model_version() -> Optional[int]:
+    """Version load_intent_model would pick, without loading its weights"""
+    return next((version for version, _ in _accepted_versions()), None)
+
+
+def load_intent_model() -> Optional[IntentModel]:
+    """Newest accepted intent model trained on the current INTENT_CATEGORIES, or None"""
+    for version, path in _accepted_versions():
+        try:
+            model = IntentModel.load(path)
+        except ImportError:
+            return None
+        except Exception as e:
+            log_error(f"Failed to load intent model v{version}: {e}")
+            continue
+        log_info(f"Intent model v{version} loaded ({len(model.labels)} intents)")
+        return model
+    return None
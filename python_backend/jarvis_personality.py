@@ -152,38 +152,31 @@ class JarvisPersonality:
         else:
             return response
 
-    def detect_emotion(self, user_text: str) -> str:
+    def detect_emotion(self, user_text: str, features=None) -> str:
         """Very lightweight emotion detection from user text (hinglish + english)."""
         if not user_text:
             return "neutral"
 
-        t = user_text.lower()
+        # Keyword tables live in keyword_automaton (emotion_* groups)
+        from python_backend.keyword_automaton import features_for
+        features = features_for(user_text, features)
 
-        sad = ["sad", "down", "depressed", "cry", "lonely", "miss you", "hurt", "tired", "exhausted",
-               "dukhi", "udaas", "rona", "akela", "thak", "thaka", "tension", "pareshan", "stress"]
-        angry = ["angry", "mad", "furious", "annoyed", "irritated", "hate",
-                 "gussa", "chidh", "paagal", "bakwas", "ghussa"]
-        anxious = ["anxious", "worried", "panic", "scared", "afraid",
-                   "dar", "darr", "ghabra", "ghabrahat", "chinta", "worried"]
-        happy = ["happy", "great", "awesome", "love", "excited", "nice", "good job",
-                 "khush", "mazza", "badhiya", "mast", "shukriya", "thanks", "thank you"]
-
-        if any(k in t for k in angry):
+        if features.has("emotion_angry"):
             return "angry"
-        if any(k in t for k in anxious):
+        if features.has("emotion_anxious"):
             return "anxious"
-        if any(k in t for k in sad):
+        if features.has("emotion_sad"):
             return "sad"
-        if any(k in t for k in happy):
+        if features.has("emotion_happy"):
             return "happy"
         return "neutral"
 
-    def add_emotion_to_reply(self, user_text: str, reply_text: str) -> str:
+    def add_emotion_to_reply(self, user_text: str, reply_text: str, features=None) -> str:
         """Add empathy/feeling to the reply while keeping it short."""
         if not reply_text:
             return reply_text
 
-        emotion = self.detect_emotion(user_text)
+        emotion = self.detect_emotion(user_text, features)
 
         # Don't overdo it for pure action/system confirmations
         if len(reply_text) <= 12 and reply_text.endswith("."):
@@ -0,0 +1,174 @@
+"""
+VEDA AI - Append-Only Journal Store
+JSONL journal with a bounded in-memory tail and crash-safe compaction
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+from python_backend.logger import log_info, log_error, log_warning
+
+# ========================================
+# JOURNAL STORE
+# ========================================
+
+class JournalStore:
+    """
+    Append-only record store backed by a JSONL file
+
+    - append() writes one line, so per-record cost does not grow with history size
+    - The newest max_records records are kept in memory for reads
+    - When the file holds compact_factor x max_records lines it is rewritten
+      from the in-memory tail via temp file + rename (never half-written)
+    - A torn last line from a crash is cut off on load, so the next append
+      starts on a fresh line
+    - max_records=None keeps every record and never compacts
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_records: Optional[int] = 1000,
+        compact_factor: int = 2,
+        legacy_path: Optional[str] = None,
+        fsync: bool = False
+    ):
+        self.path = path
+        self.max_records = max_records
+        self.compact_threshold = max_records * max(compact_factor, 1) if max_records else None
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._tail: deque = deque(maxlen=max_records)
+        self._file_lines = 0
+        self._handle = None
+        self.appends = 0
+        self.compactions = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not os.path.exists(path) and legacy_path and os.path.exists(legacy_path):
+            self._migrate_legacy(legacy_path)
+        self._load()
+
+    def _migrate_legacy(self, legacy_path: str):
+        """Import records from an old JSON array file"""
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            if isinstance(records, list):
+                self._write_snapshot(records[-self.max_records:] if self.max_records else records)
+                log_info(f"Migrated {len(records)} records from {legacy_path} to {self.path}")
+        except Exception as e:
+            log_error(f"Journal migration from {legacy_path} failed: {e}")
+
+    def _load(self):
+        """Load the newest records from disk into the in-memory tail"""
+        if not os.path.exists(self.path):
+            return
+
+        skipped = 0
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            
+            # A crash mid-append leaves a line without its newline; appending
+            # after it would glue the next record onto the broken line
+            if data and not data.endswith(b"\n"):
+                end = data.rfind(b"\n") + 1
+                with open(self.path, 'r+b') as f:
+                    f.truncate(end)
+                data = data[:end]
+                skipped += 1
+            
+            for line in data.decode('utf-8', errors='replace').splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                self._file_lines += 1
+                try:
+                    self._tail.append(json.loads(line))
+                except ValueError:
+                    skipped += 1
+            if skipped:
+                log_warning(f"Skipped {skipped} corrupt journal lines in {self.path}")
+            log_info(f"Loaded {len(self._tail)} journal records from {self.path}")
+        except Exception as e:
+            log_error(f"Failed to load journal {self.path}: {e}")
+
+    def _write_snapshot(self, records: List[Dict]):
+        """Atomically replace the journal with the given records"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def append(self, record: Dict):
+        """Append one record (constant cost, thread-safe)"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            if self._handle is None:
+                self._handle = open(self.path, 'a', encoding='utf-8')
+            self._handle.write(line)
+            self._handle.flush()
+            if self.fsync:
+                os.fsync(self._handle.fileno())
+
+            self._tail.append(record)
+            self._file_lines += 1
+            self.appends += 1
+
+            if self.compact_threshold and self._file_lines >= self.compact_threshold:
+                self._compact_locked()
+
+    def _compact_locked(self):
+        try:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            self._write_snapshot(list(self._tail))
+            self._file_lines = len(self._tail)
+            self.compactions += 1
+            log_info(f"Journal compacted: {self.path} ({self._file_lines} records)")
+        except Exception as e:
+            log_error(f"Journal compaction failed: {e}")
+
+    def compact(self):
+        """Rewrite the journal so it only holds the in-memory tail"""
+        with self._lock:
+            self._compact_locked()
+
+    def records(self) -> List[Dict]:
+        """Get a snapshot of the retained records, oldest first"""
+        with self._lock:
+            return list(self._tail)
+
+    def __len__(self) -> int:
+        return len(self._tail)
+
+    def clear(self):
+        """Remove all records"""
+        with self._lock:
+            self._tail.clear()
+            self._compact_locked()
+
+    def close(self):
+        """Close the append handle"""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def get_stats(self) -> Dict:
+        """Get journal statistics"""
+        return {
+            "path": self.path,
+            "records": len(self._tail),
+            "file_lines": self._file_lines,
+            "appends": self.appends,
+            "compactions": self.compactions,
+        }
@@ -0,0 +1,221 @@
+"""
+VEDA AI - Keyword Automaton
+One Aho-Corasick pass over a command finds every keyword from every table
+"""
+
+import threading
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple
+
+# ========================================
+# KEYWORD TABLES
+# ========================================
+
+# Substring keywords used by the command pipeline, grouped by meaning.
+# Matching keeps the old `word in command` semantics (substrings, not words).
+KEYWORD_TABLES: Dict[str, Tuple[str, ...]] = {
+    # ai_engine.process_command
+    "greeting": ('hello', 'hi', 'hey', 'namaste', 'namaskar', 'good morning', 'good afternoon', 'good evening'),
+    "action": ('open', 'close', 'start', 'stop', 'play', 'pause', 'shutdown', 'restart',
+               'volume', 'brightness', 'search', 'find', 'create', 'delete', 'run',
+               'kholo', 'band', 'chalu', 'shuru', 'karo', 'बंद', 'खोलो', 'चालू'),
+    "weather": ('weather', 'mausam', 'मौसम'),
+    "weather_hinglish": ('mausam', 'मौसम', 'kaisa', 'kaise', 'कैसा', 'कैसे'),
+    "city_separator": (' aur ', ' और ', ' and '),
+
+    # system_control.handle_system_command
+    "open": ('open', 'kholo', 'start', 'chalu', 'launch', 'run', 'shuru'),
+    "close": ('close', 'band', 'stop', 'exit', 'quit'),
+    "website": ('youtube', 'google', 'gmail', 'facebook', 'instagram', 'twitter', 'whatsapp',
+                'spotify', 'netflix', 'amazon', 'linkedin', 'github', 'stackoverflow', 'reddit'),
+    "website_open": ('open', 'kholo', 'start', 'chalu', 'browse', 'search'),
+    "volume": ('volume', 'sound', 'audio'),
+    "volume_up": ('up', 'increase', 'badha', 'badhao', 'high', 'zyada'),
+    "volume_down": ('down', 'decrease', 'kam', 'kamao', 'low', 'kum'),
+    "volume_mute": ('mute', 'silent', 'chup', 'band'),
+    "volume_unmute": ('unmute', 'chalu', 'on'),
+    "folder": ('downloads', 'documents', 'pictures', 'photos', 'music', 'videos', 'desktop'),
+    "folder_open": ('open', 'kholo', 'show'),
+    "tool_open": ('open', 'kholo', 'start', 'chalu', 'show'),
+    "task_manager": ('task manager', 'taskmanager', 'taskmgr'),
+    "this_pc": ('this pc', 'my computer', 'mycomputer'),
+    "file_explorer": ('file explorer', 'fileexplorer', 'explorer'),
+    "control_panel": ('control panel', 'controlpanel'),
+    "settings": ('settings', 'setting'),
+    "command_prompt": ('command prompt', 'cmd', 'terminal'),
+    "powershell": ('powershell', 'power shell'),
+    "recycle_bin": ('recycle bin', 'recyclebin', 'trash'),
+    "screenshot": ('screenshot', 'screen capture'),
+    "screenshot_take": ('take', 'capture', 'le', 'lo', 'lena'),
+    "battery": ('battery',),
+    "battery_amount": ('kitni', 'how much'),
+    "wifi": ('wifi', 'wi-fi'),
+    "wifi_off": ('off', 'disable', 'band', 'close'),
+    "wifi_on": ('on', 'enable', 'chalu', 'start'),
+    "power_target": ('system', 'computer', 'pc', 'laptop'),
+    "power_action": ('lock', 'restart', 'shutdown', 'band'),
+    "app_skip": ('youtube', 'google', 'gmail', 'facebook', 'instagram', 'twitter',
+                 'downloads', 'documents', 'pictures', 'music', 'videos', 'desktop',
+                 'explorer', 'computer', 'settings', 'control panel', 'task manager',
+                 'this pc', 'my computer', 'recycle bin', 'command prompt', 'powershell',
+                 'wifi', 'volume', 'screenshot', 'battery', 'lock', 'restart', 'shutdown',
+                 'weather', 'mausam', 'time', 'date'),
+
+    # local_ai.local_ai_response
+    "time": ("time", "samay", "kitne baje", "baje"),
+    "time_hinglish": ("samay", "kitne baje", "baje", "batao"),
+    "date": ("date", "today", "tarikh", "aaj ki date"),
+    "date_hinglish": ("tarikh", "aaj ki date", "aaj"),
+    "affection": ("love you", "pyar", "like you"),
+    "compliment": ("smart", "intelligent", "clever", "genius", "achha", "badhiya"),
+    "compliment_english": ("smart", "intelligent", "clever", "genius"),
+    "system_info_target": ("system", "computer", "pc"),
+    "system_info": ("info", "information", "details", "specs"),
+    "question_hinglish": ("kya", "kaise", "kab", "kahan", "kaun", "kyun"),
+    "question_english": ("what", "how", "when", "where", "who", "why"),
+
+    # jarvis_personality.detect_emotion
+    "emotion_sad": ("sad", "down", "depressed", "cry", "lonely", "miss you", "hurt", "tired", "exhausted",
+                    "dukhi", "udaas", "rona", "akela", "thak", "thaka", "tension", "pareshan", "stress"),
+    "emotion_angry": ("angry", "mad", "furious", "annoyed", "irritated", "hate",
+                      "gussa", "chidh", "paagal", "bakwas", "ghussa"),
+    "emotion_anxious": ("anxious", "worried", "panic", "scared", "afraid",
+                        "dar", "darr", "ghabra", "ghabrahat", "chinta"),
+    "emotion_happy": ("happy", "great", "awesome", "love", "excited", "nice", "good job",
+                      "khush", "mazza", "badhiya", "mast", "shukriya", "thanks", "thank you"),
+}
+
+# ========================================
+# AHO-CORASICK AUTOMATON
+# ========================================
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher
+
+    Built once from all patterns; scanning a text is a single left-to-right
+    pass whose cost depends on the text length, not the number of patterns.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+
+        for pattern in set(patterns):
+            if pattern:
+                self._add(pattern)
+        self._build_links()
+
+    def _add(self, pattern: str):
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = nxt
+        self._output[node] = self._output[node] + (pattern,)
+
+    def _build_links(self):
+        """Breadth-first failure links; outputs inherit their fail node's outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (end_index, pattern) for every occurrence in text"""
+        node = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern in output[node]:
+                yield index, pattern
+
+    def find_all(self, text: str) -> Set[str]:
+        """Set of patterns that occur anywhere in text"""
+        return {pattern for _, pattern in self.iter_matches(text)}
+
+
+# ========================================
+# COMMAND FEATURES
+# ========================================
+
+class CommandFeatures:
+    """
+    Keywords found in one command, shared by every pipeline stage
+
+    - features.has("weather") - any keyword of a table matched
+    - "open" in features      - a single keyword matched (falls back to a
+                                substring check for keywords not in any table)
+    """
+
+    __slots__ = ("text", "matches", "groups")
+
+    def __init__(self, text: str, matches: FrozenSet[str], groups: FrozenSet[str]):
+        self.text = text
+        self.matches = matches
+        self.groups = groups
+
+    def has(self, group: str) -> bool:
+        return group in self.groups
+
+    def matched(self, group: str) -> List[str]:
+        """Matched keywords of a table, in table order"""
+        return [keyword for keyword in KEYWORD_TABLES.get(group, ()) if keyword in self.matches]
+
+    def __contains__(self, keyword: str) -> bool:
+        if keyword in _all_keywords:
+            return keyword in self.matches
+        return keyword in self.text
+
+    def __repr__(self) -> str:
+        return f"CommandFeatures(groups={sorted(self.groups)})"
+
+
+_automaton = None
+_all_keywords: FrozenSet[str] = frozenset()
+_keyword_groups: Dict[str, Tuple[str, ...]] = {}
+_lock = threading.Lock()
+
+def _get_automaton() -> AhoCorasick:
+    """Compile every keyword table into one automaton (once)"""
+    global _automaton, _all_keywords, _keyword_groups
+    if _automaton is None:
+        with _lock:
+            if _automaton is None:
+                groups: Dict[str, List[str]] = {}
+                for group, keywords in KEYWORD_TABLES.items():
+                    for keyword in keywords:
+                        groups.setdefault(keyword, []).append(group)
+                _keyword_groups = {keyword: tuple(names) for keyword, names in groups.items()}
+                _all_keywords = frozenset(groups)
+                _automaton = AhoCorasick(_all_keywords)
+    return _automaton
+
+
+def scan_command(text: str) -> CommandFeatures:
+    """Lowercase text and find every table keyword in one pass"""
+    text = (text or "").lower().strip()
+    matches = frozenset(_get_automaton().find_all(text))
+    groups = frozenset(group for keyword in matches for group in _keyword_groups[keyword])
+    return CommandFeatures(text, matches, groups)
+
+
+def features_for(text: str, features: "CommandFeatures" = None) -> CommandFeatures:
+    """Reuse features computed upstream if they describe this text, else scan"""
+    if features is not None and features.text == (text or "").lower().strip():
+        return features
+    return scan_command(text)
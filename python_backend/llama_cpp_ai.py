@@ -0,0 +1,304 @@
+"""
+VEDA AI - In-process llama.cpp Backend
+Runs quantized GGUF models inside the server process (pip install llama-cpp-python)
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
+from python_backend.logger import log_info, log_warning
+from python_backend.utils import physical_cores
+from python_backend.ml_config import (
+    LLAMA_CPP_MODEL_PATH, LLAMA_CPP_CONTEXT, LLAMA_CPP_THREADS, LLAMA_CPP_BATCH_THREADS,
+    LLAMA_CPP_BATCH, LLAMA_CPP_MMAP, LLAMA_CPP_MLOCK, LLAMA_CPP_GPU_LAYERS,
+    LLAMA_CPP_MAX_TOKENS, LLAMA_CPP_SESSION_STATES
+)
+
+# Chat-template tokens around each message (role header, end-of-turn marker)
+TEMPLATE_TOKENS_PER_MESSAGE = 8
+
+
+# ========================================
+# LLAMA.CPP ENGINE
+# ========================================
+
+class LlamaCppEngine:
+    """
+    One GGUF model loaded in-process, shared by all requests
+
+    - The model file is memory-mapped (LLAMA_CPP_MMAP), so loading is quick
+      and the OS shares pages between restarts
+    - Generation uses physical cores, prompt evaluation all logical cores,
+      unless LLAMA_CPP_THREADS / LLAMA_CPP_BATCH_THREADS say otherwise
+    - llama.cpp reuses the KV cache for the prompt prefix shared with the
+      previous call; when requests alternate between sessions, each
+      session's KV state is saved and restored so its history is not
+      re-evaluated (up to LLAMA_CPP_SESSION_STATES sessions)
+    - Prompts are counted with the model's tokenizer; the oldest history
+      turns are dropped if prompt + max_tokens would overflow n_ctx
+    - The model is not thread-safe, so generations run one at a time
+    """
+
+    def __init__(
+        self,
+        model_path: str = LLAMA_CPP_MODEL_PATH,
+        n_ctx: int = LLAMA_CPP_CONTEXT,
+        threads: int = LLAMA_CPP_THREADS,
+        batch_threads: int = LLAMA_CPP_BATCH_THREADS,
+        max_session_states: int = LLAMA_CPP_SESSION_STATES
+    ):
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.threads = threads or physical_cores()
+        self.batch_threads = batch_threads or (os.cpu_count() or self.threads)
+        self.max_session_states = max_session_states
+        self._llm = None
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[str, object]" = OrderedDict()
+        self._active_session: Optional[str] = None
+
+        # Metrics
+        self.load_seconds: Optional[float] = None
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.generation_seconds = 0.0
+        self.state_restores = 0
+        self.trimmed_prompts = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.model_path) and os.path.exists(self.model_path)
+
+    @property
+    def loaded(self) -> bool:
+        return self._llm is not None
+
+    def load(self) -> bool:
+        """Load the model once; False if no model is configured or llama-cpp-python is missing"""
+        if self._llm is not None:
+            return True
+        if not self.configured:
+            if self.model_path:
+                log_warning(f"GGUF model not found: {self.model_path}")
+            return False
+
+        with self._load_lock:
+            if self._llm is not None:
+                return True
+            try:
+                from llama_cpp import Llama
+            except ImportError:
+                log_warning("llama-cpp-python not installed. Run: pip install llama-cpp-python")
+                return False
+
+            started = time.perf_counter()
+            self._llm = Llama(
+                model_path=self.model_path,
+                n_ctx=self.n_ctx,
+                n_threads=self.threads,
+                n_threads_batch=self.batch_threads,
+                n_batch=LLAMA_CPP_BATCH,
+                n_gpu_layers=LLAMA_CPP_GPU_LAYERS,
+                use_mmap=LLAMA_CPP_MMAP,
+                use_mlock=LLAMA_CPP_MLOCK,
+                verbose=False
+            )
+            self.load_seconds = round(time.perf_counter() - started, 2)
+            log_info(
+                f"GGUF model loaded: {os.path.basename(self.model_path)} "
+                f"({self.threads} threads, {self.batch_threads} batch threads, {self.load_seconds}s)"
+            )
+            return True
+
+    def _switch_session(self, session_id: Optional[str]):
+        """Park the active session's KV state and resume session_id's (call with _lock held)"""
+        if session_id is None or session_id == self._active_session:
+            return
+
+        if self._active_session is not None and self.max_session_states > 0:
+            self._states[self._active_session] = self._llm.save_state()
+            self._states.move_to_end(self._active_session)
+            while len(self._states) > self.max_session_states:
+                self._states.popitem(last=False)
+
+        state = self._states.get(session_id)
+        if state is not None:
+            self._llm.load_state(state)
+            self.state_restores += 1
+        self._active_session = session_id
+
+    def _count_tokens(self, message: Dict) -> int:
+        content = (message.get("content") or "").encode("utf-8")
+        return len(self._llm.tokenize(content, add_bos=False, special=True)) + TEMPLATE_TOKENS_PER_MESSAGE
+
+    def _fit(self, messages: List[Dict], max_tokens: int) -> List[Dict]:
+        """
+        Drop the oldest history turns (keeping the system prompt and the
+        question) until the prompt leaves max_tokens free in the context
+        window (call with _lock held)
+        """
+        limit = self.n_ctx - max_tokens - TEMPLATE_TOKENS_PER_MESSAGE
+        messages = list(messages)
+        counts = [self._count_tokens(message) for message in messages]
+        if sum(counts) <= limit:
+            return messages
+
+        first = 1 if messages and messages[0].get("role") == "system" else 0
+        while len(messages) - first > 1 and (sum(counts) > limit or messages[first].get("role") != "user"):
+            del messages[first]
+            del counts[first]
+        self.trimmed_prompts += 1
+        if sum(counts) > limit:
+            log_warning(f"llama.cpp prompt still too long ({sum(counts)} > {limit} tokens)")
+        return messages
+
+    def _record(self, prompt_tokens: int, completion_tokens: int, seconds: float):
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.generation_seconds += seconds
+
+    def chat(
+        self,
+        messages: List[Dict],
+        session_id: Optional[str] = None,
+        max_tokens: int = LLAMA_CPP_MAX_TOKENS
+    ) -> Optional[str]:
+        """Complete a chat; None if the model is unavailable"""
+        if not self.load():
+            return None
+
+        with self._lock:
+            self._switch_session(session_id)
+            started = time.perf_counter()
+            result = self._llm.create_chat_completion(
+                messages=self._fit(messages, max_tokens),
+                max_tokens=max_tokens,
+                temperature=0.7
+            )
+            usage = result.get("usage") or {}
+            self._record(
+                usage.get("prompt_tokens", 0),
+                usage.get("completion_tokens", 0),
+                time.perf_counter() - started
+            )
+
+        text = result["choices"][0]["message"].get("content") or ""
+        return text.strip() or None
+
+    def stream_chat(
+        self,
+        messages: List[Dict],
+        session_id: Optional[str] = None,
+        max_tokens: int = LLAMA_CPP_MAX_TOKENS
+    ) -> Iterator[str]:
+        """
+        Yield text deltas; yields nothing if the model is unavailable
+
+        Generation runs on a worker thread that owns the model lock and
+        feeds an unbounded queue, so a consumer that stops reading never
+        keeps other requests waiting: closing the generator stops the
+        worker at the next token, and an abandoned one finishes at
+        max_tokens at the latest.
+        """
+        if not self.load():
+            return
+
+        deltas: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+
+        def generate():
+            chunks = 0
+            started = time.perf_counter()
+            try:
+                with self._lock:
+                    self._switch_session(session_id)
+                    started = time.perf_counter()
+                    for chunk in self._llm.create_chat_completion(
+                        messages=self._fit(messages, max_tokens),
+                        max_tokens=max_tokens,
+                        temperature=0.7,
+                        stream=True
+                    ):
+                        if stop.is_set():
+                            break
+                        delta = chunk["choices"][0].get("delta", {}).get("content")
+                        if delta:
+                            # llama.cpp streams one token per chunk
+                            chunks += 1
+                            deltas.put(delta)
+                    self._record(0, chunks, time.perf_counter() - started)
+            except Exception as e:
+                deltas.put(e)
+            finally:
+                deltas.put(None)
+
+        threading.Thread(target=generate, name="veda-llama-cpp-stream", daemon=True).start()
+        try:
+            while True:
+                item = deltas.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def reset_session(self, session_id: Optional[str] = None):
+        """Forget saved KV states (one session's, or all)"""
+        with self._lock:
+            if session_id is None:
+                self._states.clear()
+                self._active_session = None
+            else:
+                self._states.pop(session_id, None)
+                if self._active_session == session_id:
+                    self._active_session = None
+
+    def get_stats(self) -> Dict:
+        """Load state, threads and throughput for /health"""
+        return {
+            "model": os.path.basename(self.model_path) if self.model_path else None,
+            "loaded": self.loaded,
+            "load_seconds": self.load_seconds,
+            "threads": self.threads,
+            "batch_threads": self.batch_threads,
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": (
+                round(self.completion_tokens / self.generation_seconds, 1)
+                if self.generation_seconds else None
+            ),
+            "session_states": len(self._states),
+            "state_restores": self.state_restores,
+            "trimmed_prompts": self.trimmed_prompts,
+        }
+
+
+# ========================================
+# GLOBAL INSTANCE
+# ========================================
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_llama_cpp_engine() -> LlamaCppEngine:
+    """Get or create the global llama.cpp engine (the model loads on first use or warm-up)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = LlamaCppEngine()
+    return _engine
+
+
+def get_llama_cpp_stats() -> Dict:
+    """Convenience function for /health"""
+    return get_llama_cpp_engine().get_stats()
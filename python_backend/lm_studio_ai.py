@@ -6,46 +6,254 @@ LM Studio provides OpenAI-compatible API
 """
 import requests
 import json
+import threading
+import time
+from collections import OrderedDict
 from python_backend.logger import log_error, log_info, log_warning
-from python_backend.config import LM_STUDIO_API_URL as CONFIG_LM_URL, LM_STUDIO_MODEL, LM_STUDIO_TIMEOUT, LM_STUDIO_MAX_RETRIES
+from python_backend.http_pool import get_http_session
+from python_backend.provider_health import get_health_monitor, lm_studio_backend
+from python_backend.config import (
+    LM_STUDIO_API_URL as CONFIG_LM_URL, LM_STUDIO_MODEL, LM_STUDIO_TIMEOUT, LM_STUDIO_MAX_RETRIES,
+    LM_STUDIO_SESSION_MODE, LM_STUDIO_SESSION_TOKENS, LM_STUDIO_MAX_SESSIONS
+)
 
 LM_STUDIO_API_URL = CONFIG_LM_URL + "/v1/chat/completions"
 DEFAULT_MODEL = LM_STUDIO_MODEL
 MAX_RETRIES = LM_STUDIO_MAX_RETRIES
 
-def lm_studio_response(prompt, model=DEFAULT_MODEL):
-    """Get response from local LM Studio model with retry logic
-    
-    LM Studio provides OpenAI-compatible API, making it easy to use
-    """
-    # Detect language
-    is_hindi = any(word in prompt.lower() for word in ['kya', 'kaise', 'kaun', 'kab', 'kahan', 'mujhe', 'aap', 'tum', 'hai', 'ho'])
-    
-    system_prompt = """You are VEDA AI, a friendly AI assistant. 
+# Kept byte-identical across requests: any change invalidates the server's prompt cache
+SYSTEM_PROMPT = """You are VEDA AI, a friendly AI assistant. 
     - Keep responses short (2-3 sentences)
     - Be conversational and helpful
     - If user speaks Hindi/Hinglish, respond in Hinglish
     """
+
+class LMStudioSessions:
+    """Append-only transcripts per session_id
+    
+    Every request re-sends the same system prompt and earlier turns byte for
+    byte and appends only the new question, so LM Studio (llama.cpp) reuses
+    the KV cache of the prefix and evaluates just the new tokens. When a
+    transcript outgrows max_tokens, the oldest half of its turns is dropped
+    at once - one cache miss, then a stable prefix again.
+    """
+    
+    def __init__(self, max_tokens=LM_STUDIO_SESSION_TOKENS, max_sessions=LM_STUDIO_MAX_SESSIONS):
+        self.max_tokens = max_tokens
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session_id -> list of user/assistant messages
+        self._lock = threading.Lock()
+        self.compactions = 0
+    
+    def history(self, session_id):
+        """Earlier turns of the session (copy)"""
+        with self._lock:
+            return list(self._sessions.get(session_id, []))
+    
+    def messages_for(self, session_id, prompt):
+        """System prompt + transcript + new question"""
+        return (
+            [{"role": "system", "content": SYSTEM_PROMPT}]
+            + self.history(session_id)
+            + [{"role": "user", "content": prompt}]
+        )
+    
+    def commit(self, session_id, prompt, answer):
+        """Append a finished turn to the transcript"""
+        from python_backend.prompt_builder import get_prompt_builder
+        
+        builder = get_prompt_builder()
+        with self._lock:
+            transcript = self._sessions.setdefault(session_id, [])
+            self._sessions.move_to_end(session_id)
+            transcript.append({"role": "user", "content": prompt})
+            transcript.append({"role": "assistant", "content": answer})
+            
+            tokens = sum(builder.count("lm_studio", msg["content"]) for msg in transcript)
+            if tokens > self.max_tokens and len(transcript) > 2:
+                # Keep whole turns so the transcript still starts with a user message
+                turns = len(transcript) // 2
+                del transcript[:2 * ((turns + 1) // 2)]
+                self.compactions += 1
+            
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+    
+    def reset(self, session_id=None):
+        with self._lock:
+            if session_id is None:
+                self._sessions.clear()
+            else:
+                self._sessions.pop(session_id, None)
+    
+    def __len__(self):
+        return len(self._sessions)
+
+class LMStudioUsage:
+    """Prompt-eval vs. generation timings of LM Studio requests
+    
+    Reads whatever the server reports: OpenAI `usage` token counts,
+    llama.cpp `timings` (prompt_ms / predicted_ms / cache_n) or LM Studio
+    `stats` (time_to_first_token / generation_time). When no timings come
+    back, a stream's time to first token stands in for prompt evaluation.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.prompt_eval_seconds = 0.0
+        self.generation_seconds = 0.0
+        self.timed_requests = 0
+        self.last = None
+    
+    def record(self, report, wall_seconds, first_token_seconds=None, session_id=None):
+        usage = report.get("usage") or {}
+        timings = report.get("timings") or {}
+        stats = report.get("stats") or {}
+        
+        prompt_tokens = usage.get("prompt_tokens") or timings.get("prompt_n") or 0
+        completion_tokens = usage.get("completion_tokens") or timings.get("predicted_n") or 0
+        cached_tokens = (
+            timings.get("cache_n")
+            or (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+            or 0
+        )
+        
+        if "prompt_ms" in timings and "predicted_ms" in timings:
+            prompt_eval = timings["prompt_ms"] / 1000
+            generation = timings["predicted_ms"] / 1000
+        elif "time_to_first_token" in stats and "generation_time" in stats:
+            prompt_eval = stats["time_to_first_token"]
+            generation = stats["generation_time"]
+        elif first_token_seconds is not None:
+            prompt_eval = first_token_seconds
+            generation = max(wall_seconds - first_token_seconds, 0.0)
+        else:
+            prompt_eval = generation = None
+        
+        entry = {
+            "session_id": session_id,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "prompt_eval_seconds": round(prompt_eval, 3) if prompt_eval is not None else None,
+            "generation_seconds": round(generation, 3) if generation is not None else None,
+            "wall_seconds": round(wall_seconds, 3),
+        }
+        
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cached_tokens += cached_tokens
+            if prompt_eval is not None:
+                self.timed_requests += 1
+                self.prompt_eval_seconds += prompt_eval
+                self.generation_seconds += generation
+            self.last = entry
+        return entry
+    
+    def get_stats(self):
+        with self._lock:
+            timed = self.timed_requests
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cached_prompt_tokens": self.cached_tokens,
+                "avg_prompt_eval_seconds": round(self.prompt_eval_seconds / timed, 3) if timed else None,
+                "avg_generation_seconds": round(self.generation_seconds / timed, 3) if timed else None,
+                "generation_tokens_per_second": (
+                    round(self.completion_tokens / self.generation_seconds, 1)
+                    if self.generation_seconds else None
+                ),
+                "last": self.last,
+            }
+
+_sessions = LMStudioSessions()
+_usage = LMStudioUsage()
+
+def _session_key(session_id):
+    """Transcript key, or None when session mode is off"""
+    if not LM_STUDIO_SESSION_MODE:
+        return None
+    return session_id or "default"
+
+def _build_payload(prompt, model=DEFAULT_MODEL, stream=False, session_id=None):
+    """Build the OpenAI-compatible chat payload sent to LM Studio"""
+    if session_id is not None:
+        messages = _sessions.messages_for(session_id, prompt)
+    else:
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
     
     # OpenAI-compatible format (LM Studio uses this)
     payload = {
         "model": model,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt}
-        ],
+        "messages": messages,
         "temperature": 0.7,
         "max_tokens": 150,
-        "stream": False
+        "stream": stream,
+        # Ask llama.cpp-based servers to keep the evaluated prefix for the next turn
+        "cache_prompt": True
     }
+    if stream:
+        # Final chunk carries the usage block
+        payload["stream_options"] = {"include_usage": True}
+    return payload
+
+def lm_studio_response(prompt, model=DEFAULT_MODEL, session_id=None):
+    """Get response from local LM Studio model with retry logic
+    
+    LM Studio provides OpenAI-compatible API, making it easy to use.
+    Repeated questions are answered from the response cache.
+    In session mode the turn is appended to the session's transcript.
+    """
+    from python_backend.response_cache import get_response_cache
+    
+    sid = _session_key(session_id)
+    cache = get_response_cache()
+    namespace = f"lm_studio:{model}"
+    history = _sessions.history(sid) if sid else None
+    
+    bypass = cache.should_bypass(prompt, history)
+    response = cache.get(prompt, namespace, history, bypass)
+    if not response:
+        response = _request_completion(prompt, model, sid)
+        if response:
+            cache.put(prompt, namespace, "lm_studio", response, history, bypass)
+    
+    if response and sid:
+        _sessions.commit(sid, prompt, response)
+    return response
+
+def _request_completion(prompt, model, session_id=None):
+    """POST one chat completion to LM Studio (with retries)
+    
+    Skipped outright while the health monitor knows the server is down.
+    """
+    monitor = get_health_monitor()
+    backend = lm_studio_backend()
+    if not monitor.is_up(backend):
+        return None
+    
+    payload = _build_payload(prompt, model, session_id=session_id)
     
     # Retry logic for timeout errors
     for attempt in range(MAX_RETRIES + 1):
         try:
-            response = requests.post(LM_STUDIO_API_URL, json=payload, timeout=LM_STUDIO_TIMEOUT)
+            started = time.monotonic()
+            response = get_http_session().post(LM_STUDIO_API_URL, json=payload, timeout=LM_STUDIO_TIMEOUT)
             
             if response.status_code == 200:
+                monitor.report_success(backend)
                 result = response.json()
+                _usage.record(result, time.monotonic() - started, session_id=session_id)
                 # Extract response from OpenAI-compatible format
                 if "choices" in result and len(result["choices"]) > 0:
                     message = result["choices"][0].get("message", {})
@@ -65,6 +273,7 @@ def lm_studio_response(prompt, model=DEFAULT_MODEL):
                 
         except requests.exceptions.ConnectionError:
             log_error("LM Studio not running. Please start LM Studio and load a model, then enable the local server.")
+            monitor.report_failure(backend)
             return None
             
         except Exception as e:
@@ -73,6 +282,111 @@ def lm_studio_response(prompt, model=DEFAULT_MODEL):
     
     return None
 
+def iter_sse_deltas(response, report=None):
+    """Yield content deltas from an OpenAI-compatible server-sent events stream
+    
+    If report is a dict, usage / timings / stats blocks seen in the stream
+    are stored in it, and "finished" is set once the server ends the answer
+    ([DONE] or a finish_reason) rather than the connection just dropping.
+    """
+    for raw_line in response.iter_lines(decode_unicode=True):
+        if not raw_line or not raw_line.startswith("data:"):
+            continue
+        
+        data = raw_line[len("data:"):].strip()
+        if data == "[DONE]":
+            if report is not None:
+                report["finished"] = True
+            break
+        
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        
+        if report is not None:
+            for key in ("usage", "timings", "stats"):
+                if chunk.get(key):
+                    report[key] = chunk[key]
+        
+        choices = chunk.get("choices") or []
+        if choices:
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+            if choices[0].get("finish_reason") and report is not None:
+                report["finished"] = True
+
+def lm_studio_stream(prompt, model=DEFAULT_MODEL, session_id=None):
+    """Stream a response from LM Studio, yielding text deltas as they arrive
+    
+    Yields nothing if LM Studio is unavailable, so callers can fall back.
+    A cached answer is yielded as a single delta.
+    In session mode the finished turn is appended to the session's transcript.
+    """
+    from python_backend.response_cache import get_response_cache
+    
+    sid = _session_key(session_id)
+    history = _sessions.history(sid) if sid else None
+    report = {}
+    parts = []
+    for delta in get_response_cache().cached_stream(
+        prompt, f"lm_studio:{model}", "lm_studio", _stream_completion(prompt, model, sid, report), history, report
+    ):
+        parts.append(delta)
+        yield delta
+    
+    if parts and sid:
+        _sessions.commit(sid, prompt, "".join(parts).strip())
+
+def _stream_completion(prompt, model, session_id=None, report=None):
+    """Stream one chat completion from LM Studio (nothing while it is known to be down)
+    
+    report (a dict) receives the server's usage / timings and "finished".
+    """
+    monitor = get_health_monitor()
+    backend = lm_studio_backend()
+    if not monitor.is_up(backend):
+        return
+    
+    payload = _build_payload(prompt, model, stream=True, session_id=session_id)
+    
+    try:
+        started = time.monotonic()
+        with get_http_session().post(LM_STUDIO_API_URL, json=payload, timeout=LM_STUDIO_TIMEOUT, stream=True) as response:
+            if response.status_code != 200:
+                log_error(f"LM Studio API error: {response.status_code}")
+                return
+            
+            monitor.report_success(backend)
+            report = report if report is not None else {}
+            first_token = None
+            for delta in iter_sse_deltas(response, report):
+                if first_token is None:
+                    first_token = time.monotonic() - started
+                yield delta
+            _usage.record(report, time.monotonic() - started, first_token, session_id)
+    
+    except requests.exceptions.Timeout:
+        log_error("LM Studio stream timeout. Consider using a faster model or increasing timeout.")
+    except requests.exceptions.ConnectionError:
+        log_error("LM Studio not running. Please start LM Studio and load a model, then enable the local server.")
+        monitor.report_failure(backend)
+    except Exception as e:
+        log_error(f"LM Studio stream error: {e}")
+
+def get_lm_studio_stats():
+    """Prompt-eval / generation timings and session transcripts for /health"""
+    stats = _usage.get_stats()
+    stats["session_mode"] = LM_STUDIO_SESSION_MODE
+    stats["sessions"] = len(_sessions)
+    stats["session_compactions"] = _sessions.compactions
+    return stats
+
+def reset_lm_studio_session(session_id=None):
+    """Forget a session's transcript (all sessions if session_id is None)"""
+    _sessions.reset(session_id)
+
 # Backward compatibility alias
 def ollama_response(prompt, model=DEFAULT_MODEL):
     """Backward compatibility - redirects to LM Studio"""
@@ -112,7 +426,7 @@ def list_lm_studio_models():
     try:
         # LM Studio uses OpenAI-compatible API
         models_url = CONFIG_LM_URL + "/v1/models"
-        response = requests.get(models_url, timeout=5)
+        response = get_http_session().get(models_url, timeout=5)
         
         if response.status_code == 200:
             result = response.json()
@@ -1,24 +1,26 @@
 from python_backend.jarvis_personality import get_jarvis
+from python_backend.keyword_automaton import features_for
 
-def local_ai_response(command):
+def local_ai_response(command, features=None):
     """Offline AI responses with JARVIS personality and Hinglish support - NO CHATGPT REQUIRED"""
     
     jarvis = get_jarvis()
+    features = features_for(command, features)
     
     # ⚡ PRIORITY CHECKS - Time/Date (check FIRST before dictionary matching)
     # Time queries (both languages)
-    if any(word in command for word in ["time", "samay", "kitne baje", "baje"]):
+    if features.has("time"):
         from datetime import datetime
         time_str = datetime.now().strftime('%I:%M %p')
-        if any(word in command for word in ["samay", "kitne baje", "baje", "batao"]):
+        if features.has("time_hinglish"):
             return f"{jarvis.owner_name}, abhi {time_str} baj rahe hain."
         return f"{jarvis.owner_name}, it's {time_str} right now."
 
     # Date queries (both languages)
-    if any(word in command for word in ["date", "today", "tarikh", "aaj ki date"]):
+    if features.has("date"):
         from datetime import datetime
         date_str = datetime.now().strftime('%A, %B %d, %Y')
-        if any(word in command for word in ["tarikh", "aaj ki date", "aaj"]):
+        if features.has("date_hinglish"):
             return f"{jarvis.owner_name}, aaj {date_str} hai."
         return f"{jarvis.owner_name}, today is {date_str}."
     
@@ -80,33 +82,33 @@ def local_ai_response(command):
             return qa_english[q]
     
     # Weather queries - redirect to weather command
-    if "weather" in command or "mausam" in command:
-        if "mausam" in command:
+    if "weather" in features or "mausam" in features:
+        if "mausam" in features:
             return f"{jarvis.owner_name}, weather check karne ke liye 'weather' command use karein. Example: 'Delhi ka weather batao'"
         return f"{jarvis.owner_name}, to check weather, use the weather command. Example: 'weather in Delhi'"
     
     # Conversational responses
-    if any(word in command for word in ["love you", "pyar", "like you"]):
-        if "love" in command:
+    if features.has("affection"):
+        if "love" in features:
             return f"That's very kind of you, {jarvis.owner_name}. I'm always here to serve you."
         return f"Bahut achha laga sunkar, {jarvis.owner_name}. Main hamesha aapke saath hoon."
     
-    if any(word in command for word in ["smart", "intelligent", "clever", "genius", "achha", "badhiya"]):
-        if any(w in command for w in ["smart", "intelligent", "clever", "genius"]):
+    if features.has("compliment"):
+        if features.has("compliment_english"):
             return f"Thank you, {jarvis.owner_name}. I strive to serve you better every day."
         return f"Shukriya, {jarvis.owner_name}. Main hamesha behtar hone ki koshish karta hoon."
     
     # System info queries
-    if "system" in command or "computer" in command or "pc" in command:
-        if any(w in command for w in ["info", "information", "details", "specs"]):
+    if features.has("system_info_target"):
+        if features.has("system_info"):
             import platform
             return f"{jarvis.owner_name}, you're running {platform.system()} {platform.release()} on {platform.machine()} architecture."
     
     # Default responses based on language - MORE HELPFUL
-    if any(word in command for word in ["kya", "kaise", "kab", "kahan", "kaun", "kyun"]):
+    if features.has("question_hinglish"):
         return f"Samajh gaya {jarvis.owner_name}. Main aapki madad karne ke liye yahaan hoon. Kya aap thoda aur detail mein bata sakte hain?"
     
-    if any(word in command for word in ["what", "how", "when", "where", "who", "why"]):
+    if features.has("question_english"):
         return f"I understand, {jarvis.owner_name}. I'm here to help. Could you provide more details about what you need?"
     
     # Generic helpful response
@@ -27,8 +27,22 @@ from python_backend.automation_engine import (
     get_automation_status
 )
 from python_backend.proactive_assistant import get_proactive_assistant
-from python_backend.context_awareness import get_context_awareness
+from python_backend.context_awareness import get_context_awareness, flush_context_data
 from python_backend.task_scheduler import get_task_scheduler
+from python_backend.command_dispatcher import get_command_dispatcher, DispatcherBusy
+from python_backend.config import STREAM_RESPONSES
+from python_backend.http_pool import get_pool_stats, close_http_pools, close_async_http_client
+from python_backend.model_manager import get_model_manager
+from python_backend.embedding_service import get_embedding_stats
+from python_backend.response_cache import get_response_cache
+from python_backend.weather_cache import get_weather_cache_stats
+from python_backend.ai_providers import get_provider_router
+from python_backend.prompt_builder import get_prompt_builder
+from python_backend.lm_studio_ai import get_lm_studio_stats, reset_lm_studio_session
+from python_backend.llama_cpp_ai import get_llama_cpp_engine, get_llama_cpp_stats
+from python_backend.huggingface_ai import get_huggingface_stats
+from python_backend.hot_commands import get_hot_commands
+from python_backend.provider_health import get_health_monitor
 
 # ================= APP INIT =================
 settings = load_settings()
@@ -86,12 +100,57 @@ if not IS_CLOUD:
     except Exception as e:
         log_error(f"Automation start failed: {e}")
 
+# ================= MODEL WARM-UP =================
+@app.on_event("startup")
+async def warm_models():
+    # Serve immediately; keyword fallbacks answer until each model is ready
+    get_model_manager().start_warmup()
+    # Probe AI backends in the background so requests skip dead ones
+    get_health_monitor()
+
 # ================= WEBSOCKET =================
 active_connections = []
+dispatcher = get_command_dispatcher()
+
+async def run_command_streaming(ws: WebSocket, connection_id: str, session_id: str, command: str):
+    """Run a command on the dispatcher, pushing LLM token deltas to the client as they arrive"""
+    # Callbacks can't cross a process pool, so process mode only sends the final frame
+    if not STREAM_RESPONSES or dispatcher.mode == "process":
+        return await dispatcher.run(
+            connection_id, process_command, command, session_id=session_id, prompt_session=connection_id
+        )
+
+    loop = asyncio.get_running_loop()
+    deltas: asyncio.Queue = asyncio.Queue()
+
+    def on_delta(delta: str):
+        # Called from the worker thread
+        loop.call_soon_threadsafe(deltas.put_nowait, delta)
+
+    async def forward_deltas():
+        while True:
+            delta = await deltas.get()
+            if delta is None:
+                break
+            await ws.send_json({"type": "delta", "command": command, "delta": delta})
+
+    forwarder = asyncio.create_task(forward_deltas())
+    try:
+        return await dispatcher.run(
+            connection_id, process_command, command,
+            session_id=session_id, prompt_session=connection_id, on_delta=on_delta
+        )
+    finally:
+        deltas.put_nowait(None)
+        await forwarder
 
 @app.websocket("/ws")
 async def ws_endpoint(ws: WebSocket):
     client_id = get_client_id(websocket=ws)
+    connection_id = f"{client_id}:{id(ws)}"
+    # Conversation memory: client-supplied (?session=...), else the shared default session
+    # so history and learned context survive reconnects; LLM prompt state is per connection
+    session_id = ws.query_params.get("session") or "default"
 
     await ws.accept()
     active_connections.append(ws)
@@ -107,17 +166,39 @@ async def ws_endpoint(ws: WebSocket):
                 continue
 
             command = await ws.receive_text()
-            response = process_command(command)
-            await ws.send_json({"command": command, "response": response})
+
+            # Run the blocking pipeline on the worker pool so other clients stay responsive
+            try:
+                response = await run_command_streaming(ws, connection_id, session_id, command)
+            except DispatcherBusy as busy:
+                await ws.send_json({
+                    "command": command,
+                    "error": "Server busy, please retry",
+                    "retry_after": busy.retry_after
+                })
+                continue
+
+            await ws.send_json({"type": "final", "command": command, "response": response})
 
     except WebSocketDisconnect:
         log_info(f"WS disconnected: {client_id}")
     except Exception as e:
         log_error(f"WS error: {e}")
     finally:
+        dispatcher.release_connection(connection_id)
+        # Nobody can resume this connection's LLM prompt state
+        reset_lm_studio_session(connection_id)
+        get_llama_cpp_engine().reset_session(connection_id)
         if ws in active_connections:
             active_connections.remove(ws)
 
+@app.on_event("shutdown")
+async def shutdown_workers():
+    dispatcher.shutdown()
+    flush_context_data()
+    close_http_pools()
+    await close_async_http_client()
+
 # ================= API =================
 @app.get("/health")
 def health(request: Request):
@@ -128,6 +209,19 @@ def health(request: Request):
         "cloud": IS_CLOUD,
         "owner": jarvis.owner_name,
         "connections": len(active_connections),
+        "dispatcher": dispatcher.get_stats(),
+        "http_pool": get_pool_stats(),
+        "models": get_model_manager().get_status(),
+        "embeddings": get_embedding_stats(),
+        "response_cache": get_response_cache().get_stats(),
+        "weather_cache": get_weather_cache_stats(),
+        "providers": get_provider_router().get_stats(),
+        "provider_health": get_health_monitor().get_status(),
+        "prompts": get_prompt_builder().get_stats(),
+        "lm_studio": get_lm_studio_stats(),
+        "llama_cpp": get_llama_cpp_stats(),
+        "huggingface": get_huggingface_stats(),
+        "hot_commands": get_hot_commands().get_stats(),
     }
 
 @app.get("/settings")
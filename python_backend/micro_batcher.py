@@ -0,0 +1,120 @@
+"""
+VEDA AI - Micro-Batcher
+Collects concurrent model calls for a few milliseconds and runs them as one batch
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# ========================================
+# MICRO-BATCHER
+# ========================================
+
+class MicroBatcher:
+    """
+    Merges items submitted from many threads into batched calls
+
+    - submit(item) returns a Future resolved with that item's result
+    - A daemon worker takes the first waiting item, then keeps collecting
+      until max_batch items are queued or max_latency seconds have passed
+      since that first item arrived, and calls process(items) once
+    - process must return one result per item, in order; if it raises,
+      every future of the batch gets the exception
+    - The worker starts on the first submit
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List], List],
+        max_batch: int = 8,
+        max_latency: float = 0.01,
+        name: str = "batcher"
+    ):
+        self.process = process
+        self.max_batch = max(max_batch, 1)
+        self.max_latency = max(max_latency, 0.0)
+        self.name = name
+        self._queue: Deque[Tuple[object, Future, float]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.max_seen_batch = 0
+        self.wait_seconds = 0.0
+        self.busy_seconds = 0.0
+
+    def submit(self, item) -> Future:
+        """Queue one item; the future resolves once its batch has run"""
+        future: Future = Future()
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"veda-{self.name}-batcher", daemon=True)
+                self._thread.start()
+            self._queue.append((item, future, time.monotonic()))
+            self._cond.notify()
+        return future
+
+    def __call__(self, item, timeout: Optional[float] = None):
+        """Submit and wait for the result"""
+        return self.submit(item).result(timeout)
+
+    def _take_batch(self) -> List[Tuple[object, Future, float]]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+            # Give concurrent callers until max_latency after the oldest item
+            flush_at = self._queue[0][2] + self.max_latency
+            while len(self._queue) < self.max_batch:
+                remaining = flush_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            count = min(len(self._queue), self.max_batch)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            started = time.monotonic()
+            items = [item for item, _, _ in batch]
+            try:
+                results = self.process(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name} batch returned {len(results)} results for {len(items)} items")
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                self.failed_batches += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            finished = time.monotonic()
+            self.batches += 1
+            self.items += len(batch)
+            self.max_seen_batch = max(self.max_seen_batch, len(batch))
+            self.wait_seconds += sum(started - queued for _, _, queued in batch)
+            self.busy_seconds += finished - started
+
+    def get_stats(self) -> Dict:
+        """Batch sizes, queueing delay and throughput"""
+        return {
+            "max_batch": self.max_batch,
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "queued": len(self._queue),
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "max_batch_seen": self.max_seen_batch,
+            "avg_wait_ms": round(self.wait_seconds / self.items * 1000, 2) if self.items else None,
+            "items_per_busy_second": round(self.items / self.busy_seconds, 1) if self.busy_seconds else None,
+        }
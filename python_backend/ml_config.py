@@ -12,7 +12,7 @@ load_dotenv()
 # AI PROVIDER CONFIGURATION
 # ========================================
 
-# Primary AI Provider: "openai", "claude", "groq", "local", "lm_studio"
+# Primary AI Provider: "openai", "claude", "groq", "local", "lm_studio", "llama_cpp"
 AI_PROVIDER = os.getenv("AI_PROVIDER", "local")
 
 # OpenAI Configuration
@@ -34,6 +34,55 @@ GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")  # mixtral-8x7b, ll
 LM_STUDIO_URL = os.getenv("LM_STUDIO_URL", "http://localhost:1234/v1")
 LM_STUDIO_MODEL = os.getenv("LM_STUDIO_MODEL", "local-model")
 
+# llama.cpp Configuration (in-process GGUF models, pip install llama-cpp-python)
+LLAMA_CPP_MODEL_PATH = os.getenv("LLAMA_CPP_MODEL_PATH", "")  # e.g. models/qwen2.5-1.5b-instruct-q4_k_m.gguf
+LLAMA_CPP_CONTEXT = int(os.getenv("LLAMA_CPP_CONTEXT", "2048"))  # Context window (tokens)
+LLAMA_CPP_THREADS = int(os.getenv("LLAMA_CPP_THREADS", "0"))  # Generation threads (0 = physical cores)
+LLAMA_CPP_BATCH_THREADS = int(os.getenv("LLAMA_CPP_BATCH_THREADS", "0"))  # Prompt-eval threads (0 = logical cores)
+LLAMA_CPP_BATCH = int(os.getenv("LLAMA_CPP_BATCH", "256"))  # Prompt tokens evaluated per batch
+LLAMA_CPP_MMAP = os.getenv("LLAMA_CPP_MMAP", "true").lower() == "true"  # Map the model file instead of reading it into RAM
+LLAMA_CPP_MLOCK = os.getenv("LLAMA_CPP_MLOCK", "false").lower() == "true"  # Pin mapped pages so they are never swapped out
+LLAMA_CPP_GPU_LAYERS = int(os.getenv("LLAMA_CPP_GPU_LAYERS", "0"))  # Layers offloaded to GPU (0 = CPU only)
+LLAMA_CPP_MAX_TOKENS = int(os.getenv("LLAMA_CPP_MAX_TOKENS", "200"))
+LLAMA_CPP_SESSION_STATES = int(os.getenv("LLAMA_CPP_SESSION_STATES", "4"))  # Per-session KV states kept for resuming
+
+# ========================================
+# LOCAL HUGGING FACE INFERENCE
+# ========================================
+
+# Causal LM used by huggingface_ai (AI_MODE=huggingface and the offline fallback)
+HF_MODEL = os.getenv("HF_MODEL", "microsoft/DialoGPT-medium")
+
+# Inference backend: "int8" (dynamic int8 quantization), "onnx" (ONNX Runtime
+# export cached under data/models/, needs optimum[onnxruntime]) or "fp32"
+HF_BACKEND = os.getenv("HF_BACKEND", "int8").lower()
+
+# Torch intra-op threads (0 = physical cores)
+HF_THREADS = int(os.getenv("HF_THREADS", "0"))
+
+# New tokens per reply (generation stops earlier once every reply hit EOS)
+HF_MAX_NEW_TOKENS = int(os.getenv("HF_MAX_NEW_TOKENS", "60"))
+
+# Concurrent prompts merged into one padded generate() call
+HF_BATCH_SIZE = int(os.getenv("HF_BATCH_SIZE", "8"))
+HF_BATCH_LATENCY_MS = float(os.getenv("HF_BATCH_LATENCY_MS", "20"))
+
+# ========================================
+# PROVIDER ROUTING
+# ========================================
+
+# Seconds get_ai_response waits across all providers before giving up
+PROVIDER_DEADLINE = float(os.getenv("PROVIDER_DEADLINE", "45"))
+
+# Start the next provider when the current one is slower than its p95 latency
+PROVIDER_HEDGING = os.getenv("PROVIDER_HEDGING", "true").lower() == "true"
+PROVIDER_HEDGE_DEFAULT_DELAY = float(os.getenv("PROVIDER_HEDGE_DEFAULT_DELAY", "5"))  # Until enough latency samples exist
+PROVIDER_HEDGE_MIN_DELAY = float(os.getenv("PROVIDER_HEDGE_MIN_DELAY", "0.5"))
+
+# Consecutive failures that open a provider's circuit breaker, and seconds it stays open
+PROVIDER_BREAKER_THRESHOLD = int(os.getenv("PROVIDER_BREAKER_THRESHOLD", "3"))
+PROVIDER_BREAKER_COOLDOWN = float(os.getenv("PROVIDER_BREAKER_COOLDOWN", "30"))
+
 # ========================================
 # INTENT CLASSIFICATION
 # ========================================
@@ -76,6 +125,19 @@ INTENT_CATEGORIES = {
     ]
 }
 
+# Learned intent model (python scripts/train_intent_model.py): logistic regression
+# over hashed n-grams, trained from the command logs. Used ahead of the embedding
+# centroids when its probability reaches INTENT_MODEL_MIN_CONFIDENCE
+INTENT_MODEL_ENABLED = os.getenv("INTENT_MODEL_ENABLED", "true").lower() == "true"
+INTENT_MODEL_MIN_CONFIDENCE = float(os.getenv("INTENT_MODEL_MIN_CONFIDENCE", "0.6"))
+
+# Holdout accuracy (and override precision) on commands the keywords hand over
+# to the learned model that a trained version needs before it is used
+INTENT_MODEL_MIN_ACCURACY = float(os.getenv("INTENT_MODEL_MIN_ACCURACY", "0.85"))
+
+# Feature buckets = 2 ** INTENT_MODEL_HASH_BITS
+INTENT_MODEL_HASH_BITS = int(os.getenv("INTENT_MODEL_HASH_BITS", "14"))
+
 # ========================================
 # CONVERSATION MEMORY
 # ========================================
@@ -102,6 +164,35 @@ SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.7"))
 # Embedding model for semantic search
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 
+# Per-text embedding cache shared by intent classification and semantic search
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+
+# Encode micro-batching: concurrent requests wait up to EMBEDDING_BATCH_LATENCY_MS
+# (or until EMBEDDING_BATCH_SIZE texts are queued) and share one forward pass
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_LATENCY_MS = float(os.getenv("EMBEDDING_BATCH_LATENCY_MS", "5"))
+
+# Memory-map the embedding store (data/semantic_embeddings.vec) instead of reading it into RAM
+# (Linux / macOS only; ignored on Windows, which cannot resize a mapped file)
+SEMANTIC_MMAP = os.getenv("SEMANTIC_MMAP", "false").lower() == "true"
+
+# Vector index: "auto" (hnswlib if installed, else IVF), "hnsw", "ivf", "brute"
+SEMANTIC_INDEX = os.getenv("SEMANTIC_INDEX", "auto").lower()
+
+# Knowledge base size at which search switches from brute force to the ANN index
+SEMANTIC_INDEX_THRESHOLD = int(os.getenv("SEMANTIC_INDEX_THRESHOLD", "5000"))
+
+# Persist the ANN index after this many incremental inserts
+SEMANTIC_INDEX_SAVE_EVERY = int(os.getenv("SEMANTIC_INDEX_SAVE_EVERY", "50"))
+
+# HNSW graph parameters (hnswlib)
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+
+# IVF clusters scanned per query (pure NumPy index)
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+
 # ========================================
 # SENTIMENT ANALYSIS
 # ========================================
@@ -109,6 +200,26 @@ EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 # Enable sentiment analysis for user mood detection
 ENABLE_SENTIMENT_ANALYSIS = os.getenv("ENABLE_SENTIMENT_ANALYSIS", "true").lower() == "true"
 
+# Sentiment model (used when keyword confidence is low)
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "cardiffnlp/twitter-roberta-base-sentiment-latest")
+
+# ========================================
+# MODEL OPTIMIZATION
+# ========================================
+
+# Backend for the embedding and sentiment models: "auto" (int8 ONNX Runtime
+# export when onnxruntime + optimum are installed, else PyTorch), "onnx" or "torch"
+ML_BACKEND = os.getenv("ML_BACKEND", "auto").lower()
+
+# Export missing ONNX artifacts (data/models/) during model warm-up
+ONNX_EXPORT_ON_LOAD = os.getenv("ONNX_EXPORT_ON_LOAD", "true").lower() == "true"
+
+# Minimum parity with the PyTorch original for an export to be used:
+# lowest per-sample cosine similarity for the embedding model, and share of
+# the 12 parity samples with the same label for sentiment (0.9 allows one flip)
+ONNX_EMBEDDING_PARITY_MIN = float(os.getenv("ONNX_EMBEDDING_PARITY_MIN", "0.98"))
+ONNX_SENTIMENT_AGREEMENT_MIN = float(os.getenv("ONNX_SENTIMENT_AGREEMENT_MIN", "0.9"))
+
 # ========================================
 # RESPONSE GENERATION
 # ========================================
@@ -143,6 +254,67 @@ Key traits:
 - Personality dikhayein lekin professional rahein
 """
 
+# ========================================
+# RESPONSE CACHE
+# ========================================
+
+# Cache AI provider answers so repeated questions skip the LLM call
+ENABLE_RESPONSE_CACHE = os.getenv("ENABLE_RESPONSE_CACHE", "true").lower() == "true"
+
+# Maximum cached answers (least recently used are evicted first)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "500"))
+
+# Seconds an answer stays valid; RESPONSE_CACHE_TTL_<PROVIDER> overrides per provider (0 = never cache)
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+RESPONSE_CACHE_PROVIDER_TTLS = {
+    provider: int(os.getenv(f"RESPONSE_CACHE_TTL_{provider.upper()}", str(RESPONSE_CACHE_TTL)))
+    for provider in ("openai", "claude", "groq", "lm_studio", "llama_cpp")
+}
+
+# Cosine similarity at which a differently worded question reuses a cached answer
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+
+# Intents whose answers go stale immediately and are never cached
+RESPONSE_CACHE_BYPASS_INTENTS = ("time_date", "weather")
+
+# ========================================
+# HOT COMMANDS
+# ========================================
+
+# Precomputed intent / sentiment / route for the most frequent commands
+# (from context_awareness's command_frequency), persisted in data/hot_commands.json
+HOT_COMMANDS_ENABLED = os.getenv("HOT_COMMANDS_ENABLED", "true").lower() == "true"
+
+# Commands kept in the table, and how often a command must have been used to qualify
+HOT_COMMANDS_SIZE = int(os.getenv("HOT_COMMANDS_SIZE", "50"))
+HOT_COMMANDS_MIN_COUNT = int(os.getenv("HOT_COMMANDS_MIN_COUNT", "3"))
+
+# Seconds between incremental rebuilds from the frequency data
+HOT_COMMANDS_REFRESH_INTERVAL = float(os.getenv("HOT_COMMANDS_REFRESH_INTERVAL", "300"))
+
+# ========================================
+# PROMPT BUDGET
+# ========================================
+
+# Input tokens (system prompt + history + question) sent to a provider;
+# PROMPT_TOKEN_BUDGET_<PROVIDER> overrides per provider. Older turns that do
+# not fit are folded into a rolling summary
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2000"))
+
+# llama.cpp must fit prompt + answer into its context window; the margin
+# covers chat-template tokens and the builder's byte-based token estimate
+LLAMA_CPP_PROMPT_MARGIN = 256
+PROMPT_TOKEN_BUDGETS = {
+    provider: int(os.getenv(f"PROMPT_TOKEN_BUDGET_{provider.upper()}", str(PROMPT_TOKEN_BUDGET)))
+    for provider in ("openai", "claude", "groq", "lm_studio")
+}
+PROMPT_TOKEN_BUDGETS["llama_cpp"] = int(os.getenv("PROMPT_TOKEN_BUDGET_LLAMA_CPP", str(
+    max(min(PROMPT_TOKEN_BUDGET, LLAMA_CPP_CONTEXT - LLAMA_CPP_MAX_TOKENS - LLAMA_CPP_PROMPT_MARGIN), 256)
+)))
+
+# Tokens reserved for the rolling summary of older turns
+PROMPT_SUMMARY_TOKENS = int(os.getenv("PROMPT_SUMMARY_TOKENS", "150"))
+
 # ========================================
 # FEATURE FLAGS
 # ========================================
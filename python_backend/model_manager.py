@@ -0,0 +1,200 @@
+"""
+VEDA AI - Model Lifecycle Manager
+Warms ML models in the background so the server starts without waiting for them
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from python_backend.logger import log_info, log_error, log_warning
+from python_backend.config import MODEL_WARMUP
+
+# Model states
+STATE_PENDING = "pending"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_UNAVAILABLE = "unavailable"   # loaded, but only the keyword path is available
+STATE_FAILED = "failed"
+
+# Calls queued per model while it warms up
+MAX_DEFERRED_CALLS = 100
+
+# ========================================
+# MODEL MANAGER
+# ========================================
+
+class ModelManager:
+    """
+    Loads registered models one by one, in priority order, on a daemon thread
+
+    - Callers check is_ready() and use keyword-only fallbacks until then
+    - run_when_ready() queues side-effect calls (e.g. learning) until a model loads
+    - With MODEL_WARMUP disabled, is_ready() loads the model inline on first use
+    """
+
+    def __init__(self, warmup: bool = MODEL_WARMUP):
+        self.warmup = warmup
+        self._models: Dict[str, Dict] = {}
+        self._deferred: Dict[str, List[Tuple[Callable, tuple]]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+
+    def register(self, name: str, loader: Callable[[], bool], priority: int):
+        """
+        Register a model loader
+
+        loader() returns True if the ML model is available, False if only
+        the keyword fallback is (e.g. the library is not installed).
+        """
+        self._models[name] = {
+            "loader": loader,
+            "priority": priority,
+            "state": STATE_PENDING,
+            "load_seconds": None,
+            "error": None,
+        }
+        self._deferred[name] = []
+
+    def start_warmup(self):
+        """Start loading every registered model in the background"""
+        if not self.warmup or self._thread is not None:
+            return
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._warm_all, name="veda-model-warmup", daemon=True)
+        self._thread.start()
+        log_info(f"Model warm-up started ({', '.join(self._ordered_names())})")
+
+    def _ordered_names(self) -> List[str]:
+        return sorted(self._models, key=lambda name: self._models[name]["priority"])
+
+    def _warm_all(self):
+        for name in self._ordered_names():
+            self._load(name)
+        log_info("Model warm-up complete")
+
+    def _load(self, name: str):
+        """Run one loader (at most once) and flush its deferred calls"""
+        entry = self._models[name]
+        with self._lock:
+            if entry["state"] != STATE_PENDING:
+                return
+            entry["state"] = STATE_LOADING
+
+        started = time.perf_counter()
+        try:
+            available = entry["loader"]()
+            entry["state"] = STATE_READY if available else STATE_UNAVAILABLE
+        except Exception as e:
+            entry["state"] = STATE_FAILED
+            entry["error"] = str(e)
+            log_error(f"Model '{name}' failed to load: {e}")
+        entry["load_seconds"] = round(time.perf_counter() - started, 2)
+        log_info(f"Model '{name}' {entry['state']} in {entry['load_seconds']}s")
+
+        with self._lock:
+            deferred, self._deferred[name] = self._deferred[name], []
+        if entry["state"] != STATE_FAILED:
+            for func, args in deferred:
+                try:
+                    func(*args)
+                except Exception as e:
+                    log_error(f"Deferred call for '{name}' failed: {e}")
+
+    def is_ready(self, name: str) -> bool:
+        """True once a model has finished loading (calling it will not block)"""
+        entry = self._models.get(name)
+        if entry is None:
+            return False
+        if entry["state"] == STATE_PENDING:
+            if not self.warmup:
+                self._load(name)
+            elif self._thread is None:
+                # e.g. a dispatcher worker process - warm its own copies
+                self.start_warmup()
+        return entry["state"] in (STATE_READY, STATE_UNAVAILABLE)
+
+    def run_when_ready(self, name: str, func: Callable, *args):
+        """Call func now if the model is ready, otherwise once it has loaded"""
+        if self.is_ready(name):
+            func(*args)
+            return
+
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is None or entry["state"] == STATE_FAILED:
+                return
+            if entry["state"] in (STATE_PENDING, STATE_LOADING):
+                queue = self._deferred[name]
+                if len(queue) >= MAX_DEFERRED_CALLS:
+                    log_warning(f"Deferred call queue for '{name}' is full, dropping call")
+                    return
+                queue.append((func, args))
+                return
+        # Finished loading between the two checks
+        func(*args)
+
+    def get_status(self) -> Dict:
+        """Per-model readiness and load times for /health"""
+        models = {
+            name: {
+                "state": self._models[name]["state"],
+                "load_seconds": self._models[name]["load_seconds"],
+                "error": self._models[name]["error"],
+                "deferred_calls": len(self._deferred[name]),
+            }
+            for name in self._ordered_names()
+        }
+        return {
+            "warmup": self.warmup,
+            "all_ready": all(m["state"] not in (STATE_PENDING, STATE_LOADING) for m in models.values()),
+            "models": models,
+        }
+
+
+# ========================================
+# GLOBAL INSTANCE
+# ========================================
+
+def _load_embeddings() -> bool:
+    from python_backend.embedding_service import get_embedding_model
+    return get_embedding_model().load()
+
+
+def _load_intent() -> bool:
+    from python_backend.intent_classifier import get_intent_classifier
+    return get_intent_classifier().use_ml
+
+
+def _load_semantic() -> bool:
+    from python_backend.semantic_search import get_semantic_search
+    return get_semantic_search().model is not None
+
+
+def _load_sentiment() -> bool:
+    from python_backend.sentiment_analyzer import get_sentiment_analyzer
+    return get_sentiment_analyzer().use_ml
+
+
+def _load_llama_cpp() -> bool:
+    from python_backend.llama_cpp_ai import get_llama_cpp_engine
+    return get_llama_cpp_engine().load()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_model_manager() -> ModelManager:
+    """Get or create global model manager (shared embedding model first, then its users)"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                manager = ModelManager()
+                manager.register("embeddings", _load_embeddings, priority=0)
+                manager.register("intent", _load_intent, priority=1)
+                manager.register("semantic", _load_semantic, priority=2)
+                manager.register("sentiment", _load_sentiment, priority=3)
+                manager.register("llama_cpp", _load_llama_cpp, priority=4)
+                _manager = manager
+    return _manager
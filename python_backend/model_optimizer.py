@@ -0,0 +1,305 @@
+"""
+VEDA AI - Model Optimizer
+ONNX Runtime / dynamic int8 exports of the embedding and sentiment models, with a parity check
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from python_backend.logger import log_info, log_error, log_warning
+from python_backend.utils import atomic_write_json
+from python_backend.ml_config import (
+    ML_BACKEND, ONNX_EXPORT_ON_LOAD, ONNX_EMBEDDING_PARITY_MIN, ONNX_SENTIMENT_AGREEMENT_MIN
+)
+
+# Exported / converted / trained model artifacts
+MODELS_DIR = "data/models"
+MANIFEST_FILE = "veda_manifest.json"
+
+# Token limit of the exported encoders (all-MiniLM-L6-v2 is trained on 256)
+EMBEDDING_MAX_LENGTH = 256
+SENTIMENT_MAX_LENGTH = 512
+
+# Texts the optimized models must agree with the originals on (English + Hinglish)
+PARITY_SAMPLES = [
+    "What's the weather like in Delhi today?",
+    "Open chrome and play some music",
+    "I am really frustrated, nothing is working!",
+    "Thank you so much, that was perfect",
+    "Set a reminder for my meeting at 5 pm",
+    "aaj mausam kaisa hai",
+    "mujhe gaana sunao",
+    "yeh bilkul kaam nahi kar raha, bahut bura hai",
+    "How do I reset my password?",
+    "I'm not sure what you mean",
+    "Great job, you are awesome",
+    "Tell me a joke",
+]
+
+_export_lock = threading.Lock()
+
+
+def _hub_id(name: str) -> str:
+    """Hub id for a sentence-transformers short name ("all-MiniLM-L6-v2")"""
+    return name if "/" in name else f"sentence-transformers/{name}"
+
+
+def artifact_dir(name: str) -> str:
+    """Cache directory of a model's int8 ONNX export"""
+    return os.path.join(MODELS_DIR, name.replace("/", "--") + "-onnx-int8")
+
+
+def min_parity_for(task: str) -> float:
+    """Parity score an export of this task needs (cosine for embedding, label agreement for sentiment)"""
+    return ONNX_EMBEDDING_PARITY_MIN if task == "embedding" else ONNX_SENTIMENT_AGREEMENT_MIN
+
+
+def _read_manifest(path: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _onnx_available() -> bool:
+    try:
+        import onnxruntime  # noqa: F401
+        import optimum.onnxruntime  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# ========================================
+# ONNX RUNTIME WRAPPERS
+# ========================================
+
+class OnnxSentenceEncoder:
+    """
+    Drop-in for SentenceTransformer.encode backed by an int8 ONNX export
+
+    Mean-pools the last hidden state over the attention mask, as the
+    sentence-transformers MiniLM models do.
+    """
+
+    backend = "onnx-int8"
+
+    def __init__(self, path: str):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        self.path = path
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(path, file_name="model_quantized.onnx")
+        self._dimension = self.model.config.hidden_size
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dimension
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs):
+        import numpy as np
+
+        rows = []
+        for start in range(0, len(texts), max(batch_size, 1)):
+            chunk = texts[start:start + batch_size]
+            inputs = self.tokenizer(
+                chunk, padding=True, truncation=True,
+                max_length=EMBEDDING_MAX_LENGTH, return_tensors="np"
+            )
+            hidden = np.asarray(self.model(**inputs).last_hidden_state, dtype=np.float32)
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            rows.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+        if not rows:
+            return np.empty((0, self._dimension), dtype=np.float32)
+        return np.vstack(rows)
+
+
+class OnnxTextClassifier:
+    """Drop-in for a transformers sentiment pipeline backed by an int8 ONNX export"""
+
+    backend = "onnx-int8"
+
+    def __init__(self, path: str):
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoTokenizer
+
+        self.path = path
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        self.model = ORTModelForSequenceClassification.from_pretrained(path, file_name="model_quantized.onnx")
+        self.labels = self.model.config.id2label
+
+    def __call__(self, text):
+        import numpy as np
+
+        texts = [text] if isinstance(text, str) else list(text)
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True,
+            max_length=SENTIMENT_MAX_LENGTH, return_tensors="np"
+        )
+        logits = np.asarray(self.model(**inputs).logits, dtype=np.float32)
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        return [
+            {"label": self.labels[int(index)], "score": float(probs[row, index])}
+            for row, index in enumerate(best)
+        ]
+
+
+# ========================================
+# EXPORT + PARITY
+# ========================================
+
+def _export(name: str, task: str) -> str:
+    """Export name to ONNX and quantize it to int8 (dynamic); returns the artifact dir"""
+    from optimum.onnxruntime import (
+        ORTModelForFeatureExtraction, ORTModelForSequenceClassification, ORTQuantizer
+    )
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model_class = ORTModelForFeatureExtraction if task == "embedding" else ORTModelForSequenceClassification
+    hub_id = _hub_id(name) if task == "embedding" else name
+    path = artifact_dir(name)
+    staging = path + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+
+    started = time.perf_counter()
+    model = model_class.from_pretrained(hub_id, export=True)
+    model.save_pretrained(staging)
+    AutoTokenizer.from_pretrained(hub_id).save_pretrained(staging)
+
+    quantizer = ORTQuantizer.from_pretrained(staging)
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=staging, quantization_config=qconfig)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(staging, path)
+    log_info(f"Exported {name} to ONNX int8 in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def _cosine_rows(a, b):
+    import numpy as np
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-9, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-9, None)
+    return (a * b).sum(axis=1)
+
+
+def check_parity(name: str, task: str, samples: Optional[List[str]] = None) -> Dict:
+    """
+    Compare the ONNX export of name against the original PyTorch model
+
+    embedding: cosine similarity per sample (score = minimum)
+    sentiment: share of samples with the same label (score), plus the
+               largest confidence difference
+    """
+    samples = samples or PARITY_SAMPLES
+    path = artifact_dir(name)
+
+    if task == "embedding":
+        from sentence_transformers import SentenceTransformer
+
+        original = SentenceTransformer(name).encode(samples)
+        optimized = OnnxSentenceEncoder(path).encode(samples)
+        cosines = _cosine_rows(original, optimized)
+        return {
+            "task": task,
+            "samples": len(samples),
+            "score": round(float(cosines.min()), 4),
+            "mean_cosine": round(float(cosines.mean()), 4),
+        }
+
+    from transformers import pipeline
+
+    original = pipeline("sentiment-analysis", model=name, truncation=True)(samples)
+    optimized = OnnxTextClassifier(path)(samples)
+    agree = sum(a["label"].lower() == b["label"].lower() for a, b in zip(original, optimized))
+    return {
+        "task": task,
+        "samples": len(samples),
+        "score": round(agree / len(samples), 4),
+        "max_confidence_diff": round(max(abs(a["score"] - b["score"]) for a, b in zip(original, optimized)), 4),
+    }
+
+
+def optimize_model(name: str, task: str, min_parity: Optional[float] = None) -> Dict:
+    """
+    Export + quantize + parity-check one model; the artifact is kept only if
+    its parity score reaches min_parity (default: min_parity_for(task)).
+    Returns the manifest.
+    """
+    if min_parity is None:
+        min_parity = min_parity_for(task)
+    with _export_lock:
+        path = _export(name, task)
+        parity = check_parity(name, task)
+        manifest = {
+            "source": name,
+            "task": task,
+            "quantization": "dynamic-int8",
+            "created": time.time(),
+            "parity": parity,
+            "accepted": parity["score"] >= min_parity,
+        }
+        atomic_write_json(os.path.join(path, MANIFEST_FILE), manifest)
+
+    if manifest["accepted"]:
+        log_info(f"ONNX int8 {name} accepted (parity {parity['score']})")
+    else:
+        log_warning(f"ONNX int8 {name} rejected (parity {parity['score']} < {min_parity}), keeping PyTorch")
+    return manifest
+
+
+# ========================================
+# BACKEND LOADERS
+# ========================================
+
+def _load_optimized(name: str, task: str):
+    """The accepted ONNX artifact for name (exported on demand), or None"""
+    if ML_BACKEND == "torch" or not _onnx_available():
+        if ML_BACKEND == "onnx":
+            log_warning("ML_BACKEND=onnx but onnxruntime / optimum are not installed, using PyTorch")
+        return None
+
+    path = artifact_dir(name)
+    manifest = _read_manifest(path)
+    if manifest is None and ONNX_EXPORT_ON_LOAD:
+        try:
+            manifest = optimize_model(name, task)
+        except Exception as e:
+            log_error(f"ONNX export of {name} failed: {e}")
+            return None
+    if not manifest or not manifest.get("accepted"):
+        return None
+
+    wrapper = OnnxSentenceEncoder if task == "embedding" else OnnxTextClassifier
+    try:
+        return wrapper(path)
+    except Exception as e:
+        log_error(f"Failed to load ONNX model {path}: {e}")
+        return None
+
+
+def load_sentence_encoder(name: str) -> Tuple[object, str]:
+    """(encoder, backend) - the int8 ONNX export when usable, else SentenceTransformer"""
+    encoder = _load_optimized(name, "embedding")
+    if encoder is not None:
+        return encoder, encoder.backend
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name), "torch"
+
+
+def load_sentiment_classifier(name: str) -> Tuple[object, str]:
+    """(classifier, backend) - the int8 ONNX export when usable, else a transformers pipeline"""
+    classifier = _load_optimized(name, "sentiment")
+    if classifier is not None:
+        return classifier, classifier.backend
+
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=name, truncation=True), "torch"
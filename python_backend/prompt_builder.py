@@ -0,0 +1,287 @@
+"""
+VEDA AI - Prompt Builder
+Fits system prompt, conversation history and question into each provider's token budget
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+from python_backend.logger import log_info
+from python_backend.ml_config import (
+    OPENAI_MODEL, PROMPT_TOKEN_BUDGET, PROMPT_TOKEN_BUDGETS, PROMPT_SUMMARY_TOKENS
+)
+
+# Bytes per token for the estimate used when no tokenizer is available
+# (UTF-8 keeps it honest for Devanagari, which costs ~3 bytes per character)
+BYTES_PER_TOKEN = 4
+
+# Tokens a chat format spends per message on role markers and separators
+MESSAGE_OVERHEAD = 4
+
+# Token counts remembered per counter (history messages are recounted every turn otherwise)
+COUNT_CACHE_SIZE = 2048
+
+# Assembled system prefixes remembered across sessions
+PREFIX_CACHE_SIZE = 256
+
+# Older turns that make it into the rolling summary
+SUMMARY_MAX_TURNS = 5
+
+SUMMARY_HEADER = "Earlier in this conversation:"
+
+# ========================================
+# TOKEN COUNTING
+# ========================================
+
+class TokenCounter:
+    """
+    Token counts for one provider's tokenizer
+
+    Uses tiktoken when it is installed and knows the encoding, otherwise a
+    UTF-8 byte estimate. Counts are memoized per text.
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        self.encoding = None
+        if model:
+            try:
+                import tiktoken
+                self.encoding = tiktoken.encoding_for_model(model)
+            except ImportError:
+                pass
+            except Exception:
+                log_info(f"No tiktoken encoding for {model}; estimating tokens")
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        with self._lock:
+            tokens = self._counts.get(text)
+            if tokens is not None:
+                self._counts.move_to_end(text)
+                return tokens
+
+        if self.encoding is not None:
+            tokens = len(self.encoding.encode(text))
+        else:
+            tokens = -(-len(text.encode("utf-8")) // BYTES_PER_TOKEN)
+
+        with self._lock:
+            self._counts[text] = tokens
+            while len(self._counts) > COUNT_CACHE_SIZE:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def count_message(self, message: Dict) -> int:
+        return self.count(message["content"]) + MESSAGE_OVERHEAD
+
+
+# ========================================
+# PROMPT BUILDER
+# ========================================
+
+class BuiltPrompt(NamedTuple):
+    """System text (with any rolling summary) and the history + question messages"""
+    system: str
+    messages: List[Dict]
+    tokens: int
+    dropped: int
+
+    def chat_messages(self) -> List[Dict]:
+        """OpenAI-style list with the system prompt as the first message"""
+        head = [{"role": "system", "content": self.system}] if self.system else []
+        return head + self.messages
+
+
+class PromptBuilder:
+    """
+    Assembles provider prompts inside a per-provider token budget
+
+    - The newest history turns are kept verbatim, as many as fit after the
+      system prompt, the question and room for a summary
+    - Turns that do not fit are folded into a rolling summary (built from
+      ConversationMemory.get_summary) appended to the system prompt
+    - The assembled system prefix is cached per session: it only changes
+      when another turn rolls out of the verbatim window, so consecutive
+      requests send a byte-identical prefix
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        default_budget: int = PROMPT_TOKEN_BUDGET,
+        summary_tokens: int = PROMPT_SUMMARY_TOKENS
+    ):
+        self.budgets = budgets if budgets is not None else dict(PROMPT_TOKEN_BUDGETS)
+        self.default_budget = default_budget
+        self.summary_tokens = summary_tokens
+        self._counters: Dict[str, TokenCounter] = {}
+        self._prefixes: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.builds = 0
+        self.truncated = 0
+        self.prefix_hits = 0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+
+    def counter(self, provider: str) -> TokenCounter:
+        """Token counter for a provider (OpenAI gets its exact tokenizer when available)"""
+        counter = self._counters.get(provider)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.get(provider)
+                if counter is None:
+                    counter = TokenCounter(OPENAI_MODEL if provider == "openai" else None)
+                    self._counters[provider] = counter
+        return counter
+
+    def budget_for(self, provider: str) -> int:
+        return self.budgets.get(provider, self.default_budget)
+
+    def count(self, provider: str, text: str) -> int:
+        return self.counter(provider).count(text)
+
+    def build(
+        self,
+        provider: str,
+        prompt: str,
+        conversation_history: Optional[List[Dict]] = None,
+        system_prompt: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> BuiltPrompt:
+        """Fit system prompt + history + prompt into the provider's budget"""
+        counter = self.counter(provider)
+        budget = self.budget_for(provider)
+        history = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in conversation_history or []
+        ]
+        question = {"role": "user", "content": prompt}
+
+        fixed = counter.count(system_prompt or "") + counter.count_message(question)
+        if system_prompt:
+            fixed += MESSAGE_OVERHEAD
+        history_tokens = [counter.count_message(msg) for msg in history]
+
+        # Everything fits: no summary needed
+        cut = 0
+        if fixed + sum(history_tokens) > budget:
+            cut = self._window_start(history, history_tokens, budget - fixed - self.summary_tokens)
+
+        system = system_prompt or ""
+        if cut:
+            system = self._prefix(provider, system, history[:cut], session_id)
+
+        kept = history[cut:]
+        tokens = counter.count(system) + (MESSAGE_OVERHEAD if system else 0)
+        tokens += sum(history_tokens[cut:]) + counter.count_message(question)
+
+        with self._lock:
+            self.builds += 1
+            self.tokens_sent += tokens
+            if cut:
+                self.truncated += 1
+                self.tokens_saved += max(sum(history_tokens) + fixed - tokens, 0)
+
+        return BuiltPrompt(system, kept + [question], tokens, cut)
+
+    @staticmethod
+    def _window_start(history: List[Dict], history_tokens: List[int], room: int) -> int:
+        """Index of the oldest message kept verbatim (always a user message)"""
+        start = len(history)
+        used = 0
+        for index in range(len(history) - 1, -1, -1):
+            used += history_tokens[index]
+            if used > room:
+                break
+            if history[index]["role"] == "user":
+                start = index
+        return start
+
+    def _prefix(self, provider: str, system_prompt: str, dropped: List[Dict], session_id: Optional[str]) -> str:
+        """System prompt plus a summary of the dropped turns (cached per session)"""
+        digest = hashlib.sha1(
+            "\x1e".join(msg["role"] + "\x1f" + msg["content"] for msg in dropped).encode("utf-8")
+        ).hexdigest()
+        key = (provider, session_id, hashlib.sha1(system_prompt.encode("utf-8")).hexdigest(), digest)
+
+        with self._lock:
+            prefix = self._prefixes.get(key)
+            if prefix is not None:
+                self._prefixes.move_to_end(key)
+                self.prefix_hits += 1
+                return prefix
+
+        summary = self._trim(provider, self._summarize(dropped, session_id), self.summary_tokens)
+        prefix = f"{system_prompt}\n\n{SUMMARY_HEADER}\n{summary}" if system_prompt else f"{SUMMARY_HEADER}\n{summary}"
+
+        with self._lock:
+            self._prefixes[key] = prefix
+            while len(self._prefixes) > PREFIX_CACHE_SIZE:
+                self._prefixes.popitem(last=False)
+        return prefix
+
+    @staticmethod
+    def _summarize(dropped: List[Dict], session_id: Optional[str]) -> str:
+        """Rolling summary of the turns that no longer fit verbatim"""
+        from python_backend.conversation_memory import get_conversation_memory
+
+        turns = [{"user": msg["content"]} for msg in dropped if msg["role"] == "user"]
+        return get_conversation_memory().get_summary(session_id, turns=turns[-SUMMARY_MAX_TURNS:])
+
+    def _trim(self, provider: str, text: str, max_tokens: int) -> str:
+        """Drop whole lines from the start until text fits max_tokens (newest lines matter most)"""
+        counter = self.counter(provider)
+        lines = text.splitlines()
+        while len(lines) > 1 and counter.count("\n".join(lines)) > max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def get_stats(self) -> Dict:
+        """Prompt size counters for /health"""
+        return {
+            "builds": self.builds,
+            "truncated": self.truncated,
+            "prefix_cache_hits": self.prefix_hits,
+            "avg_tokens": round(self.tokens_sent / self.builds, 1) if self.builds else None,
+            "tokens_saved": self.tokens_saved,
+            "budgets": dict(self.budgets, default=self.default_budget),
+            "exact_tokenizers": [name for name, counter in self._counters.items() if counter.exact],
+        }
+
+
+# ========================================
+# GLOBAL INSTANCE
+# ========================================
+
+_builder = None
+_builder_lock = threading.Lock()
+
+def get_prompt_builder() -> PromptBuilder:
+    """Get or create global prompt builder"""
+    global _builder
+    if _builder is None:
+        with _builder_lock:
+            if _builder is None:
+                _builder = PromptBuilder()
+    return _builder
+
+
+def build_prompt(
+    provider: str,
+    prompt: str,
+    conversation_history: Optional[List[Dict]] = None,
+    system_prompt: Optional[str] = None,
+    session_id: Optional[str] = None
+) -> BuiltPrompt:
+    """Convenience function to build a budgeted prompt"""
+    return get_prompt_builder().build(provider, prompt, conversation_history, system_prompt, session_id)
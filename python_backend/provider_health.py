@@ -0,0 +1,219 @@
+"""
+VEDA AI - Provider Health Monitor
+Probes AI backends in the background so requests never wait on a dead one
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+from python_backend.logger import log_info, log_warning
+from python_backend.http_pool import get_http_session
+from python_backend.config import LM_STUDIO_API_URL, HEALTH_CHECK_INTERVAL, HEALTH_MAX_BACKOFF
+from python_backend.ml_config import LM_STUDIO_URL, OPENAI_API_KEY, CLAUDE_API_KEY, GROQ_API_KEY
+
+# Backend states
+STATE_UNKNOWN = "unknown"   # not probed yet - requests are allowed
+STATE_UP = "up"
+STATE_DOWN = "down"
+
+# First re-probe delay after a backend goes down (doubles up to HEALTH_MAX_BACKOFF)
+MIN_BACKOFF = 2.0
+
+# Timeout of one probe request
+PROBE_TIMEOUT = 2.0
+
+# ========================================
+# HEALTH MONITOR
+# ========================================
+
+class ProviderHealthMonitor:
+    """
+    Cached up/down state per backend, refreshed by one daemon thread
+
+    - Up backends are re-probed every `interval` seconds
+    - Down backends are re-probed with exponential backoff
+      (MIN_BACKOFF, doubling, capped at max_backoff)
+    - Request paths call report_failure() on connection errors, so a backend
+      that dies between probes is marked down at once
+    - is_up() never blocks: it only reads the cached state
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, Callable[[], bool]],
+        interval: float = HEALTH_CHECK_INTERVAL,
+        max_backoff: float = HEALTH_MAX_BACKOFF
+    ):
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self._probes = probes
+        self._state: Dict[str, Dict] = {
+            name: {
+                "state": STATE_UNKNOWN,
+                "next_check": 0.0,
+                "backoff": MIN_BACKOFF,
+                "last_checked": None,
+                "last_change": None,
+                "probes": 0,
+                "error": None,
+            }
+            for name in probes
+        }
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the probe thread (once)"""
+        if self._thread is not None or not self._probes:
+            return
+        self._thread = threading.Thread(target=self._run, name="veda-provider-health", daemon=True)
+        self._thread.start()
+        log_info(f"Provider health monitor started ({', '.join(self._probes)})")
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                due = [name for name, entry in self._state.items() if entry["next_check"] <= now]
+            for name in due:
+                self._probe(name)
+
+            with self._lock:
+                next_check = min(entry["next_check"] for entry in self._state.values())
+            self._wake.wait(timeout=max(next_check - time.monotonic(), 0.05))
+            self._wake.clear()
+
+    def _probe(self, name: str):
+        try:
+            ok = bool(self._probes[name]())
+            error = None if ok else "probe failed"
+        except Exception as e:
+            ok, error = False, str(e)
+        with self._lock:
+            self._state[name]["probes"] += 1
+        self._set(name, ok, error)
+
+    def _set(self, name: str, ok: bool, error: Optional[str] = None):
+        """Record a probe / request outcome and schedule the next probe"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._state[name]
+            previous = entry["state"]
+            entry["state"] = STATE_UP if ok else STATE_DOWN
+            entry["last_checked"] = time.time()
+            entry["error"] = error
+            if ok:
+                entry["backoff"] = MIN_BACKOFF
+                entry["next_check"] = now + self.interval
+            else:
+                # Back off only on repeated failures; the first one re-probes soon
+                if previous == STATE_DOWN:
+                    entry["backoff"] = min(entry["backoff"] * 2, self.max_backoff)
+                entry["next_check"] = now + entry["backoff"]
+            if previous != entry["state"]:
+                entry["last_change"] = time.time()
+
+        if previous != (STATE_UP if ok else STATE_DOWN):
+            if ok:
+                log_info(f"Provider {name} is up")
+            else:
+                log_warning(f"Provider {name} is down ({error}); re-probing with backoff")
+
+    def is_up(self, name: str) -> bool:
+        """False only for a backend known to be down (unmonitored names count as up)"""
+        with self._lock:
+            entry = self._state.get(name)
+            return entry is None or entry["state"] != STATE_DOWN
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            entry = self._state.get(name)
+            return entry["state"] if entry else STATE_UNKNOWN
+
+    def report_failure(self, name: str, error: str = "connection failed"):
+        """A request could not reach the backend - mark it down without waiting for a probe"""
+        if name in self._state:
+            if self.is_up(name):
+                self._set(name, False, error)
+                self._wake.set()
+
+    def report_success(self, name: str):
+        if name in self._state and self.state(name) != STATE_UP:
+            self._set(name, True)
+            self._wake.set()
+
+    def get_status(self) -> Dict:
+        """Per-backend state for /health"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "state": entry["state"],
+                    "error": entry["error"],
+                    "probes": entry["probes"],
+                    "next_probe_in": round(max(entry["next_check"] - now, 0), 1),
+                }
+                for name, entry in self._state.items()
+            }
+
+
+# ========================================
+# PROBES
+# ========================================
+
+def _http_probe(url: str, headers: Optional[Dict[str, str]] = None) -> Callable[[], bool]:
+    """Probe that GETs url and expects HTTP 200"""
+    def probe() -> bool:
+        response = get_http_session().get(url, headers=headers or {}, timeout=PROBE_TIMEOUT)
+        return response.status_code == 200
+    return probe
+
+
+def lm_studio_backend() -> str:
+    """Monitor name for the LM Studio server used by lm_studio_ai"""
+    same_server = LM_STUDIO_API_URL.rstrip("/") + "/v1" == LM_STUDIO_URL.rstrip("/")
+    return "lm_studio" if same_server else "lm_studio_server"
+
+
+def _default_probes() -> Dict[str, Callable[[], bool]]:
+    """LM Studio plus every cloud provider that has an API key"""
+    probes = {"lm_studio": _http_probe(f"{LM_STUDIO_URL}/models")}
+    if lm_studio_backend() != "lm_studio":
+        probes["lm_studio_server"] = _http_probe(f"{LM_STUDIO_API_URL}/v1/models")
+
+    # Model listings are free and prove both reachability and the key
+    if OPENAI_API_KEY:
+        probes["openai"] = _http_probe(
+            "https://api.openai.com/v1/models",
+            {"Authorization": f"Bearer {OPENAI_API_KEY}"}
+        )
+    if GROQ_API_KEY:
+        probes["groq"] = _http_probe(
+            "https://api.groq.com/openai/v1/models",
+            {"Authorization": f"Bearer {GROQ_API_KEY}"}
+        )
+    if CLAUDE_API_KEY:
+        probes["claude"] = _http_probe(
+            "https://api.anthropic.com/v1/models",
+            {"x-api-key": CLAUDE_API_KEY, "anthropic-version": "2023-06-01"}
+        )
+    return probes
+
+
+# ========================================
+# GLOBAL INSTANCE
+# ========================================
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+def get_health_monitor() -> ProviderHealthMonitor:
+    """Get or create the global monitor (its probe thread starts on first use)"""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = ProviderHealthMonitor(_default_probes())
+                _monitor.start()
+    return _monitor
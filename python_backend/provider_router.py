@@ -0,0 +1,347 @@
+"""
+VEDA AI - Provider Router
+Hedged requests across AI providers with circuit breakers and latency-ranked fallback
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from python_backend.logger import log_info, log_error, log_warning
+from python_backend.ml_config import (
+    PROVIDER_DEADLINE, PROVIDER_HEDGING, PROVIDER_HEDGE_DEFAULT_DELAY, PROVIDER_HEDGE_MIN_DELAY,
+    PROVIDER_BREAKER_THRESHOLD, PROVIDER_BREAKER_COOLDOWN
+)
+
+# Weight of the newest sample in the latency / error moving averages
+EWMA_ALPHA = 0.2
+
+# Latency samples kept per provider for the p95 hedge delay
+LATENCY_WINDOW = 100
+
+# Samples needed before p95 replaces the default hedge delay
+MIN_LATENCY_SAMPLES = 5
+
+# Circuit breaker states
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# ========================================
+# CIRCUIT BREAKER
+# ========================================
+
+class CircuitBreaker:
+    """
+    Stops calling a provider after repeated failures
+
+    - closed: calls go through; `threshold` consecutive failures open it
+    - open: calls are skipped until `cooldown` seconds have passed
+    - half_open: calls are allowed again; a success closes the breaker,
+      a failure re-opens it for another cooldown
+    """
+
+    def __init__(self, threshold: int = PROVIDER_BREAKER_THRESHOLD, cooldown: float = PROVIDER_BREAKER_COOLDOWN):
+        self.threshold = max(threshold, 1)
+        self.cooldown = cooldown
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+
+    def allows(self) -> bool:
+        if self.state == BREAKER_OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = BREAKER_HALF_OPEN
+        return self.state != BREAKER_OPEN
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.state = BREAKER_CLOSED
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == BREAKER_HALF_OPEN or self.consecutive_failures >= self.threshold:
+            if self.state != BREAKER_OPEN:
+                self.times_opened += 1
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+
+
+# ========================================
+# PROVIDER STATISTICS
+# ========================================
+
+class ProviderStats:
+    """Latency / error moving averages and a window of recent latencies"""
+
+    def __init__(self):
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.failures = 0
+
+    def record(self, latency: float, ok: bool):
+        self.calls += 1
+        if ok:
+            self.latencies.append(latency)
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += EWMA_ALPHA * (latency - self.latency_ewma)
+        else:
+            self.failures += 1
+        self.error_ewma += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_ewma)
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+# ========================================
+# PROVIDER ROUTER
+# ========================================
+
+class ProviderRouter:
+    """
+    Routes one prompt across several providers
+
+    - Candidates: the preferred provider first, then the rest ranked by
+      expected cost (latency EWMA inflated by error EWMA); providers whose
+      circuit breaker is open or that report themselves unavailable are skipped
+    - Hedging: if the running provider has not answered within its p95
+      latency, the next candidate is started too; the first good answer wins
+    - A failed provider hands over to the next candidate immediately
+    - Nothing is returned after the total deadline (late calls still finish
+      in the background and update the statistics)
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, Callable],
+        fallback_order: Optional[Iterable[str]] = None,
+        available: Optional[Callable[[str], bool]] = None,
+        deadline: float = PROVIDER_DEADLINE,
+        hedging: bool = PROVIDER_HEDGING,
+        default_delay: float = PROVIDER_HEDGE_DEFAULT_DELAY,
+        min_delay: float = PROVIDER_HEDGE_MIN_DELAY
+    ):
+        self.providers = providers
+        self.fallback_order = list(fallback_order or providers)
+        self.available = available
+        self.deadline = deadline
+        self.hedging = hedging
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.stats: Dict[str, ProviderStats] = {name: ProviderStats() for name in providers}
+        self.breakers: Dict[str, CircuitBreaker] = {name: CircuitBreaker() for name in providers}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+        # Metrics
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_misses = 0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=max(len(self.providers) * 2, 2),
+                        thread_name_prefix="veda-provider"
+                    )
+        return self._pool
+
+    def is_usable(self, name: str) -> bool:
+        if name not in self.providers:
+            return False
+        if self.available is not None and not self.available(name):
+            return False
+        with self._lock:
+            return self.breakers[name].allows()
+
+    def _expected_cost(self, name: str) -> float:
+        stats = self.stats[name]
+        latency = stats.latency_ewma if stats.latency_ewma is not None else self.default_delay
+        return latency * (1.0 + 4.0 * stats.error_ewma)
+
+    def order(self, preferred: Optional[str] = None) -> List[str]:
+        """Usable providers, preferred first, the rest cheapest first (ties keep fallback order)"""
+        rest = [name for name in self.fallback_order if name != preferred and self.is_usable(name)]
+        rest.sort(key=self._expected_cost)
+        if preferred and self.is_usable(preferred):
+            return [preferred] + rest
+        return rest
+
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to wait on a provider before starting the next one (its p95 latency)"""
+        p95 = self.stats[name].p95()
+        return max(p95 if p95 is not None else self.default_delay, self.min_delay)
+
+    def _call(
+        self,
+        name: str,
+        prompt: str,
+        conversation_history: Optional[List[Dict]],
+        session_id: Optional[str] = None,
+        prompt_session: Optional[str] = None
+    ) -> Optional[str]:
+        """Run one provider and record its latency / outcome"""
+        started = time.monotonic()
+        try:
+            response = self.providers[name](
+                prompt, conversation_history, session_id=session_id, prompt_session=prompt_session
+            )
+        except Exception as e:
+            log_error(f"Provider {name} raised: {e}")
+            response = None
+        self.record(name, time.monotonic() - started, bool(response))
+        return response
+
+    def record(self, name: str, latency: float, ok: bool):
+        """Update statistics and circuit breaker for one call"""
+        with self._lock:
+            self.stats[name].record(latency, ok)
+            breaker = self.breakers[name]
+            was_open = breaker.state == BREAKER_OPEN
+            if ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            if breaker.state == BREAKER_OPEN and not was_open:
+                log_warning(f"Circuit breaker opened for provider {name} ({breaker.cooldown}s cooldown)")
+
+    def route(
+        self,
+        prompt: str,
+        conversation_history: Optional[List[Dict]] = None,
+        preferred: Optional[str] = None,
+        deadline: Optional[float] = None,
+        session_id: Optional[str] = None,
+        prompt_session: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Return (response, provider) from the first provider with a good answer"""
+        candidates = self.order(preferred)
+        if not candidates:
+            log_warning("No AI provider available (all unconfigured or circuit-open)")
+            return None, None
+
+        self.requests += 1
+        pool = self._get_pool()
+        deadline_at = time.monotonic() + (deadline if deadline is not None else self.deadline)
+        in_flight = {}
+        launched = 0
+        hedge_at = None
+
+        def launch():
+            nonlocal launched, hedge_at
+            name = candidates[launched]
+            launched += 1
+            in_flight[pool.submit(self._call, name, prompt, conversation_history, session_id, prompt_session)] = name
+            hedge_at = time.monotonic() + self.hedge_delay(name) if self.hedging else None
+            return name
+
+        launch()
+        while in_flight:
+            now = time.monotonic()
+            if now >= deadline_at:
+                break
+            wake_at = deadline_at
+            if hedge_at is not None and launched < len(candidates):
+                wake_at = min(wake_at, hedge_at)
+            done, _ = wait(list(in_flight), timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = in_flight.pop(future)
+                response = future.result()
+                if response:
+                    if name != candidates[0]:
+                        log_info(f"Provider {name} answered for {candidates[0]}")
+                        if in_flight:
+                            self.hedge_wins += 1
+                    return response, name
+
+            if launched < len(candidates):
+                if done:
+                    # Everything that finished failed - replace it right away
+                    name = launch()
+                    log_info(f"Trying fallback provider: {name}")
+                elif hedge_at is not None and time.monotonic() >= hedge_at:
+                    self.hedges += 1
+                    name = launch()
+                    log_info(f"Hedging with provider: {name}")
+
+        if in_flight:
+            self.deadline_misses += 1
+            log_warning(f"AI providers missed the {deadline if deadline is not None else self.deadline}s deadline")
+        else:
+            log_warning("All AI providers failed")
+        return None, None
+
+    def get_stats(self) -> Dict:
+        """Per-provider latency, error rate and breaker state"""
+        with self._lock:
+            providers = {
+                name: {
+                    "breaker": self.breakers[name].state,
+                    "calls": self.stats[name].calls,
+                    "failures": self.stats[name].failures,
+                    "latency_ewma": round(self.stats[name].latency_ewma, 3) if self.stats[name].latency_ewma is not None else None,
+                    "error_ewma": round(self.stats[name].error_ewma, 3),
+                    "p95": round(self.stats[name].p95(), 3) if self.stats[name].p95() is not None else None,
+                }
+                for name in self.providers
+            }
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "deadline_misses": self.deadline_misses,
+            "providers": providers,
+        }
+
+
+# ========================================
+# FAKE PROVIDER
+# ========================================
+
+class FakeProvider:
+    """
+    Deterministic local provider for exercising the router without network access
+
+    router = ProviderRouter({"slow": FakeProvider(latency=2), "fast": FakeProvider(latency=0.1)})
+    """
+
+    def __init__(
+        self,
+        response: str = "Fake provider response",
+        latency: float = 0.0,
+        fail_every: int = 0,
+        exception: Optional[Exception] = None
+    ):
+        self.response = response
+        self.latency = latency
+        self.fail_every = fail_every
+        self.exception = exception
+        self.calls = 0
+
+    def __call__(
+        self,
+        prompt: str,
+        conversation_history: Optional[List[Dict]] = None,
+        session_id: Optional[str] = None,
+        prompt_session: Optional[str] = None
+    ) -> Optional[str]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.exception is not None:
+            raise self.exception
+        if self.fail_every and self.calls % self.fail_every == 0:
+            return None
+        return self.response
@@ -0,0 +1,345 @@
+"""
+VEDA AI - Response Cache
+Serves repeated questions from cached AI provider answers instead of calling the LLM again
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+from python_backend.logger import log_info, log_error
+from python_backend.utils import atomic_write_json
+from python_backend.command_parser import normalize_key
+from python_backend.ml_config import (
+    ENABLE_RESPONSE_CACHE, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_PROVIDER_TTLS, RESPONSE_CACHE_SIMILARITY, RESPONSE_CACHE_BYPASS_INTENTS
+)
+
+CACHE_FILE = "data/response_cache.json"
+
+# Save to disk after this many new answers (and always at exit)
+SAVE_EVERY = 10
+
+# Words that make a question depend on the previous turn ("what about him?")
+FOLLOW_UP_WORDS = frozenset({
+    "it", "its", "that", "this", "those", "these", "he", "she", "him", "her", "his",
+    "they", "them", "their", "there", "uska", "uski", "iska", "iski", "woh", "wo", "ye", "yeh"
+})
+
+# ========================================
+# RESPONSE CACHE
+# ========================================
+
+class ResponseCache:
+    """
+    LRU cache of provider answers keyed by normalized prompt
+
+    - Exact lookup on the normalized prompt, then embedding similarity over
+      cached prompts of the same namespace (only once the shared embedding
+      model is warm - the cache never triggers a model load)
+    - Each entry expires after the TTL of the provider that produced it
+    - Time-sensitive intents (time/date, weather) and follow-up questions
+      that lean on conversation history are never cached
+    - Entries persist to data/response_cache.json; embeddings are recomputed
+      lazily after a restart
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_FILE,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        similarity_threshold: float = RESPONSE_CACHE_SIMILARITY,
+        enabled: bool = ENABLE_RESPONSE_CACHE
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.enabled = enabled and max_entries > 0
+        self._entries: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._unsaved = 0
+
+        # Metrics
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+        if self.enabled:
+            self._load()
+
+    # ---------- keys and rules ----------
+
+    normalize = staticmethod(normalize_key)
+
+    @staticmethod
+    def ttl_for(provider: str) -> int:
+        return RESPONSE_CACHE_PROVIDER_TTLS.get(provider, RESPONSE_CACHE_TTL)
+
+    def should_bypass(self, prompt: str, conversation_history: Optional[List[Dict]] = None) -> bool:
+        """True if the answer to this prompt must not come from (or go into) the cache"""
+        if not self.enabled:
+            return True
+
+        from python_backend.command_parser import parse_command
+        from python_backend.intent_classifier import classify_intent_keywords
+
+        parsed = parse_command(prompt)
+        if not parsed.text:
+            return True
+        intents = classify_intent_keywords(parsed)["all_intents"]
+        if any(intent in intents for intent in RESPONSE_CACHE_BYPASS_INTENTS):
+            return True
+        if conversation_history and parsed.token_set & FOLLOW_UP_WORDS:
+            return True
+        return False
+
+    # ---------- lookup ----------
+
+    def get(
+        self,
+        prompt: str,
+        namespace: str,
+        conversation_history: Optional[List[Dict]] = None,
+        bypass: Optional[bool] = None
+    ) -> Optional[str]:
+        """
+        Cached answer for prompt, or None
+
+        bypass is should_bypass()'s result when the caller already has it
+        (it is passed on to put() so the prompt is only classified once)
+        """
+        if bypass is None:
+            bypass = self.should_bypass(prompt, conversation_history)
+        if bypass:
+            self.bypassed += 1
+            return None
+
+        key = self.normalize(prompt)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry["expires"] > now:
+                self._entries.move_to_end((namespace, key))
+                entry["hits"] += 1
+                self.exact_hits += 1
+                log_info(f"Response cache hit (exact, {entry['provider']})")
+                return entry["response"]
+
+        entry = self._semantic_lookup(namespace, key, now)
+        if entry is not None:
+            self.semantic_hits += 1
+            log_info(f"Response cache hit (similar to '{entry['key'][:40]}', {entry['provider']})")
+            return entry["response"]
+
+        self.misses += 1
+        return None
+
+    def _embedding_model(self):
+        """The shared embedding model if it has already loaded, else None"""
+        from python_backend.model_manager import get_model_manager
+        from python_backend.embedding_service import get_embedding_model
+
+        if not get_model_manager().is_ready("embeddings"):
+            return None
+        model = get_embedding_model()
+        return model if model.available else None
+
+    def _semantic_lookup(self, namespace: str, key: str, now: float) -> Optional[Dict]:
+        """Most similar live entry of the namespace above the threshold"""
+        if self.similarity_threshold >= 1.0:
+            return None
+        model = self._embedding_model()
+        if model is None:
+            return None
+
+        with self._lock:
+            candidates = [
+                entry for (ns, _), entry in self._entries.items()
+                if ns == namespace and entry["expires"] > now
+            ]
+        if not candidates:
+            return None
+
+        try:
+            import numpy as np
+
+            # Entries loaded from disk get their embedding on first use
+            missing = [entry for entry in candidates if entry.get("vector") is None]
+            if missing:
+                for entry, vector in zip(missing, model.encode([entry["key"] for entry in missing])):
+                    entry["vector"] = vector
+
+            query = model.encode([key])[0]
+            scores = np.vstack([entry["vector"] for entry in candidates]) @ query
+            best = int(np.argmax(scores))
+        except Exception as e:
+            log_error(f"Response cache similarity lookup failed: {e}")
+            return None
+
+        if float(scores[best]) < self.similarity_threshold:
+            return None
+
+        entry = candidates[best]
+        with self._lock:
+            if (namespace, entry["key"]) in self._entries:
+                self._entries.move_to_end((namespace, entry["key"]))
+            entry["hits"] += 1
+        return entry
+
+    # ---------- store ----------
+
+    def put(
+        self,
+        prompt: str,
+        namespace: str,
+        provider: str,
+        response: Optional[str],
+        conversation_history: Optional[List[Dict]] = None,
+        bypass: Optional[bool] = None
+    ):
+        """Cache a provider answer (no-op for bypassed prompts, empty answers or TTL 0)"""
+        ttl = self.ttl_for(provider)
+        if not response or ttl <= 0:
+            return
+        if bypass is None:
+            bypass = self.should_bypass(prompt, conversation_history)
+        if bypass:
+            return
+
+        key = self.normalize(prompt)
+        now = time.time()
+        entry = {
+            "key": key,
+            "response": response,
+            "provider": provider,
+            "created": now,
+            "expires": now + ttl,
+            "hits": 0,
+            "vector": None,
+        }
+
+        with self._lock:
+            self._entries[(namespace, key)] = entry
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._unsaved += 1
+            save_now = self._unsaved >= SAVE_EVERY
+        if save_now:
+            self.save()
+
+    def cached_stream(
+        self,
+        prompt: str,
+        namespace: str,
+        provider: str,
+        stream: Iterator[str],
+        conversation_history: Optional[List[Dict]] = None,
+        report: Optional[Dict] = None
+    ) -> Iterator[str]:
+        """
+        Yield a cached answer as one delta, or pass the stream through and
+        cache it once report (filled by the stream) says it finished
+        """
+        bypass = self.should_bypass(prompt, conversation_history)
+        cached = self.get(prompt, namespace, conversation_history, bypass)
+        if cached:
+            yield cached
+            return
+
+        parts = []
+        for delta in stream:
+            parts.append(delta)
+            yield delta
+        if report is not None and report.get("finished"):
+            self.put(prompt, namespace, provider, "".join(parts).strip(), conversation_history, bypass)
+
+    def invalidate(self, namespace: Optional[str] = None):
+        """Drop every entry (or every entry of one namespace)"""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            else:
+                for cache_key in [k for k in self._entries if k[0] == namespace]:
+                    del self._entries[cache_key]
+            self._unsaved += 1
+        self.save()
+
+    # ---------- persistence ----------
+
+    def _load(self):
+        """Load live entries from disk"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except Exception as e:
+            log_error(f"Failed to load response cache: {e}")
+            return
+
+        now = time.time()
+        for record in records[-self.max_entries:]:
+            if record.get("expires", 0) > now and record.get("response"):
+                record["vector"] = None
+                self._entries[(record["namespace"], record["key"])] = record
+        log_info(f"Response cache loaded: {len(self._entries)} entries")
+
+    def save(self):
+        """Write live entries to disk (oldest first, so LRU order survives a restart)"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            records = [
+                {"namespace": ns, **{k: v for k, v in entry.items() if k != "vector"}}
+                for (ns, _), entry in self._entries.items()
+                if entry["expires"] > now
+            ]
+            self._unsaved = 0
+        try:
+            atomic_write_json(self.path, records)
+        except Exception as e:
+            log_error(f"Failed to save response cache: {e}")
+
+    def close(self):
+        if self._unsaved:
+            self.save()
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters for /health"""
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 3) if lookups else None,
+        }
+
+
+# ========================================
+# GLOBAL INSTANCE
+# ========================================
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Get or create global response cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+                atexit.register(_cache.close)
+    return _cache
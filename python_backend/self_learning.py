@@ -4,11 +4,30 @@ Automatically saves and learns from user interactions
 """
 import json
 import os
+import threading
 from datetime import datetime
 from python_backend.logger import log_info, log_error
+from python_backend.journal_store import JournalStore
 
 LEARNING_DATA_FILE = "data/learning_data.json"
-CONVERSATION_HISTORY_FILE = "data/conversation_history.json"
+CONVERSATION_HISTORY_FILE = "data/conversation_history.jsonl"
+LEGACY_CONVERSATION_HISTORY_FILE = "data/conversation_history.json"
+MAX_CONVERSATIONS = 1000
+
+_conversation_journal = None
+_journal_lock = threading.Lock()
+
+def get_conversation_journal():
+    """Get or create the conversation history journal"""
+    global _conversation_journal
+    with _journal_lock:
+        if _conversation_journal is None:
+            _conversation_journal = JournalStore(
+                CONVERSATION_HISTORY_FILE,
+                max_records=MAX_CONVERSATIONS,
+                legacy_path=LEGACY_CONVERSATION_HISTORY_FILE
+            )
+    return _conversation_journal
 
 def ensure_data_files():
     """Create data files if they don't exist"""
@@ -17,10 +36,6 @@ def ensure_data_files():
     if not os.path.exists(LEARNING_DATA_FILE):
         with open(LEARNING_DATA_FILE, 'w', encoding='utf-8') as f:
             json.dump([], f)
-    
-    if not os.path.exists(CONVERSATION_HISTORY_FILE):
-        with open(CONVERSATION_HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump([], f)
 
 def save_conversation(user_input, ai_response, feedback=None):
     """
@@ -34,11 +49,6 @@ def save_conversation(user_input, ai_response, feedback=None):
     ensure_data_files()
     
     try:
-        # Load existing conversations
-        with open(CONVERSATION_HISTORY_FILE, 'r', encoding='utf-8') as f:
-            conversations = json.load(f)
-        
-        # Add new conversation
         conversation = {
             "timestamp": datetime.now().isoformat(),
             "user_input": user_input,
@@ -46,15 +56,8 @@ def save_conversation(user_input, ai_response, feedback=None):
             "feedback": feedback
         }
         
-        conversations.append(conversation)
-        
-        # Keep only last 1000 conversations
-        if len(conversations) > 1000:
-            conversations = conversations[-1000:]
-        
-        # Save
-        with open(CONVERSATION_HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(conversations, f, indent=2, ensure_ascii=False)
+        # Append-only; the journal keeps the last MAX_CONVERSATIONS and compacts itself
+        get_conversation_journal().append(conversation)
         
         log_info(f"Conversation saved: {user_input[:50]}...")
         
@@ -129,8 +132,7 @@ def get_conversation_stats():
     ensure_data_files()
     
     try:
-        with open(CONVERSATION_HISTORY_FILE, 'r', encoding='utf-8') as f:
-            conversations = json.load(f)
+        conversations = get_conversation_journal().records()
         
         with open(LEARNING_DATA_FILE, 'r', encoding='utf-8') as f:
             learning_data = json.load(f)
@@ -3,12 +3,27 @@ VEDA AI - Semantic Similarity Search
 Uses embeddings for intelligent response matching
 """
 
-import json
-import os
+import atexit
+import threading
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 from python_backend.logger import log_info, log_error, log_warning
-from python_backend.ml_config import SIMILARITY_THRESHOLD, EMBEDDING_MODEL
+from python_backend.journal_store import JournalStore
+from python_backend.embedding_store import EmbeddingStore
+from python_backend.embedding_service import get_embedding_model
+from python_backend.ml_config import (
+    SIMILARITY_THRESHOLD, EMBEDDING_MODEL, SEMANTIC_INDEX,
+    SEMANTIC_INDEX_THRESHOLD, SEMANTIC_INDEX_SAVE_EVERY, SEMANTIC_MMAP
+)
+from python_backend.vector_index import (
+    brute_force_search, build_ann_index, load_ann_index, normalize_vectors
+)
+
+# Knowledge entries (append-only JSONL) and their embeddings (append-only matrix file)
+KNOWLEDGE_FILE = "data/semantic_knowledge.jsonl"
+EMBEDDINGS_FILE = "data/semantic_embeddings.vec"
+LEGACY_KNOWLEDGE_FILE = "data/semantic_knowledge.json"
+LEGACY_EMBEDDINGS_FILE = "data/semantic_embeddings.npy"
 
 # ========================================
 # SEMANTIC SEARCH ENGINE
@@ -23,39 +38,124 @@ class SemanticSearchEngine:
     def __init__(self):
         self.model = None
         self.knowledge_base: List[Dict] = []
-        self.embeddings: Optional[np.ndarray] = None
-        self.storage_path = "data/semantic_knowledge.json"
-        self.embeddings_path = "data/semantic_embeddings.npy"
+        self.storage_path = KNOWLEDGE_FILE
+        self.embeddings_path = EMBEDDINGS_FILE
+        self.index_path = "data/semantic_index"
+        self._journal: Optional[JournalStore] = None
+        self._store: Optional[EmbeddingStore] = None
+        self._lock = threading.Lock()
+        
+        # ANN index, only used above SEMANTIC_INDEX_THRESHOLD entries
+        self.index = None
+        self._unsaved_index_inserts = 0
         
         self._load_model()
         self._load_knowledge_base()
+        self._sync_index()
+        atexit.register(self.close)
+    
+    @property
+    def embeddings(self) -> Optional[np.ndarray]:
+        """L2-normalized float32 rows, so cosine similarity is a plain dot product"""
+        return self._store.vectors if self._store is not None else None
     
     def _load_model(self):
-        """Load sentence transformer model"""
-        try:
-            from sentence_transformers import SentenceTransformer
-            self.model = SentenceTransformer(EMBEDDING_MODEL)
-            log_info(f"Semantic search model loaded: {EMBEDDING_MODEL}")
-        except ImportError:
-            log_warning("sentence-transformers not installed. Run: pip install sentence-transformers")
-        except Exception as e:
-            log_error(f"Failed to load semantic model: {e}")
+        """Attach to the shared sentence embedding model"""
+        model = get_embedding_model(EMBEDDING_MODEL)
+        if model.load():
+            self.model = model
+            log_info(f"Semantic search model ready: {EMBEDDING_MODEL}")
     
     def _load_knowledge_base(self):
         """Load existing knowledge base"""
         try:
-            if os.path.exists(self.storage_path):
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    self.knowledge_base = json.load(f)
-                log_info(f"Loaded {len(self.knowledge_base)} knowledge entries")
+            self._journal = JournalStore(
+                self.storage_path,
+                max_records=None,
+                legacy_path=LEGACY_KNOWLEDGE_FILE
+            )
+            self.knowledge_base = self._journal.records()
+            log_info(f"Loaded {len(self.knowledge_base)} knowledge entries")
             
-            if os.path.exists(self.embeddings_path):
-                self.embeddings = np.load(self.embeddings_path)
-                log_info(f"Loaded {len(self.embeddings)} embeddings")
+            self._store = EmbeddingStore(
+                self.embeddings_path,
+                mmap=SEMANTIC_MMAP,
+                legacy_path=LEGACY_EMBEDDINGS_FILE
+            )
+            self._normalize_stored_embeddings()
+            self._reconcile_embeddings()
+            log_info(f"Loaded {len(self._store)} embeddings{' (memory-mapped)' if SEMANTIC_MMAP else ''}")
                 
         except Exception as e:
             log_error(f"Failed to load knowledge base: {e}")
     
+    def _normalize_stored_embeddings(self):
+        """Upgrade embeddings written before they were stored normalized"""
+        embeddings = self.embeddings
+        if embeddings is None:
+            return
+        
+        norms = np.linalg.norm(embeddings, axis=1)
+        if not np.allclose(norms[norms > 0], 1.0, atol=1e-3):
+            log_info("Normalizing stored embeddings to unit vectors")
+            self._store.replace(normalize_vectors(embeddings))
+    
+    def _reconcile_embeddings(self):
+        """Line up embedding rows with knowledge entries after an interrupted insert"""
+        entries, rows = len(self.knowledge_base), len(self._store)
+        if rows > entries:
+            log_warning(f"Dropping {rows - entries} embeddings with no knowledge entry")
+            self._store.truncate(entries)
+        elif rows < entries and self.model:
+            log_warning(f"Re-encoding {entries - rows} knowledge entries with no embedding")
+            self._store.append(self._encode([entry["question"] for entry in self.knowledge_base[rows:]]))
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts to L2-normalized float32 embeddings (shared, cached model)"""
+        return self.model.encode(texts)
+    
+    def _sync_index(self, rebuild: bool = False):
+        """Load, catch up or build the ANN index once the knowledge base is large enough"""
+        count = 0 if self.embeddings is None else len(self.embeddings)
+        if SEMANTIC_INDEX == "brute" or count < SEMANTIC_INDEX_THRESHOLD:
+            self.index = None
+            return
+        
+        try:
+            index = None if rebuild else load_ann_index(self.index_path, self.embeddings.shape[1])
+            if index is not None and len(index) <= count and not index.needs_rebuild():
+                # Index file may lag behind the embeddings - insert the missing rows
+                if len(index) < count:
+                    index.add(self.embeddings[len(index):], np.arange(len(index), count))
+                    index.save(self.index_path)
+                log_info(f"Loaded {index.kind} index ({len(index)} vectors)")
+            else:
+                index = build_ann_index(self.embeddings)
+                if index is not None:
+                    index.save(self.index_path)
+            self.index = index
+            self._unsaved_index_inserts = 0
+        except Exception as e:
+            log_error(f"Failed to prepare vector index: {e}")
+            self.index = None
+    
+    def _index_insert(self, embedding: np.ndarray):
+        """Add the newest embedding to the ANN index (or build it at the threshold)"""
+        if self.index is None:
+            if len(self.embeddings) >= SEMANTIC_INDEX_THRESHOLD:
+                self._sync_index(rebuild=True)
+            return
+        
+        self.index.add(embedding.reshape(1, -1), np.array([len(self.embeddings) - 1]))
+        if self.index.needs_rebuild():
+            self._sync_index(rebuild=True)
+            return
+        
+        self._unsaved_index_inserts += 1
+        if self._unsaved_index_inserts >= SEMANTIC_INDEX_SAVE_EVERY:
+            self.index.save(self.index_path)
+            self._unsaved_index_inserts = 0
+    
     def add_knowledge(self, question: str, answer: str, category: str = "general"):
         """Add new knowledge to the base"""
         if not self.model:
@@ -72,20 +172,21 @@ class SemanticSearchEngine:
             }
             
             # Generate embedding
-            embedding = self.model.encode([question])[0]
-            
-            # Add to knowledge base
-            self.knowledge_base.append(entry)
+            embedding = self._encode([question])[0]
             
-            # Update embeddings array
-            if self.embeddings is None:
-                self.embeddings = embedding.reshape(1, -1)
-            else:
-                self.embeddings = np.vstack([self.embeddings, embedding])
+            # Append embedding first: a crash before the entry is written
+            # leaves an orphan row that is dropped on the next load
+            with self._lock:
+                self._store.append(embedding)
+                self._journal.append(entry)
+                self.knowledge_base.append(entry)
+                self._index_insert(embedding)
             
-            # Save
-            self._save_knowledge_base()
             log_info(f"Added knowledge: {question[:50]}...")
+            
+            # Hot commands memoize semantic answers; new knowledge can change nearby ones
+            from python_backend.hot_commands import forget_similar_hot_commands
+            forget_similar_hot_commands(embedding, SIMILARITY_THRESHOLD)
             return True
             
         except Exception as e:
@@ -104,35 +205,50 @@ class SemanticSearchEngine:
         Returns:
             List of {question, answer, similarity} dicts
         """
-        if not self.model or self.embeddings is None or len(self.knowledge_base) == 0:
-            return []
+        return self.search_batch([query], top_k, threshold)[0]
+    
+    def search_batch(
+        self,
+        queries: List[str],
+        top_k: int = 3,
+        threshold: float = SIMILARITY_THRESHOLD
+    ) -> List[List[Dict]]:
+        """
+        Search for several queries at once (one encode call, one matrix product)
+        
+        Returns:
+            One result list per query, in the same order
+        """
+        if not self.model or self.embeddings is None or len(self.knowledge_base) == 0 or not queries:
+            return [[] for _ in queries]
         
         try:
-            # Encode query
-            query_embedding = self.model.encode([query])[0]
-            
-            # Calculate cosine similarity
-            similarities = self._cosine_similarity(query_embedding, self.embeddings)
+            query_embeddings = self._encode(queries)
             
-            # Get top-k indices
-            top_indices = np.argsort(similarities)[::-1][:top_k]
+            # Nearest neighbours: ANN index for large bases, exact scan otherwise
+            if self.index is not None:
+                ids, scores = self.index.search(query_embeddings, top_k)
+            else:
+                ids, scores = brute_force_search(self.embeddings, query_embeddings, top_k)
             
-            results = []
-            for idx in top_indices:
-                sim = similarities[idx]
-                if sim >= threshold:
-                    entry = self.knowledge_base[idx].copy()
-                    entry["similarity"] = float(sim)
-                    results.append(entry)
+            all_results = []
+            for row_ids, row_scores in zip(ids, scores):
+                results = []
+                for idx, sim in zip(row_ids, row_scores):
+                    if 0 <= idx < len(self.knowledge_base) and sim >= threshold:
+                        entry = self.knowledge_base[idx].copy()
+                        entry["similarity"] = float(sim)
+                        results.append(entry)
+                all_results.append(results)
             
-            if results:
-                log_info(f"Found {len(results)} similar entries (best: {results[0]['similarity']:.2f})")
+            if len(queries) == 1 and all_results[0]:
+                log_info(f"Found {len(all_results[0])} similar entries (best: {all_results[0][0]['similarity']:.2f})")
             
-            return results
+            return all_results
             
         except Exception as e:
             log_error(f"Search error: {e}")
-            return []
+            return [[] for _ in queries]
     
     def get_best_response(
         self,
@@ -146,30 +262,6 @@ class SemanticSearchEngine:
             return results[0]["answer"]
         return None
     
-    def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
-        """Calculate cosine similarity between vector and matrix"""
-        norm_a = np.linalg.norm(a)
-        norm_b = np.linalg.norm(b, axis=1)
-        
-        # Avoid division by zero
-        norm_b = np.where(norm_b == 0, 1, norm_b)
-        
-        return np.dot(b, a) / (norm_b * norm_a)
-    
-    def _save_knowledge_base(self):
-        """Save knowledge base to files"""
-        try:
-            os.makedirs("data", exist_ok=True)
-            
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(self.knowledge_base, f, indent=2, ensure_ascii=False)
-            
-            if self.embeddings is not None:
-                np.save(self.embeddings_path, self.embeddings)
-                
-        except Exception as e:
-            log_error(f"Failed to save knowledge base: {e}")
-    
     def rebuild_embeddings(self):
         """Rebuild all embeddings (use after model change)"""
         if not self.model or not self.knowledge_base:
@@ -177,8 +269,10 @@ class SemanticSearchEngine:
         
         try:
             questions = [entry["question"] for entry in self.knowledge_base]
-            self.embeddings = self.model.encode(questions)
-            self._save_knowledge_base()
+            embeddings = self._encode(questions)
+            with self._lock:
+                self._store.replace(embeddings)
+                self._sync_index(rebuild=True)
             log_info(f"Rebuilt {len(self.embeddings)} embeddings")
             return True
         except Exception as e:
@@ -191,8 +285,25 @@ class SemanticSearchEngine:
             "total_entries": len(self.knowledge_base),
             "model_loaded": self.model is not None,
             "embeddings_loaded": self.embeddings is not None,
+            "index": self.index.kind if self.index is not None else "brute",
+            "embedding_store": self._store.get_stats() if self._store is not None else None,
             "model_name": EMBEDDING_MODEL
         }
+    
+    def close(self):
+        """Persist the index, trim the embedding file and close both stores"""
+        with self._lock:
+            try:
+                if self.index is not None and self._unsaved_index_inserts:
+                    self.index.save(self.index_path)
+                    self._unsaved_index_inserts = 0
+                if self._journal is not None:
+                    self._journal.close()
+                if self._store is not None:
+                    self._store.compact()
+                    self._store.close()
+            except Exception as e:
+                log_error(f"Failed to close semantic knowledge base: {e}")
 
 
 # ========================================
@@ -205,8 +316,9 @@ class SemanticSelfLearning:
     instead of exact string matching
     """
     
-    def __init__(self):
-        self.search_engine = SemanticSearchEngine()
+    def __init__(self, search_engine: Optional[SemanticSearchEngine] = None):
+        # Share the global engine so the knowledge base and model are loaded once
+        self.search_engine = search_engine or get_semantic_search()
     
     def learn(self, question: str, answer: str, category: str = "learned"):
         """Learn from a new Q&A pair"""
@@ -3,9 +3,10 @@ VEDA AI - Sentiment Analysis
 Detects user mood and emotional state for empathetic responses
 """
 
-import re
-from typing import Dict, Tuple, Optional
+from typing import Dict, Tuple, Optional, Union
 from python_backend.logger import log_info, log_error
+from python_backend.command_parser import ParsedCommand, parse_for
+from python_backend.ml_config import SENTIMENT_MODEL
 
 # ========================================
 # SENTIMENT CATEGORIES
@@ -89,7 +90,7 @@ class KeywordSentimentAnalyzer:
         self.all_frustrated = set(self.frustrated_words["english"] + self.frustrated_words["hindi"])
         self.all_confused = set(self.confused_words["english"] + self.confused_words["hindi"])
     
-    def analyze(self, text: str) -> Dict:
+    def analyze(self, text: Union[str, ParsedCommand]) -> Dict:
         """
         Analyze sentiment of text
         
@@ -101,8 +102,7 @@ class KeywordSentimentAnalyzer:
                 "emoji_suggestion": str
             }
         """
-        text_lower = text.lower()
-        words = set(re.findall(r'\b\w+\b', text_lower))
+        words = parse_for(text).token_set
         
         # Count matches
         positive_count = len(words & self.all_positive)
@@ -171,18 +171,15 @@ class MLSentimentAnalyzer:
     def __init__(self):
         self.model = None
         self.tokenizer = None
+        self.backend = None
         self._load_model()
     
     def _load_model(self):
-        """Load sentiment model"""
+        """Load sentiment model (int8 ONNX export when available, else PyTorch pipeline)"""
         try:
-            from transformers import pipeline
-            self.model = pipeline(
-                "sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                truncation=True
-            )
-            log_info("ML Sentiment analyzer loaded")
+            from python_backend.model_optimizer import load_sentiment_classifier
+            self.model, self.backend = load_sentiment_classifier(SENTIMENT_MODEL)
+            log_info(f"ML Sentiment analyzer loaded ({self.backend})")
         except ImportError:
             log_info("transformers not installed, using keyword-based sentiment only")
         except Exception as e:
@@ -227,10 +224,14 @@ class HybridSentimentAnalyzer:
         self.ml_analyzer = MLSentimentAnalyzer()
         self.use_ml = self.ml_analyzer.model is not None
     
-    def analyze(self, text: str) -> Dict:
-        """Analyze sentiment using hybrid approach"""
+    def analyze(self, text: Union[str, ParsedCommand]) -> Dict:
+        """Analyze sentiment using hybrid approach (memoized per parsed command)"""
+        parsed = parse_for(text)
+        return parsed.cached("sentiment", lambda: self._analyze(parsed))
+    
+    def _analyze(self, parsed: ParsedCommand) -> Dict:
         # Always get keyword analysis
-        keyword_result = self.keyword_analyzer.analyze(text)
+        keyword_result = self.keyword_analyzer.analyze(parsed)
         
         result = {
             "sentiment": keyword_result["sentiment"],
@@ -242,7 +243,7 @@ class HybridSentimentAnalyzer:
         
         # Use ML if available and keyword confidence is low
         if self.use_ml and keyword_result["confidence"] < 0.6:
-            ml_result = self.ml_analyzer.analyze(text)
+            ml_result = self.ml_analyzer.analyze(parsed.original)
             
             if ml_result["confidence"] > keyword_result["confidence"]:
                 result["sentiment"] = ml_result["sentiment"]
@@ -297,6 +298,7 @@ class HybridSentimentAnalyzer:
 # ========================================
 
 _analyzer = None
+_keyword_analyzer = None
 
 def get_sentiment_analyzer() -> HybridSentimentAnalyzer:
     """Get or create global sentiment analyzer instance"""
@@ -306,17 +308,28 @@ def get_sentiment_analyzer() -> HybridSentimentAnalyzer:
     return _analyzer
 
 
-def analyze_sentiment(text: str) -> Dict:
+def analyze_sentiment(text: Union[str, ParsedCommand]) -> Dict:
     """Convenience function to analyze sentiment"""
     return get_sentiment_analyzer().analyze(text)
 
 
-def get_sentiment(text: str) -> str:
+def analyze_sentiment_keywords(text: Union[str, ParsedCommand]) -> Dict:
+    """Keyword-only sentiment (no model load) - used while models warm up"""
+    global _keyword_analyzer
+    if _keyword_analyzer is None:
+        _keyword_analyzer = KeywordSentimentAnalyzer()
+    
+    result = _keyword_analyzer.analyze(text)
+    result["method"] = "keyword"
+    return result
+
+
+def get_sentiment(text: Union[str, ParsedCommand]) -> str:
     """Get just the sentiment label"""
     return analyze_sentiment(text)["sentiment"]
 
 
-def get_empathetic_prefix(text: str, language: str = "english") -> str:
+def get_empathetic_prefix(text: Union[str, ParsedCommand], language: str = "english") -> str:
     """Get empathetic response prefix based on text sentiment"""
     result = analyze_sentiment(text)
     return get_sentiment_analyzer().get_empathetic_response(result["sentiment"], language)
@@ -10,6 +10,7 @@ from comtypes import CLSCTX_ALL
 from pycaw.pycaw import AudioUtilities
 from python_backend.logger import log_info, log_error, log_warning
 from python_backend.jarvis_personality import get_jarvis
+from python_backend.keyword_automaton import CommandFeatures, features_for, scan_command
 
 # ========== SECURITY: Path/Command Validation ==========
 BLOCKED_COMMANDS = {
@@ -405,25 +406,28 @@ def set_volume(action):
 # =========================
 # MAIN HANDLER
 # =========================
-def handle_system_command(command):
-    """Handle system-level commands with JARVIS personality"""
+def handle_system_command(command, features: CommandFeatures = None):
+    """
+    Handle system-level commands with JARVIS personality
+    
+    features: keyword scan of the command from process_command (rescanned if missing)
+    """
     try:
         jarvis = get_jarvis()
         original_command = command
         command = command.lower().strip()
+        features = features_for(command, features)
         
         log_info(f"System control checking command: {command}")
         
         # ---- ENHANCED COMMAND DETECTION ----
         # Detect if this is an action command (open/close/start/stop)
-        is_open_command = any(word in command for word in ['open', 'kholo', 'start', 'chalu', 'launch', 'run', 'shuru'])
-        is_close_command = any(word in command for word in ['close', 'band', 'stop', 'exit', 'quit'])
+        is_open_command = features.has("open")
+        is_close_command = features.has("close")
         
         # ---- WEBSITES ----
-        if any(site in command for site in ['youtube', 'google', 'gmail', 'facebook', 'instagram', 
-                                              'twitter', 'whatsapp', 'spotify', 'netflix', 'amazon',
-                                              'linkedin', 'github', 'stackoverflow', 'reddit']):
-            if any(word in command for word in ['open', 'kholo', 'start', 'chalu', 'browse', 'search']):
+        if features.has("website"):
+            if features.has("website_open"):
                 import webbrowser
                 
                 site_urls = {
@@ -444,7 +448,7 @@ def handle_system_command(command):
                 }
                 
                 for site, url in site_urls.items():
-                    if site in command:
+                    if site in features:
                         try:
                             webbrowser.open(url)
                             log_info(f"Opening {site}")
@@ -454,14 +458,14 @@ def handle_system_command(command):
                             return f"{jarvis.owner_name}, I couldn't open {site.title()}."
 
         # ---- VOLUME CONTROL ----
-        if "volume" in command or "sound" in command or "audio" in command:
-            if any(word in command for word in ['up', 'increase', 'badha', 'badhao', 'high', 'zyada']):
+        if features.has("volume"):
+            if features.has("volume_up"):
                 return set_volume("up")
-            elif any(word in command for word in ['down', 'decrease', 'kam', 'kamao', 'low', 'kum']):
+            elif features.has("volume_down"):
                 return set_volume("down")
-            elif any(word in command for word in ['mute', 'silent', 'chup', 'band']):
+            elif features.has("volume_mute"):
                 return set_volume("mute")
-            elif any(word in command for word in ['unmute', 'chalu', 'on']):
+            elif features.has("volume_unmute"):
                 return set_volume("unmute")
 
         # ---- FOLDERS ----
@@ -476,7 +480,7 @@ def handle_system_command(command):
         }
         
         for folder_name, folder_path in folder_commands.items():
-            if folder_name in command and any(word in command for word in ['open', 'kholo', 'show']):
+            if folder_name in features and features.has("folder_open"):
                 try:
                     # Create folder if it doesn't exist
                     if not os.path.exists(folder_path):
@@ -494,8 +498,8 @@ def handle_system_command(command):
         # These need to be checked BEFORE generic app opener
         
         # Task Manager
-        if "task manager" in command or "taskmanager" in command or "taskmgr" in command:
-            if any(word in command for word in ['open', 'kholo', 'start', 'chalu', 'show']):
+        if features.has("task_manager"):
+            if features.has("tool_open"):
                 try:
                     subprocess.Popen("taskmgr.exe")
                     log_info("Opening Task Manager")
@@ -505,10 +509,9 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't open Task Manager."
         
         # This PC / My Computer
-        if ("this pc" in command or "my computer" in command or "mycomputer" in command or 
-            ("computer" in command and any(word in command for word in ['open', 'kholo', 'show']))):
+        if features.has("this_pc") or ("computer" in features and features.has("folder_open")):
             # Make sure it's not "lock computer" or "restart computer"
-            if not any(word in command for word in ['lock', 'restart', 'shutdown', 'band']):
+            if not features.has("power_action"):
                 try:
                     subprocess.Popen("explorer.exe shell:MyComputerFolder")
                     log_info("Opening This PC")
@@ -518,9 +521,9 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't open This PC."
         
         # File Explorer
-        if ("file explorer" in command or "fileexplorer" in command or 
-            ("explorer" in command and not "internet explorer" in command)):
-            if any(word in command for word in ['open', 'kholo', 'start', 'chalu', 'show']):
+        if ("file explorer" in features or "fileexplorer" in features or 
+            ("explorer" in features and not "internet explorer" in command)):
+            if features.has("tool_open"):
                 try:
                     subprocess.Popen("explorer.exe")
                     log_info("Opening File Explorer")
@@ -530,8 +533,8 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't open File Explorer."
 
         # Control Panel
-        if "control panel" in command or "controlpanel" in command:
-            if any(word in command for word in ['open', 'kholo', 'start', 'chalu', 'show']):
+        if features.has("control_panel"):
+            if features.has("tool_open"):
                 try:
                     subprocess.Popen("control.exe")
                     log_info("Opening Control Panel")
@@ -541,8 +544,8 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't open Control Panel."
 
         # Windows Settings
-        if ("settings" in command or "setting" in command) and not "control panel" in command:
-            if any(word in command for word in ['open', 'kholo', 'start', 'chalu', 'show']):
+        if features.has("settings") and not "control panel" in features:
+            if features.has("tool_open"):
                 try:
                     subprocess.Popen("start ms-settings:", shell=True)
                     log_info("Opening Settings")
@@ -552,8 +555,8 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't open Settings."
         
         # Command Prompt
-        if "command prompt" in command or "cmd" in command or "terminal" in command:
-            if any(word in command for word in ['open', 'kholo', 'start', 'chalu', 'show']):
+        if features.has("command_prompt"):
+            if features.has("tool_open"):
                 try:
                     subprocess.Popen("cmd.exe")
                     log_info("Opening Command Prompt")
@@ -563,8 +566,8 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't open Command Prompt."
         
         # PowerShell
-        if "powershell" in command or "power shell" in command:
-            if any(word in command for word in ['open', 'kholo', 'start', 'chalu', 'show']):
+        if features.has("powershell"):
+            if features.has("tool_open"):
                 try:
                     subprocess.Popen("powershell.exe")
                     log_info("Opening PowerShell")
@@ -574,8 +577,8 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't open PowerShell."
         
         # Recycle Bin
-        if "recycle bin" in command or "recyclebin" in command or "trash" in command:
-            if any(word in command for word in ['open', 'kholo', 'start', 'chalu', 'show']):
+        if features.has("recycle_bin"):
+            if features.has("tool_open"):
                 try:
                     subprocess.Popen("explorer.exe shell:RecycleBinFolder")
                     log_info("Opening Recycle Bin")
@@ -585,8 +588,8 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't open Recycle Bin."
 
         # ---- SCREENSHOT ----
-        if "screenshot" in command or "screen capture" in command:
-            if any(word in command for word in ['take', 'capture', 'le', 'lo', 'lena']):
+        if features.has("screenshot"):
+            if features.has("screenshot_take"):
                 try:
                     # Create Pictures folder if it doesn't exist
                     pictures_folder = os.path.join(os.path.expanduser("~"), "Pictures")
@@ -607,7 +610,7 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't take a screenshot."
 
         # ---- BATTERY ----
-        if "battery" in command:
+        if features.has("battery"):
             try:
                 battery = psutil.sensors_battery()
                 if battery:
@@ -615,7 +618,7 @@ def handle_system_command(command):
                     plugged = battery.power_plugged
                     status = "charging" if plugged else "on battery"
                     
-                    if "kitni" in command or "how much" in command:
+                    if features.has("battery_amount"):
                         return f"{jarvis.owner_name}, battery {percent} percent hai aur {status}."
                     return f"{jarvis.owner_name}, battery is at {percent} percent and {status}."
                 return f"I apologize, {jarvis.owner_name}, battery information is not available."
@@ -624,8 +627,8 @@ def handle_system_command(command):
                 return f"{jarvis.owner_name}, I couldn't check battery status."
 
         # ---- WIFI ----
-        if "wifi" in command or "wi-fi" in command:
-            if any(word in command for word in ['off', 'disable', 'band', 'close']):
+        if features.has("wifi"):
+            if features.has("wifi_off"):
                 try:
                     os.system("netsh interface set interface Wi-Fi disable")
                     log_info("WiFi turned off")
@@ -633,7 +636,7 @@ def handle_system_command(command):
                 except Exception as e:
                     log_error(f"WiFi off error: {e}")
                     return f"{jarvis.owner_name}, I couldn't turn off WiFi."
-            elif any(word in command for word in ['on', 'enable', 'chalu', 'start']):
+            elif features.has("wifi_on"):
                 try:
                     os.system("netsh interface set interface Wi-Fi enable")
                     log_info("WiFi turned on")
@@ -643,7 +646,7 @@ def handle_system_command(command):
                     return f"{jarvis.owner_name}, I couldn't turn on WiFi."
 
         # ---- SYSTEM POWER ----
-        if "lock" in command and any(word in command for word in ['system', 'computer', 'pc', 'laptop']):
+        if "lock" in features and features.has("power_target"):
             try:
                 ctypes.windll.user32.LockWorkStation()
                 log_info("Locking system")
@@ -652,7 +655,7 @@ def handle_system_command(command):
                 log_error(f"Lock error: {e}")
                 return f"{jarvis.owner_name}, I couldn't lock the system."
 
-        if "restart" in command and any(word in command for word in ['system', 'computer', 'pc', 'laptop']):
+        if "restart" in features and features.has("power_target"):
             try:
                 os.system("shutdown /r /t 5")
                 log_info("Restarting system")
@@ -661,7 +664,7 @@ def handle_system_command(command):
                 log_error(f"Restart error: {e}")
                 return f"{jarvis.owner_name}, I couldn't restart the system."
 
-        if "shutdown" in command or ("band" in command and any(word in command for word in ['system', 'computer', 'pc', 'laptop'])):
+        if "shutdown" in features or ("band" in features and features.has("power_target")):
             try:
                 os.system("shutdown /s /t 5")
                 log_info("Shutting down system")
@@ -684,14 +687,7 @@ def handle_system_command(command):
             app_name = app_name.strip()
             
             # Skip if it's a website, folder, or system command (already handled above)
-            skip_words = ['youtube', 'google', 'gmail', 'facebook', 'instagram', 'twitter',
-                         'downloads', 'documents', 'pictures', 'music', 'videos', 'desktop',
-                         'explorer', 'computer', 'settings', 'control panel', 'task manager',
-                         'this pc', 'my computer', 'recycle bin', 'command prompt', 'powershell',
-                         'wifi', 'volume', 'screenshot', 'battery', 'lock', 'restart', 'shutdown',
-                         'weather', 'mausam', 'time', 'date']
-            
-            if app_name and len(app_name) > 1 and not any(skip in app_name for skip in skip_words):
+            if app_name and len(app_name) > 1 and not scan_command(app_name).has("app_skip"):
                 log_info(f"Attempting to open/close application: {app_name}")
                 
                 if is_open_command:
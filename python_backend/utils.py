@@ -5,6 +5,8 @@ Includes security, validation, and helper functions
 import socket
 import re
 import html
+import json
+import os
 from typing import Optional
 
 def is_online(timeout: float = 2.0) -> bool:
@@ -191,3 +193,26 @@ def clean_filename(filename):
         filename = filename.replace(char, '')
     
     return filename.strip()
+
+def atomic_write_json(path, data, indent=2):
+    """Write JSON to path via temp file + rename so readers never see a partial file"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def physical_cores():
+    """Physical CPU core count (hyper-threads slow CPU inference down)"""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    return max((os.cpu_count() or 2) // 2, 1)
@@ -0,0 +1,301 @@
+"""
+VEDA AI - Vector Indexes for Semantic Search
+Brute-force cosine search plus approximate nearest-neighbour indexes for large knowledge bases
+"""
+
+import os
+from typing import List, Optional, Tuple
+import numpy as np
+from python_backend.logger import log_info, log_error, log_warning
+from python_backend.ml_config import (
+    SEMANTIC_INDEX, HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH, IVF_NPROBE
+)
+
+# ========================================
+# BRUTE FORCE
+# ========================================
+
+def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32 (zero rows are left as zeros)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def top_k_rows(scores: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Best top_k columns per row, sorted - O(n) argpartition instead of a full sort"""
+    k = min(top_k, scores.shape[1])
+    if k == 0:
+        return np.empty((len(scores), 0), dtype=np.int64), np.empty((len(scores), 0), dtype=scores.dtype)
+    if k < scores.shape[1]:
+        ids = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        ids = np.broadcast_to(np.arange(k), scores.shape).copy()
+    top_scores = np.take_along_axis(scores, ids, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def brute_force_search(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    top_k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact cosine search of queries against every stored vector
+
+    vectors must already be L2-normalized (see normalize_vectors), so
+    scoring is a single matrix product with no per-search norm pass.
+
+    Returns:
+        (ids, scores), each shaped (num_queries, k)
+    """
+    return top_k_rows(normalize_vectors(queries) @ vectors.T, top_k)
+
+
+# ========================================
+# HNSW (optional hnswlib)
+# ========================================
+
+class HNSWIndex:
+    """Graph-based ANN index backed by hnswlib (pip install hnswlib)"""
+
+    kind = "hnsw"
+    file_suffix = ".hnsw"
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        import hnswlib
+        self.dim = dim
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        self._index.init_index(max_elements=max(capacity, 1024), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        self._index.set_ef(HNSW_EF_SEARCH)
+
+    def __len__(self) -> int:
+        return self._index.get_current_count()
+
+    def needs_rebuild(self) -> bool:
+        """HNSW graphs stay balanced under inserts"""
+        return False
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray):
+        """Insert vectors with the given integer ids (grows capacity as needed)"""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        needed = len(self) + len(vectors)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, self._index.get_max_elements() * 2))
+        self._index.add_items(vectors, np.asarray(ids))
+
+    def search(self, queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(top_k, len(self))
+        if k == 0:
+            return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.float32)
+        self._index.set_ef(max(HNSW_EF_SEARCH, k))
+        labels, distances = self._index.knn_query(queries, k=k)
+        return labels.astype(np.int64), 1.0 - distances
+
+    def save(self, base_path: str):
+        self._index.save_index(base_path + self.file_suffix)
+
+    @classmethod
+    def load(cls, base_path: str, dim: int) -> "HNSWIndex":
+        import hnswlib
+        index = cls.__new__(cls)
+        index.dim = dim
+        index._index = hnswlib.Index(space="cosine", dim=dim)
+        index._index.load_index(base_path + cls.file_suffix)
+        index._index.set_ef(HNSW_EF_SEARCH)
+        return index
+
+
+# ========================================
+# IVF (pure NumPy)
+# ========================================
+
+class IVFIndex:
+    """
+    Inverted-file ANN index in pure NumPy
+
+    Vectors are clustered with spherical k-means; a query only scans the
+    nprobe closest clusters instead of the whole matrix.
+    """
+
+    kind = "ivf"
+    file_suffix = ".ivf.npz"
+
+    def __init__(self, dim: int, nlist: Optional[int] = None, nprobe: int = IVF_NPROBE):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._list_ids: List[List[int]] = []
+        self._list_vectors: List[List[np.ndarray]] = []
+        self._packed: List[Optional[Tuple[np.ndarray, np.ndarray]]] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def needs_rebuild(self) -> bool:
+        """Centroids go stale once the index has grown well past its training set"""
+        return self._count > self.trained_size * 4
+
+    def train(self, vectors: np.ndarray, iterations: int = 10, seed: int = 0):
+        """Learn cluster centroids (spherical k-means on a sample)"""
+        vectors = normalize_vectors(vectors)
+        n = len(vectors)
+        nlist = self.nlist or max(1, int(np.sqrt(n)))
+        nlist = min(nlist, n)
+
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, min(n, nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = normalize_vectors(sums)
+
+        self.nlist = nlist
+        self.centroids = centroids
+        self.trained_size = n
+        self._list_ids = [[] for _ in range(nlist)]
+        self._list_vectors = [[] for _ in range(nlist)]
+        self._packed = [None] * nlist
+        self._count = 0
+
+    def _assign(self, vectors: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        parts = [np.argmax(vectors[i:i + chunk] @ self.centroids.T, axis=1) for i in range(0, len(vectors), chunk)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray):
+        """Insert vectors; trains on the first batch if needed"""
+        vectors = normalize_vectors(vectors)
+        if self.centroids is None:
+            self.train(vectors)
+
+        for vec_id, vector, cluster in zip(np.asarray(ids), vectors, self._assign(vectors)):
+            self._list_ids[cluster].append(int(vec_id))
+            self._list_vectors[cluster].append(vector)
+            self._packed[cluster] = None
+        self._count += len(vectors)
+
+    def _get_list(self, cluster: int) -> Tuple[np.ndarray, np.ndarray]:
+        packed = self._packed[cluster]
+        if packed is None:
+            ids = np.asarray(self._list_ids[cluster], dtype=np.int64)
+            vectors = np.vstack(self._list_vectors[cluster]) if ids.size else np.empty((0, self.dim), dtype=np.float32)
+            packed = (ids, vectors)
+            self._packed[cluster] = packed
+        return packed
+
+    def search(self, queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = normalize_vectors(queries)
+        k = min(top_k, self._count)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        if k == 0:
+            return all_ids, all_scores
+
+        nprobe = min(self.nprobe, self.nlist)
+        probes, _ = top_k_rows(queries @ self.centroids.T, nprobe)
+
+        for row, query in enumerate(queries):
+            lists = [self._get_list(c) for c in probes[row]]
+            ids = np.concatenate([l[0] for l in lists])
+            if ids.size == 0:
+                continue
+            scores = np.vstack([l[1] for l in lists if l[0].size]) @ query
+            order, top_scores = top_k_rows(scores.reshape(1, -1), k)
+            found = order.shape[1]
+            all_ids[row, :found] = ids[order[0]]
+            all_scores[row, :found] = top_scores[0]
+
+        return all_ids, all_scores
+
+    def save(self, base_path: str):
+        ids = []
+        assign = []
+        vectors = []
+        for cluster in range(self.nlist):
+            list_ids, list_vectors = self._get_list(cluster)
+            ids.append(list_ids)
+            assign.append(np.full(list_ids.size, cluster, dtype=np.int64))
+            vectors.append(list_vectors)
+        np.savez(
+            base_path + self.file_suffix,
+            centroids=self.centroids,
+            ids=np.concatenate(ids),
+            assign=np.concatenate(assign),
+            vectors=np.vstack(vectors),
+            meta=np.array([self.nprobe, self.trained_size], dtype=np.int64)
+        )
+
+    @classmethod
+    def load(cls, base_path: str, dim: int) -> "IVFIndex":
+        with np.load(base_path + cls.file_suffix) as data:
+            centroids, ids, assign, vectors, meta = (
+                data["centroids"], data["ids"], data["assign"], data["vectors"], data["meta"]
+            )
+
+        index = cls(dim, nlist=len(centroids), nprobe=int(meta[0]))
+        index.centroids = centroids
+        index.trained_size = int(meta[1])
+        index._list_ids = [[] for _ in range(index.nlist)]
+        index._list_vectors = [[] for _ in range(index.nlist)]
+        index._packed = [None] * index.nlist
+        for vec_id, cluster, vector in zip(ids, assign, vectors):
+            index._list_ids[cluster].append(int(vec_id))
+            index._list_vectors[cluster].append(vector)
+        index._count = len(ids)
+        return index
+
+
+# ========================================
+# FACTORY
+# ========================================
+
+def _index_classes(kind: str = SEMANTIC_INDEX) -> list:
+    """Index classes to try, in preference order, for the configured kind"""
+    if kind == "brute":
+        return []
+    if kind == "ivf":
+        return [IVFIndex]
+    # "auto" / "hnsw": prefer hnswlib, fall back to pure NumPy IVF
+    return [HNSWIndex, IVFIndex]
+
+
+def build_ann_index(vectors: np.ndarray, kind: str = SEMANTIC_INDEX):
+    """Build an ANN index over vectors (ids are row positions); None for brute force"""
+    for index_class in _index_classes(kind):
+        try:
+            index = index_class(vectors.shape[1], len(vectors) * 2) if index_class is HNSWIndex else index_class(vectors.shape[1])
+            index.add(vectors, np.arange(len(vectors)))
+            log_info(f"Built {index.kind} index over {len(vectors)} vectors")
+            return index
+        except ImportError:
+            if kind == "hnsw":
+                log_warning("hnswlib not installed, falling back to IVF index. Run: pip install hnswlib")
+        except Exception as e:
+            log_error(f"Failed to build {index_class.kind} index: {e}")
+    return None
+
+
+def load_ann_index(base_path: str, dim: int, kind: str = SEMANTIC_INDEX):
+    """Load a persisted ANN index if one exists for the configured kind"""
+    for index_class in _index_classes(kind):
+        if not os.path.exists(base_path + index_class.file_suffix):
+            continue
+        try:
+            return index_class.load(base_path, dim)
+        except ImportError:
+            continue
+        except Exception as e:
+            log_error(f"Failed to load {index_class.kind} index: {e}")
+    return None
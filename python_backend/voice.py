@@ -1,9 +1,16 @@
+import sys
+import threading
 import speech_recognition as sr
 import pyttsx3
 from python_backend.logger import log_info, log_error, log_warning
 
 recognizer = sr.Recognizer()
 
+# pyttsx3.init() hands out one cached engine per driver and its run loop is
+# not re-entrant; commands run on dispatcher worker threads, so speech is serialized
+_speak_lock = threading.Lock()
+_com_thread = threading.local()
+
 # Initialize engine safely
 engine = None
 try:
@@ -172,38 +179,52 @@ def listen_command():
         log_error(f"Voice recognition error: {e}")
         return ""
 
+def _init_com():
+    """SAPI5 (Windows) needs COM initialized on every thread that speaks"""
+    if sys.platform != "win32" or getattr(_com_thread, "ready", False):
+        return
+    try:
+        import comtypes
+        comtypes.CoInitialize()
+    except Exception as e:
+        log_warning(f"COM initialization failed: {e}")
+    _com_thread.ready = True
+
 def speak(text):
-    """Convert text to speech with personality"""
+    """Convert text to speech with personality (one utterance at a time)"""
     try:
         # Show who is speaking
         print(f"🔊 VEDA: {text}")
         log_info(f"Speaking: {text}")
         
-        # Create fresh engine instance to avoid "run loop already started" error
-        import pyttsx3
-        local_engine = pyttsx3.init()
-        local_engine.setProperty("rate", 175)
-        local_engine.setProperty("volume", 1.0)
-        
-        # Try to set Hindi voice
-        try:
-            voices = local_engine.getProperty('voices')
-            for voice in voices:
-                if 'hindi' in voice.name.lower() or 'hi-in' in voice.id.lower() or 'hi_IN' in voice.id:
-                    local_engine.setProperty('voice', voice.id)
-                    break
-        except:
-            pass
-        
-        # Speak the text
-        local_engine.say(text)
-        local_engine.runAndWait()
-        
-        # Clean up
-        try:
-            local_engine.stop()
-        except:
-            pass
+        with _speak_lock:
+            _init_com()
+            
+            # Create fresh engine instance to avoid "run loop already started" error
+            import pyttsx3
+            local_engine = pyttsx3.init()
+            local_engine.setProperty("rate", 175)
+            local_engine.setProperty("volume", 1.0)
+            
+            # Try to set Hindi voice
+            try:
+                voices = local_engine.getProperty('voices')
+                for voice in voices:
+                    if 'hindi' in voice.name.lower() or 'hi-in' in voice.id.lower() or 'hi_IN' in voice.id:
+                        local_engine.setProperty('voice', voice.id)
+                        break
+            except:
+                pass
+            
+            # Speak the text
+            local_engine.say(text)
+            local_engine.runAndWait()
+            
+            # Clean up
+            try:
+                local_engine.stop()
+            except:
+                pass
         
     except Exception as e:
         log_error(f"Speech synthesis error: {e}")
@@ -3,8 +3,16 @@ Weather API Integration
 Get real-time weather updates
 """
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import requests
-from python_backend.logger import log_info, log_error
+from python_backend.logger import log_info, log_error, log_warning
+from python_backend.http_pool import get_http_session
+from python_backend.weather_cache import get_weather_cache, get_geocode_table
+from python_backend.config import (
+    WEATHER_FETCH_WORKERS, WEATHER_HEDGE_DELAY, WEATHER_FETCH_TIMEOUT, WEATHER_MULTI_DEADLINE
+)
 
 # Primary API - wttr.in (free, no key required)
 WEATHER_API_URL = "https://wttr.in/{}?format=j1"
@@ -13,6 +21,52 @@ WEATHER_API_URL = "https://wttr.in/{}?format=j1"
 BACKUP_API_URL = "https://api.open-meteo.com/v1/forecast"
 GEOCODING_API_URL = "https://geocoding-api.open-meteo.com/v1/search"
 
+# Two pools so a city task waiting on its sources can never starve them:
+# one thread per city being looked up, and one per in-flight HTTP source
+_pool_lock = threading.Lock()
+_city_pool = None
+_fetch_pool = None
+
+def _get_city_pool():
+    global _city_pool
+    if _city_pool is None:
+        with _pool_lock:
+            if _city_pool is None:
+                _city_pool = ThreadPoolExecutor(max_workers=WEATHER_FETCH_WORKERS, thread_name_prefix="veda-weather-city")
+    return _city_pool
+
+def _get_fetch_pool():
+    global _fetch_pool
+    if _fetch_pool is None:
+        with _pool_lock:
+            if _fetch_pool is None:
+                _fetch_pool = ThreadPoolExecutor(max_workers=WEATHER_FETCH_WORKERS * 2, thread_name_prefix="veda-weather-fetch")
+    return _fetch_pool
+
+def geocode_city(city):
+    """Look up a city's coordinates with the Open-Meteo geocoding API"""
+    try:
+        log_info(f"Geocoding city: {city}")
+        geo_response = get_http_session().get(
+            GEOCODING_API_URL,
+            params={"name": city, "count": 1, "language": "en", "format": "json"},
+            timeout=5
+        )
+        
+        if geo_response.status_code != 200 or not geo_response.json().get("results"):
+            log_error(f"Geocoding failed for: {city}")
+            return None
+        
+        geo_data = geo_response.json()["results"][0]
+        return {
+            "latitude": geo_data["latitude"],
+            "longitude": geo_data["longitude"],
+            "name": f"{geo_data['name']}, {geo_data.get('country', '')}"
+        }
+    except Exception as e:
+        log_error(f"Geocoding error for {city}: {e}")
+        return None
+
 def get_weather_backup(city=""):
     """Backup weather API using Open-Meteo (faster and more reliable)"""
     try:
@@ -23,26 +77,17 @@ def get_weather_backup(city=""):
             lat, lon = 28.6139, 77.2090  # Delhi coordinates as default
             location_name = "Current Location"
         else:
-            # Geocode the city name
-            log_info(f"Geocoding city: {city}")
-            geo_response = requests.get(
-                GEOCODING_API_URL,
-                params={"name": city, "count": 1, "language": "en", "format": "json"},
-                timeout=5
-            )
-            
-            if geo_response.status_code != 200 or not geo_response.json().get("results"):
-                log_error(f"Geocoding failed for: {city}")
+            # Coordinates come from the persistent geocode table (geocoded once per city)
+            place = get_geocode_table().get(city, geocode_city)
+            if not place:
                 return None
-            
-            geo_data = geo_response.json()["results"][0]
-            lat = geo_data["latitude"]
-            lon = geo_data["longitude"]
-            location_name = f"{geo_data['name']}, {geo_data.get('country', '')}"
+            lat = place["latitude"]
+            lon = place["longitude"]
+            location_name = place["name"]
         
         # Get weather data
         log_info(f"Fetching weather for coordinates: {lat}, {lon}")
-        weather_response = requests.get(
+        weather_response = get_http_session().get(
             BACKUP_API_URL,
             params={
                 "latitude": lat,
@@ -86,26 +131,65 @@ def get_weather_backup(city=""):
     except Exception as e:
         log_error(f"Backup weather API error: {e}")
         return None
+
 def get_weather(city=""):
-    """Get weather information for a city (with fallback to backup API)"""
-    try:
-        # If no city specified, try to get location-based weather
-        if not city:
-            city = "auto:ip"  # Auto-detect location from IP
+    """Get weather information for a city (cached; see weather_cache)"""
+    return get_weather_cache().get(city, fetch_weather)
+
+def fetch_weather(city=""):
+    """Fetch weather for a city, hedging wttr.in with the Open-Meteo backup
+    
+    wttr.in is asked first. If it fails, or has not answered after
+    WEATHER_HEDGE_DELAY seconds, Open-Meteo is raced against it and the
+    first good answer wins. For IP-based location the backup only runs when
+    wttr.in fails, since Open-Meteo cannot locate the caller.
+    """
+    # If no city specified, try to get location-based weather
+    if not city:
+        city = "auto:ip"  # Auto-detect location from IP
+    
+    pool = _get_fetch_pool()
+    started = time.monotonic()
+    deadline = started + WEATHER_FETCH_TIMEOUT
+    hedge_at = None if city == "auto:ip" else started + WEATHER_HEDGE_DELAY
+    pending = {pool.submit(fetch_weather_primary, city)}
+    backup = None
+    
+    while pending:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        wake_at = deadline if backup is not None or hedge_at is None else min(deadline, hedge_at)
+        done, pending = wait(pending, timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED)
+        
+        for future in done:
+            if future.exception() is None and future.result():
+                return future.result()
         
+        primary_failed = backup is None and not pending
+        hedge_due = backup is None and hedge_at is not None and time.monotonic() >= hedge_at
+        if primary_failed or hedge_due:
+            log_info(f"Trying backup weather API for {city} ({'wttr.in failed' if primary_failed else 'wttr.in slow'})...")
+            backup = pool.submit(get_weather_backup, city)
+            pending.add(backup)
+    
+    log_error(f"No weather source answered for {city} within {WEATHER_FETCH_TIMEOUT}s")
+    return None
+
+def fetch_weather_primary(city="auto:ip"):
+    """Fetch weather from wttr.in (None on any failure)"""
+    try:
         log_info(f"Fetching weather for: {city}")
         
         # Make request to weather API with shorter timeout
-        response = requests.get(
+        response = get_http_session().get(
             WEATHER_API_URL.format(city),
             timeout=5
         )
         
         if response.status_code != 200:
             log_error(f"Weather API error: {response.status_code}")
-            # Try backup API
-            log_info("Trying backup weather API...")
-            return get_weather_backup(city)
+            return None
         
         data = response.json()
         
@@ -127,20 +211,20 @@ def get_weather(city=""):
         return weather_info
         
     except requests.exceptions.Timeout:
-        log_error("Weather API timeout - trying backup API")
-        return get_weather_backup(city)
+        log_error("Weather API timeout")
+        return None
     except requests.exceptions.ConnectionError as e:
-        log_error(f"Weather API connection error: {e} - trying backup API")
-        return get_weather_backup(city)
+        log_error(f"Weather API connection error: {e}")
+        return None
     except requests.exceptions.RequestException as e:
-        log_error(f"Weather API request error: {e} - trying backup API")
-        return get_weather_backup(city)
+        log_error(f"Weather API request error: {e}")
+        return None
     except KeyError as e:
         log_error(f"Weather data parsing error - missing key: {e}")
-        return get_weather_backup(city)
+        return None
     except Exception as e:
         log_error(f"Unexpected weather error: {e}")
-        return get_weather_backup(city)
+        return None
 
 def format_weather_response(weather_info, language='english'):
     """Format weather information into a readable response"""
@@ -202,14 +286,35 @@ def get_weather_by_city(city, language='english'):
     weather_info = get_weather(city)
     return format_weather_response(weather_info, language)
 
-def get_weather_multiple_cities(cities, language='english'):
-    """Get weather for multiple cities"""
+def get_weather_multiple_cities(cities, language='english', deadline=WEATHER_MULTI_DEADLINE):
+    """Get weather for multiple cities
+    
+    All cities are looked up concurrently. Whatever has arrived after
+    `deadline` seconds is answered; late cities are named as unavailable
+    (their lookups keep running and land in the weather cache).
+    """
     if not cities:
         return get_weather_by_city("", language)
     
+    # Keep order, drop repeats
+    cities = list(dict.fromkeys(city.strip() for city in cities if city.strip()))
+    pool = _get_city_pool()
+    futures = {city: pool.submit(get_weather, city) for city in cities}
+    wait(futures.values(), timeout=deadline)
+    
+    results = {}
+    missing = []
+    for city, future in futures.items():
+        if future.done() and future.exception() is None and future.result():
+            results[city] = future.result()
+        else:
+            missing.append(city)
+    if missing:
+        log_warning(f"Weather unavailable within {deadline}s for: {', '.join(missing)}")
+    
     responses = []
     for city in cities:
-        weather_info = get_weather(city.strip())
+        weather_info = results.get(city)
         if weather_info:
             temp = weather_info['temperature']
             location = weather_info['location']
@@ -232,6 +337,12 @@ def get_weather_multiple_cities(cities, language='english'):
             return "माफ़ कीजिए, मौसम की जानकारी नहीं मिल पाई।"
         return "Sorry, couldn't fetch weather information."
     
+    if missing:
+        if language == 'hinglish':
+            responses.append(f"{', '.join(missing)} की जानकारी अभी नहीं मिल पाई")
+        else:
+            responses.append(f"Couldn't get weather for {', '.join(missing)} in time")
+    
     if language == 'hinglish':
         return "। ".join(responses) + "।"
     return ". ".join(responses) + "."
@@ -0,0 +1,278 @@
+"""
+VEDA AI - Weather Cache
+In-memory weather results with stale-while-revalidate, plus a persistent geocode table
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+from python_backend.logger import log_info, log_error
+from python_backend.utils import atomic_write_json
+from python_backend.config import WEATHER_CACHE_TTL, WEATHER_CACHE_STALE_TTL, WEATHER_CACHE_LOCATION_TTLS
+
+GEOCODE_FILE = "data/geocode_cache.json"
+
+# Save the geocode table after this many new cities (and always at exit)
+GEOCODE_SAVE_EVERY = 5
+
+# Seconds a failed geocode is remembered, so unknown names are not retried on every query
+GEOCODE_MISS_TTL = 300
+
+
+def _parse_location_ttls(spec: str) -> Dict[str, int]:
+    """Parse "delhi=300,mumbai=900" into {"delhi": 300, "mumbai": 900}"""
+    ttls = {}
+    for item in spec.split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip().isdigit():
+            ttls[name.strip().lower()] = int(seconds)
+    return ttls
+
+
+def location_key(city: str) -> str:
+    """Normalized cache key for a city name ("" means IP-based location)"""
+    return " ".join((city or "").lower().split()) or "auto:ip"
+
+
+# ========================================
+# WEATHER RESULT CACHE
+# ========================================
+
+class WeatherCache:
+    """
+    Weather results per location
+
+    - Fresh results (younger than the location's TTL) are returned directly
+    - Stale results (up to stale_ttl old) are returned immediately while one
+      background thread refreshes them (stale-while-revalidate)
+    - Anything older, or a location never seen, is fetched inline
+    - Failed fetches are not cached
+    """
+
+    def __init__(
+        self,
+        ttl: int = WEATHER_CACHE_TTL,
+        stale_ttl: int = WEATHER_CACHE_STALE_TTL,
+        location_ttls: Optional[Dict[str, int]] = None
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.location_ttls = location_ttls if location_ttls is not None else _parse_location_ttls(WEATHER_CACHE_LOCATION_TTLS)
+        self._entries: Dict[str, Dict] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failed_fetches = 0
+
+    def ttl_for(self, key: str) -> int:
+        return self.location_ttls.get(key, self.ttl)
+
+    def set_ttl(self, city: str, seconds: int):
+        """Override the TTL of one location"""
+        self.location_ttls[location_key(city)] = seconds
+
+    def get(self, city: str, fetch: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """Cached weather for city; fetch(city) is called on a miss or in the background when stale"""
+        key = location_key(city)
+        ttl = self.ttl_for(key)
+
+        if ttl > 0:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                age = time.time() - entry["fetched"]
+                if age < ttl:
+                    self.hits += 1
+                    return entry["info"]
+                if age < ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    self._refresh_in_background(key, city, fetch)
+                    return entry["info"]
+
+        self.misses += 1
+        return self._fetch(key, city, fetch)
+
+    def peek(self, city: str) -> Optional[Dict]:
+        """Cached weather for city regardless of age (None if never fetched)"""
+        with self._lock:
+            entry = self._entries.get(location_key(city))
+        return entry["info"] if entry else None
+
+    def put(self, city: str, info: Optional[Dict]):
+        """Store a weather result fetched elsewhere"""
+        if info:
+            with self._lock:
+                self._entries[location_key(city)] = {"info": info, "fetched": time.time()}
+
+    def _fetch(self, key: str, city: str, fetch: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        info = fetch(city)
+        if info:
+            with self._lock:
+                self._entries[key] = {"info": info, "fetched": time.time()}
+        else:
+            self.failed_fetches += 1
+        return info
+
+    def _refresh_in_background(self, key: str, city: str, fetch: Callable[[str], Optional[Dict]]):
+        """Start one refresh per location; concurrent stale reads do not pile up"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.refreshes += 1
+                self._fetch(key, city, fetch)
+            except Exception as e:
+                log_error(f"Weather refresh for '{key}' failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"veda-weather-refresh-{key}", daemon=True).start()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "locations": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "failed_fetches": self.failed_fetches,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else None,
+        }
+
+
+# ========================================
+# GEOCODE TABLE
+# ========================================
+
+class GeocodeTable:
+    """
+    Persistent city -> coordinates table for the Open-Meteo backup API
+
+    Coordinates never expire; failed lookups are remembered in memory for
+    GEOCODE_MISS_TTL seconds so a misspelled city is not geocoded on every query.
+    """
+
+    def __init__(self, path: str = GEOCODE_FILE):
+        self.path = path
+        self._table: Dict[str, Dict] = {}
+        self._misses: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._unsaved = 0
+
+        # Metrics
+        self.hits = 0
+        self.lookups = 0
+
+        self._load()
+
+    def get(self, city: str, lookup: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """{"latitude", "longitude", "name"} for city; lookup(city) is called once per new city"""
+        key = location_key(city)
+        with self._lock:
+            place = self._table.get(key)
+            missed_at = self._misses.get(key)
+        if place is not None:
+            self.hits += 1
+            return place
+        if missed_at is not None and time.time() - missed_at < GEOCODE_MISS_TTL:
+            self.hits += 1
+            return None
+
+        self.lookups += 1
+        place = lookup(city)
+        with self._lock:
+            if place:
+                self._table[key] = place
+                self._misses.pop(key, None)
+                self._unsaved += 1
+                save_now = self._unsaved >= GEOCODE_SAVE_EVERY
+            else:
+                self._misses[key] = time.time()
+                save_now = False
+        if save_now:
+            self.save()
+        return place
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._table = json.load(f)
+            log_info(f"Geocode table loaded: {len(self._table)} cities")
+        except Exception as e:
+            log_error(f"Failed to load geocode table: {e}")
+
+    def save(self):
+        with self._lock:
+            table = dict(self._table)
+            self._unsaved = 0
+        try:
+            atomic_write_json(self.path, table)
+        except Exception as e:
+            log_error(f"Failed to save geocode table: {e}")
+
+    def close(self):
+        if self._unsaved:
+            self.save()
+
+    def get_stats(self) -> Dict:
+        return {
+            "cities": len(self._table),
+            "hits": self.hits,
+            "lookups": self.lookups,
+        }
+
+
+# ========================================
+# GLOBAL INSTANCES
+# ========================================
+
+_weather_cache = None
+_geocode_table = None
+_instances_lock = threading.Lock()
+
+def get_weather_cache() -> WeatherCache:
+    """Get or create global weather cache"""
+    global _weather_cache
+    if _weather_cache is None:
+        with _instances_lock:
+            if _weather_cache is None:
+                _weather_cache = WeatherCache()
+    return _weather_cache
+
+
+def get_geocode_table() -> GeocodeTable:
+    """Get or create global geocode table"""
+    global _geocode_table
+    if _geocode_table is None:
+        with _instances_lock:
+            if _geocode_table is None:
+                _geocode_table = GeocodeTable()
+                atexit.register(_geocode_table.close)
+    return _geocode_table
+
+
+def get_weather_cache_stats() -> Dict:
+    """Weather and geocode statistics for /health"""
+    return {
+        "weather": get_weather_cache().get_stats(),
+        "geocode": get_geocode_table().get_stats(),
+    }
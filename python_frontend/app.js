@@ -8,6 +8,7 @@ let isListening = false;
 let cameraStream = null;
 let reconnectTimeout = null;
 let chatHistory = [];
+let streamingCommand = null;
 const CHAT_HISTORY_KEY = 'veda_chat_history';
 const MAX_CHAT_HISTORY = 100;
 
@@ -257,13 +258,22 @@ function connectWebSocket() {
                     if (data.retry_after) {
                         output.innerText += `\n\nPlease wait ${data.retry_after} seconds.`;
                     }
+                } else if (data.type === "delta") {
+                    // Incremental tokens while VEDA is still generating
+                    if (streamingCommand !== data.command) {
+                        streamingCommand = data.command;
+                        output.innerText = "You: " + data.command + "\n\nVEDA: ";
+                    }
+                    output.innerText += data.delta;
+                    output.style.color = "#00e5ff";
                 } else if (data.type === "greeting") {
                     // Handle initial greeting from VEDA
                     output.innerText = "VEDA: " + data.response + "\n\nReady for commands!";
                     output.style.color = "#00e5ff";
                     addToChatHistory("", data.response, "greeting");
                 } else if (data.response) {
-                    // Show command and response
+                    // Show command and response (final frame replaces any streamed text)
+                    streamingCommand = null;
                     if (data.command === "system_greeting") {
                         output.innerText = "VEDA: " + data.response;
                     } else {
@@ -35,14 +35,15 @@ def start_backend():
     subprocess.Popen(args)
 
 def wait_for_server():
-    for _ in range(30):
+    # Models warm up in the background, so /health answers within a second of launch
+    for _ in range(120):
         try:
             r = requests.get("http://127.0.0.1:8000/health", timeout=1)
             if r.status_code == 200:
                 return True
         except:
             pass
-        time.sleep(1)
+        time.sleep(0.25)
     return False
 
 def open_browser():
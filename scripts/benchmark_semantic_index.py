@@ -0,0 +1,71 @@
+"""
+Semantic Index Benchmark
+Compares ANN index recall and latency against brute-force search on synthetic embeddings
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from python_backend.vector_index import brute_force_search, build_ann_index
+
+
+def make_embeddings(count, dim, clusters, seed=0):
+    """Clustered unit vectors, roughly shaped like sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(clusters, size=count)] + rng.normal(scale=0.6, size=(count, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def percentile_ms(samples, pct):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * pct))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark semantic vector indexes")
+    parser.add_argument("--size", type=int, default=50000, help="knowledge base entries")
+    parser.add_argument("--dim", type=int, default=384, help="embedding dimension (MiniLM = 384)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--index", default="auto", choices=["auto", "hnsw", "ivf"])
+    args = parser.parse_args()
+
+    print(f"📦 Generating {args.size} x {args.dim} embeddings...")
+    vectors = make_embeddings(args.size, args.dim, clusters=max(10, args.size // 500))
+    queries = make_embeddings(args.queries, args.dim, clusters=max(10, args.size // 500), seed=1)
+
+    start = time.perf_counter()
+    index = build_ann_index(vectors, kind=args.index)
+    if index is None:
+        print("❌ Could not build an ANN index")
+        return
+    print(f"🔨 Built {index.kind} index in {time.perf_counter() - start:.2f}s")
+
+    brute_times, ann_times, hits = [], [], 0
+    for query in queries:
+        start = time.perf_counter()
+        exact_ids, _ = brute_force_search(vectors, query, args.top_k)
+        brute_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ann_ids, _ = index.search(query, args.top_k)
+        ann_times.append(time.perf_counter() - start)
+
+        hits += len(set(exact_ids[0].tolist()) & set(ann_ids[0].tolist()))
+
+    recall = hits / (args.queries * args.top_k)
+    print("\n" + "=" * 60)
+    print(f"Recall@{args.top_k}: {recall:.3f}")
+    print(f"Brute force : p50 {percentile_ms(brute_times, 0.5):.2f} ms   p95 {percentile_ms(brute_times, 0.95):.2f} ms")
+    print(f"{index.kind.upper():<12}: p50 {percentile_ms(ann_times, 0.5):.2f} ms   p95 {percentile_ms(ann_times, 0.95):.2f} ms")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Model Optimizer
+Exports the embedding and sentiment models to int8 ONNX and checks parity with the originals
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from python_backend.ml_config import EMBEDDING_MODEL, SENTIMENT_MODEL
+from python_backend.model_optimizer import artifact_dir, check_parity, min_parity_for, optimize_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export VEDA's ML models to int8 ONNX")
+    parser.add_argument("--only", choices=["embedding", "sentiment"], help="optimize one model only")
+    parser.add_argument("--check", action="store_true", help="re-run the parity check on existing exports")
+    parser.add_argument("--min-parity", type=float,
+                        help="override the parity threshold (default: per model, see env.example.txt)")
+    args = parser.parse_args()
+
+    models = [("embedding", EMBEDDING_MODEL), ("sentiment", SENTIMENT_MODEL)]
+    for task, name in models:
+        if args.only and task != args.only:
+            continue
+
+        print(f"🔧 {task}: {name}")
+        min_parity = args.min_parity if args.min_parity is not None else min_parity_for(task)
+        try:
+            if args.check:
+                parity = check_parity(name, task)
+                accepted = parity["score"] >= min_parity
+            else:
+                manifest = optimize_model(name, task, min_parity)
+                parity, accepted = manifest["parity"], manifest["accepted"]
+        except ImportError as e:
+            print(f"❌ Missing dependency ({e}). Run: pip install optimum[onnxruntime] sentence-transformers")
+            return
+        except Exception as e:
+            print(f"❌ Failed: {e}")
+            continue
+
+        details = ", ".join(f"{key}={value}" for key, value in parity.items() if key != "task")
+        print(f"   {artifact_dir(name)}")
+        print(f"   parity: {details}")
+        print(f"   {'✅ accepted' if accepted else '⚠️ rejected - PyTorch stays in use'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -96,9 +96,8 @@ def setup_automation():
     if not os.path.exists("data/learning_data.json"):
         create_file("data/learning_data.json", [])
     
-    # Create conversation history if not exists
-    if not os.path.exists("data/conversation_history.json"):
-        create_file("data/conversation_history.json", [])
+    # Conversation history is an append-only journal (data/conversation_history.jsonl)
+    # created on first use by python_backend.self_learning
     
     print("\n" + "=" * 50)
     print("✅ Automation setup complete!")
@@ -0,0 +1,51 @@
+"""
+Intent Model Trainer
+Trains the hashed n-gram intent classifier from the conversation and command logs
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from python_backend.ml_config import INTENT_MODEL_MIN_ACCURACY
+from python_backend.intent_trainer import train_intent_model, version_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train VEDA's learned intent classifier")
+    parser.add_argument("--min-accuracy", type=float, default=INTENT_MODEL_MIN_ACCURACY,
+                        help="holdout accuracy needed for the new version to be used")
+    parser.add_argument("--dry-run", action="store_true", help="train and evaluate without saving")
+    args = parser.parse_args()
+
+    print("🧠 Training intent model from data/ logs...")
+    try:
+        manifest = train_intent_model(args.min_accuracy, save=not args.dry_run)
+    except ImportError as e:
+        print(f"❌ Missing dependency ({e}). Run: pip install numpy")
+        return
+    except ValueError as e:
+        print(f"❌ Not enough data: {e}")
+        return
+
+    evaluation = manifest["evaluation"]
+    print(f"   samples: {manifest['samples']} ({manifest['train_seconds']}s)")
+    for label, count in sorted(manifest["per_intent"].items(), key=lambda x: -x[1]):
+        print(f"     {label:<16} {count}")
+    print(f"   holdout: {evaluation['samples']} samples, accuracy={evaluation['accuracy']}, "
+          f"macro_f1={evaluation['macro_f1']}, {evaluation['avg_predict_us']}µs/prediction")
+    handoff = evaluation["handoff"] or {}
+    print(f"   handed over by keywords: {handoff.get('samples', 0)} samples, accuracy={handoff.get('accuracy')}, "
+          f"overrides={handoff.get('overrides', 0)}, override_precision={handoff.get('override_precision')}")
+
+    if args.dry_run:
+        print("   (dry run - nothing saved)")
+    elif manifest["accepted"]:
+        print(f"   ✅ v{manifest['version']} accepted: {version_dir(manifest['version'])}")
+    else:
+        print(f"   ⚠️ v{manifest['version']} rejected - keyword + embedding classification stays in use")
+
+
+if __name__ == "__main__":
+    main()